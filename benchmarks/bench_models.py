@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import pytest
+
+from tests.models import OPFieldModel
+from tests.models import OPURIModel
+
+ROWS = 1000
+
+
+@pytest.fixture
+def rows(db):
+    OPFieldModel.objects.bulk_create(
+        OPFieldModel(op_uri=f"op://vault/item-{i}/password") for i in range(ROWS)
+    )
+    OPURIModel.objects.bulk_create(
+        OPURIModel(op_uri=f"op://vault/item-{i}/password") for i in range(ROWS)
+    )
+
+
+def test_load_queryset(benchmark, rows):
+    instances = benchmark(lambda: list(OPFieldModel.objects.all()))
+
+    assert len(instances) == ROWS
+
+
+def test_load_queryset_parse_uri(benchmark, rows):
+    instances = benchmark(lambda: list(OPURIModel.objects.all()))
+
+    assert len(instances) == ROWS
+
+
+def test_from_db_value(benchmark):
+    field = OPURIModel._meta.get_field("op_uri")
+
+    benchmark(field.from_db_value, "op://vault/item/password", None, None)
+
+
+def test_instantiate(benchmark):
+    benchmark(OPFieldModel, op_uri="op://vault/item/password")
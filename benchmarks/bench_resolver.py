@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from django_opfield.cache import secret_cache
+from django_opfield.resolver import resolve
+from django_opfield.resolver import resolve_many
+
+OP_URIS = [f"op://vault/item-{i}/password" for i in range(20)]
+
+
+def test_resolve(benchmark, opfield_settings):
+    result = benchmark(resolve, "op://vault/item/password")
+
+    assert result == "op://vault/item/password-secret"
+
+
+def test_resolve_many(benchmark, opfield_settings):
+    results = benchmark(resolve_many, OP_URIS)
+
+    assert len(results) == len(OP_URIS)
+
+
+def test_cache_hit(benchmark, opfield_settings):
+    opfield_settings(OP_SECRET_CACHE_TTL=300)
+    resolve("op://vault/item/password")
+
+    result = benchmark(resolve, "op://vault/item/password")
+
+    assert result == "op://vault/item/password-secret"
+
+
+def test_cache_miss(benchmark, opfield_settings):
+    opfield_settings(OP_SECRET_CACHE_TTL=300)
+
+    result = benchmark.pedantic(
+        resolve,
+        args=("op://vault/item/password",),
+        setup=secret_cache.clear,
+        rounds=20,
+    )
+
+    assert result == "op://vault/item/password-secret"
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from django_opfield.conf import app_settings
+from django_opfield.validators import OPURIValidator
+
+
+def test_validator(benchmark):
+    validator = OPURIValidator()
+
+    benchmark(validator, "op://vault/item/section/field")
+
+
+def test_validator_vaults(benchmark):
+    validator = OPURIValidator(vaults=[f"vault-{i}" for i in range(50)])
+
+    benchmark(validator, "op://vault-49/item/field")
+
+
+def test_app_settings_access(benchmark, opfield_settings):
+    def access():
+        return app_settings.OP_COMMAND_TIMEOUT
+
+    benchmark(access)
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+
+import pytest
+from django.conf import settings
+from django.test import override_settings
+
+from django_opfield.conf import OPFIELD_SETTINGS_NAME
+from tests.settings import DEFAULT_SETTINGS
+
+FAKE_OP = Path(__file__).parent / "bin" / "op"
+
+
+def pytest_configure(config):
+    logging.disable(logging.CRITICAL)
+
+    settings.configure(
+        **DEFAULT_SETTINGS,
+        INSTALLED_APPS=[
+            "django_opfield",
+            "tests",
+        ],
+    )
+
+
+@pytest.fixture
+def opfield_settings():
+    """Apply `DJANGO_OPFIELD` settings on top of ones using the fake `op` CLI."""
+    overrides = []
+
+    def apply(**options):
+        override = override_settings(
+            **{
+                OPFIELD_SETTINGS_NAME: {
+                    "OP_CLI_PATH": str(FAKE_OP),
+                    "OP_SERVICE_ACCOUNT_TOKEN": "token",
+                    **options,
+                }
+            }
+        )
+        override.enable()
+        overrides.append(override)
+
+    apply()
+    yield apply
+    while overrides:
+        overrides.pop().disable()
+
+
+@pytest.fixture(autouse=True)
+def clear_secret_cache():
+    from django_opfield.cache import secret_cache
+
+    secret_cache.clear()
+    yield
+    secret_cache.clear()
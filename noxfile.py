@@ -114,6 +114,25 @@ def coverage(session):
     session.run("python", "-m", "coverage", "report")
 
 
+@nox.session
+def benchmark(session):
+    session.install("django-opfield[dev] @ .")
+    # results are saved to .benchmarks/ and compared with the previous run
+    session.run(
+        "python",
+        "-m",
+        "pytest",
+        "benchmarks",
+        "--numprocesses=0",
+        "-p",
+        "no:randomly",
+        "--benchmark-autosave",
+        "--benchmark-compare",
+        "--benchmark-compare-fail=mean:25%",
+        *session.posargs,
+    )
+
+
 @nox.session
 def lint(session):
     session.install("django-opfield[lint] @ .")
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import logging
+import threading
+from collections.abc import Iterable
+from collections.abc import Sequence
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from typing import Any
+from urllib.parse import urlencode
+
+from django.contrib import admin
+from django.contrib import messages
+from django.core.exceptions import FieldDoesNotExist
+from django.core.exceptions import PermissionDenied
+from django.db import models
+from django.forms import Field
+from django.http import Http404
+from django.http import HttpRequest
+from django.http import JsonResponse
+from django.templatetags.static import static
+from django.urls import URLPattern
+from django.urls import path
+from django.urls import reverse
+from django.utils.functional import cached_property
+from django.utils.html import format_html
+
+from django_opfield.audit import submit_verify
+from django_opfield.backends import get_backend
+from django_opfield.cache import SecretCache
+from django_opfield.conf import app_settings
+from django_opfield.fields import OPField
+from django_opfield.index import secret_index
+from django_opfield.query import get_opfields
+from django_opfield.widgets import OPURIAutocompleteWidget
+
+logger = logging.getLogger(__name__)
+
+
+STATUS_ATTR = "_opfield_status"
+
+
+class OPFieldAdminMixin:
+    """ModelAdmin mixin for models with `OPField`s.
+
+    Autocompletes `op://` references from `django_opfield.index.secret_index`,
+    so typing into the field does not run `op`. Adds a "Secret status"
+    column to the changelist, checking the distinct references of the page
+    in one concurrent batch, within `opfield_status_timeout` seconds, and
+    caching the outcome for `opfield_status_ttl` seconds. Checks that take
+    longer keep running in the background and cache their outcome when they
+    finish, and are not started again meanwhile. The "Verify
+    secrets" action checks the selected rows again. Secret values are never
+    read where the backend can avoid it, and never rendered.
+
+    Place it before `ModelAdmin`:
+
+        @admin.register(MyModel)
+        class MyModelAdmin(OPFieldAdminMixin, admin.ModelAdmin): ...
+    """
+
+    opfield_autocomplete_limit = 20
+    opfield_status_timeout = 2.0  # in seconds
+    opfield_status_ttl = 60  # in seconds
+    # the number of failing references listed after running the action
+    opfield_verify_max_messages = 10
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        # the check running for each reference
+        self._opfield_checks: dict[str, Future[dict[str, str]]] = {}
+        self._opfield_checks_lock = threading.RLock()
+
+    @cached_property
+    def _opfield_status_cache(self) -> SecretCache:
+        return SecretCache(ttl=self.opfield_status_ttl, max_size=10_000)
+
+    @cached_property
+    def _opfield_executor(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(
+            max_workers=self._opfield_workers(),
+            thread_name_prefix="django-opfield-admin",
+        )
+
+    def _opfield_workers(self) -> int:
+        return max(int(app_settings.OP_MAX_WORKERS), 1)
+
+    def _opfield_checked(self, future: Future[dict[str, str]]) -> None:
+        with self._opfield_checks_lock:
+            for op_uri, check in list(self._opfield_checks.items()):
+                if check is future:
+                    del self._opfield_checks[op_uri]
+        if future.cancelled() or future.exception() is not None:
+            return
+        for op_uri, error in future.result().items():
+            self._opfield_status_cache.set(op_uri, error)
+
+    def _opfield_submit_checks(self, op_uris: list[str]) -> set[Future[dict[str, str]]]:
+        with self._opfield_checks_lock:
+            futures = {
+                self._opfield_checks[op_uri]
+                for op_uri in op_uris
+                if op_uri in self._opfield_checks
+            }
+            new = [op_uri for op_uri in op_uris if op_uri not in self._opfield_checks]
+            if not new:
+                return futures
+            submitted = submit_verify(
+                self._opfield_executor, get_backend(), new, self._opfield_workers()
+            )
+            for future, batch in submitted.items():
+                self._opfield_checks.update(dict.fromkeys(batch, future))
+                # caches the outcome even if nobody waits for it anymore
+                future.add_done_callback(self._opfield_checked)
+                futures.add(future)
+        return futures
+
+    def _opfields(self) -> list[OPField]:
+        return get_opfields(self.model)  # type: ignore[attr-defined]
+
+    def check_secrets(
+        self,
+        objs: Iterable[models.Model],
+        timeout: float | None = None,
+        refresh: bool = False,
+    ) -> dict[str, str | None]:
+        """Check the references of `objs` in one batch and attach the outcome to each.
+
+        Returns the error of each distinct reference, an empty string if it
+        resolves, or `None` if it could not be checked in time.
+        """
+        objs = list(objs)
+        opfields = self._opfields()
+        op_uris = {
+            str(op_uri)
+            for obj in objs
+            for opfield in opfields
+            if (op_uri := getattr(obj, opfield.attname))
+        }
+        cache = self._opfield_status_cache
+        errors: dict[str, str | None] = {}
+        pending: list[str] = []
+        for op_uri in op_uris:
+            error = None if refresh else cache.get(op_uri)
+            if error is None:
+                pending.append(op_uri)
+            else:
+                errors[op_uri] = error
+        if pending:
+            # references already being checked are waited on, not checked again
+            done, _ = wait(self._opfield_submit_checks(pending), timeout=timeout)
+            errors.update(dict.fromkeys(pending))
+            for future in done:
+                if future.exception() is None:
+                    for op_uri, error in future.result().items():
+                        if op_uri in errors:
+                            errors[op_uri] = error
+
+        for obj in objs:
+            obj.__dict__[STATUS_ATTR] = {
+                opfield.name: errors.get(str(op_uri))
+                for opfield in opfields
+                if (op_uri := getattr(obj, opfield.attname))
+            }
+        return errors
+
+    def get_list_display(self, request: HttpRequest) -> Sequence[Any]:
+        list_display = super().get_list_display(request)  # type: ignore[misc]
+        return [*list_display, "secret_status"]
+
+    def get_actions(self, request: HttpRequest) -> dict[str, Any]:
+        actions = super().get_actions(request)  # type: ignore[misc]
+        if self.actions is not None and "verify_secrets" not in actions:  # type: ignore[attr-defined]
+            action = self.get_action("verify_secrets")  # type: ignore[attr-defined]
+            if action is not None:
+                actions["verify_secrets"] = action
+        return actions
+
+    def get_changelist_instance(self, request: HttpRequest) -> Any:
+        changelist = super().get_changelist_instance(request)  # type: ignore[misc]
+        self.check_secrets(changelist.result_list, timeout=self.opfield_status_timeout)
+        return changelist
+
+    @admin.display(description="Secret status")
+    def secret_status(self, obj: models.Model) -> str:
+        statuses = obj.__dict__.get(STATUS_ATTR)
+        if not statuses:
+            return ""
+        if any(error is None for error in statuses.values()):
+            icon, title = "unknown", "Could not be checked in time"
+        elif any(statuses.values()):
+            icon = "no"
+            title = "; ".join(
+                f"{name}: {error}" for name, error in statuses.items() if error
+            )
+        else:
+            icon, title = "yes", "Resolvable"
+        return format_html(
+            '<img src="{}" alt="{}" title="{}">',
+            static(f"admin/img/icon-{icon}.svg"),
+            icon,
+            title,
+        )
+
+    @admin.action(description="Verify secrets")
+    def verify_secrets(
+        self, request: HttpRequest, queryset: models.QuerySet[Any]
+    ) -> None:
+        errors = self.check_secrets(queryset, refresh=True)
+        failed = {op_uri: error for op_uri, error in errors.items() if error}
+        if not failed:
+            self.message_user(  # type: ignore[attr-defined]
+                request, f"All {len(errors)} secret reference(s) resolve."
+            )
+            return
+        for op_uri in sorted(failed)[: self.opfield_verify_max_messages]:
+            self.message_user(request, f"{op_uri}: {failed[op_uri]}", messages.ERROR)  # type: ignore[attr-defined]
+        self.message_user(  # type: ignore[attr-defined]
+            request,
+            f"{len(failed)} of {len(errors)} secret reference(s) do not resolve.",
+            messages.WARNING,
+        )
+
+    def _opfield_url_name(self) -> str:
+        opts = self.opts  # type: ignore[attr-defined]
+        return f"{opts.app_label}_{opts.model_name}_opfield_autocomplete"
+
+    def get_urls(self) -> list[URLPattern]:
+        urls = [
+            path(
+                "opfield-autocomplete/",
+                self.admin_site.admin_view(self.opfield_autocomplete_view),  # type: ignore[attr-defined]
+                name=self._opfield_url_name(),
+            )
+        ]
+        return urls + super().get_urls()  # type: ignore[misc]
+
+    def formfield_for_dbfield(
+        self, db_field: models.Field[Any, Any], request: HttpRequest, **kwargs: Any
+    ) -> Field | None:
+        if isinstance(db_field, OPField) and "widget" not in kwargs:
+            url = reverse(
+                f"{self.admin_site.name}:{self._opfield_url_name()}"  # type: ignore[attr-defined]
+            )
+            query = urlencode({"field": db_field.name})
+            kwargs["widget"] = OPURIAutocompleteWidget(url=f"{url}?{query}")
+        return super().formfield_for_dbfield(db_field, request, **kwargs)  # type: ignore[misc]
+
+    def opfield_autocomplete_view(self, request: HttpRequest) -> JsonResponse:
+        if not (
+            self.has_add_permission(request)  # type: ignore[attr-defined]
+            or self.has_change_permission(request)  # type: ignore[attr-defined]
+        ):
+            raise PermissionDenied
+        try:
+            field = self.opts.get_field(request.GET.get("field", ""))  # type: ignore[attr-defined]
+        except FieldDoesNotExist:
+            field = None
+        if not isinstance(field, OPField):
+            raise Http404
+
+        try:
+            results = secret_index.suggest(
+                request.GET.get("term", ""),
+                vaults=field.vaults,
+                limit=self.opfield_autocomplete_limit,
+            )
+        except Exception:
+            logger.exception("Could not build the 1Password index")
+            results = []
+        return JsonResponse({"results": results})
@@ -1,9 +1,52 @@
 from __future__ import annotations
 
+import os
+import sys
+import threading
+
 from django.apps import AppConfig
 
+# management commands that serve requests, and so benefit from a warm cache
+SERVER_COMMANDS = {"runserver"}
+
+
+def _is_management_command() -> bool:
+    """Whether the process is running a management command other than a server."""
+    argv = sys.argv
+    if len(argv) < 2:
+        return False
+    program = os.path.basename(argv[0])
+    if program in {"manage.py", "django-admin", "django-admin.py"} or (
+        program == "__main__.py"
+        and argv[0].endswith(os.path.join("django", "__main__.py"))
+    ):
+        return argv[1] not in SERVER_COMMANDS
+    return False
+
 
 class DjangoOPFieldConfig(AppConfig):
     name = "django_opfield"
     label = "django_opfield"
     verbose_name = "Django OPField"
+
+    def ready(self) -> None:
+        from django_opfield.conf import app_settings
+
+        if app_settings.OP_CLI_PROBE:
+            app_settings.get_op_cli_version()
+
+        if app_settings.OP_WARM_ON_STARTUP and not _is_management_command():
+            from django_opfield.warm import warm_cache_in_background
+
+            # warm in a thread so startup is not blocked and the database is
+            # not queried during app initialization
+            threading.Thread(
+                target=warm_cache_in_background,
+                name="django-opfield-warm",
+                daemon=True,
+            ).start()
+
+        if app_settings.OP_CHANGE_POLL_INTERVAL:
+            from django_opfield.poller import ChangePoller
+
+            ChangePoller().start()
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from collections.abc import Iterator
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from dataclasses import asdict
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any
+
+from django.core.exceptions import ValidationError
+from django.db import DEFAULT_DB_ALIAS
+from django.db import models
+from django.db.models import Count
+
+from django_opfield.backends import get_backend
+from django_opfield.backends.base import BaseBackend
+from django_opfield.conf import app_settings
+from django_opfield.fields import OPField
+from django_opfield.validators import OPURIValidator
+from django_opfield.warm import iter_opfields
+
+OK = "ok"
+INVALID = "invalid"
+UNRESOLVABLE = "unresolvable"
+
+
+@dataclass
+class AuditEntry:
+    model: str
+    field: str
+    op_uri: str
+    rows: int
+    status: str
+    error: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.status == OK
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def _iter_uri_counts(
+    model: type[models.Model], opfield: OPField, using: str, chunk_size: int
+) -> Iterator[tuple[str, int]]:
+    queryset = (
+        model._base_manager.using(using)
+        .exclude(**{f"{opfield.attname}__isnull": True})
+        .exclude(**{opfield.attname: ""})
+        .values_list(opfield.attname)
+        .annotate(rows=Count("pk"))
+        .order_by()
+    )
+    for op_uri, rows in queryset.iterator(chunk_size=chunk_size):
+        yield str(op_uri), rows
+
+
+def _verify_batch(backend: BaseBackend, op_uris: list[str]) -> dict[str, str]:
+    results = dict.fromkeys(op_uris, "")
+    for op_uri, exc in backend.verify_many(op_uris).items():
+        results[op_uri] = str(exc) or type(exc).__name__
+    return results
+
+
+def submit_verify(
+    executor: ThreadPoolExecutor,
+    backend: BaseBackend,
+    op_uris: list[str],
+    workers: int,
+) -> dict[Future[dict[str, str]], list[str]]:
+    """Check `op_uris` with the backend's `verify_many`, in up to `workers` batches.
+
+    Returns the batch of URIs checked by each future. Each future's result
+    maps the URIs of its batch to their error, or an empty string if they
+    resolve.
+    """
+    # keep the references to one item in the same batch, so backends
+    # checking a whole item at a time fetch it once
+    batches: list[list[str]] = [[] for _ in range(workers)]
+    items: dict[tuple[str, str], int] = {}
+    for op_uri in op_uris:
+        match = OPURIValidator.op_regex.match(op_uri)
+        key = match.group("vault", "item") if match else ("", op_uri)
+        batches[items.setdefault(key, len(items) % workers)].append(op_uri)
+    return {
+        executor.submit(_verify_batch, backend, batch): batch
+        for batch in batches
+        if batch
+    }
+
+
+def _verify(
+    executor: ThreadPoolExecutor,
+    backend: BaseBackend,
+    op_uris: list[str],
+    workers: int,
+    timeout: float | None = None,
+) -> dict[str, str | None]:
+    futures = submit_verify(executor, backend, op_uris, workers)
+    done, _ = wait(futures, timeout=timeout)
+    results: dict[str, str | None] = dict.fromkeys(op_uris)
+    for future in done:
+        results.update(future.result())
+    return results
+
+
+def verify_uris(
+    op_uris: Iterable[str],
+    max_workers: int | None = None,
+    timeout: float | None = None,
+) -> dict[str, str | None]:
+    """Check concurrently that each of `op_uris` resolves.
+
+    Returns the error of each URI, an empty string if it resolves, or
+    `None` if its check did not finish within `timeout` seconds.
+    """
+    op_uris = list(dict.fromkeys(op_uris))
+    if not op_uris:
+        return {}
+    workers = max(int(max_workers or app_settings.OP_MAX_WORKERS), 1)
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        return _verify(executor, get_backend(), op_uris, workers, timeout)
+    finally:
+        # checks past the deadline finish in the background
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def audit(
+    using: str = DEFAULT_DB_ALIAS,
+    chunk_size: int = 1000,
+    max_workers: int | None = None,
+) -> Iterator[AuditEntry]:
+    """Check that every `op://` URI stored in an `OPField` column resolves.
+
+    The distinct URIs of each field are streamed from the database in chunks
+    of `chunk_size` and run through the field's validators again. Valid
+    URIs are then checked with the backend's `verify_many`, spread over at
+    most `max_workers` threads, defaulting to `OP_MAX_WORKERS`. A URI stored
+    in several fields is only checked with the backend once.
+
+    Yields an `AuditEntry` for each field and distinct URI. Only the outcome
+    of each URI is kept between chunks, so memory grows with the number of
+    distinct URIs rather than the number of rows.
+    """
+    backend = get_backend()
+    workers = max(int(max_workers or app_settings.OP_MAX_WORKERS), 1)
+    checked: dict[str, str | None] = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for model, opfield in iter_opfields():
+            uri_counts = _iter_uri_counts(model, opfield, using, chunk_size)
+            while chunk := list(islice(uri_counts, chunk_size)):
+                invalid: dict[str, str] = {}
+                for op_uri, _ in chunk:
+                    try:
+                        opfield.run_validators(op_uri)
+                    except ValidationError as exc:
+                        invalid[op_uri] = " ".join(exc.messages)
+
+                pending = [
+                    op_uri
+                    for op_uri, _ in chunk
+                    if op_uri not in invalid and op_uri not in checked
+                ]
+                if pending:
+                    checked.update(_verify(executor, backend, pending, workers))
+
+                for op_uri, rows in chunk:
+                    if op_uri in invalid:
+                        status, error = INVALID, invalid[op_uri]
+                    else:
+                        error = checked[op_uri] or ""
+                        status = UNRESOLVABLE if error else OK
+                    yield AuditEntry(
+                        model=model._meta.label,
+                        field=opfield.name,
+                        op_uri=op_uri,
+                        rows=rows,
+                        status=status,
+                        error=error,
+                    )
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import threading
+from typing import Any
+
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from django_opfield.backends.base import BaseBackend
+from django_opfield.conf import OPFIELD_SETTINGS_NAME
+from django_opfield.conf import app_settings
+
+_backend: BaseBackend | None = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> BaseBackend:
+    """Return the process-wide backend configured by the `OP_BACKEND` setting."""
+    global _backend
+    backend = _backend
+    if backend is not None:
+        return backend
+    with _backend_lock:
+        if _backend is None:
+            backend_cls = import_string(app_settings.OP_BACKEND)
+            options: dict[str, Any] = app_settings.OP_BACKEND_OPTIONS or {}
+            _backend = backend_cls(**options)
+        return _backend
+
+
+def reset_backend() -> None:
+    global _backend
+    with _backend_lock:
+        if _backend is not None:
+            _backend.close()
+        _backend = None
+
+
+@receiver(setting_changed)
+def _reset_backend(*, setting: str, **kwargs: Any) -> None:
+    if setting == OPFIELD_SETTINGS_NAME:
+        reset_backend()
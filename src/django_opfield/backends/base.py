@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import re
+from collections.abc import Callable
+from functools import cached_property
+from typing import TYPE_CHECKING
+from typing import Any
+
+from asgiref.sync import sync_to_async
+
+from django_opfield.validators import OPURIValidator
+
+if TYPE_CHECKING:
+    from django_opfield.breaker import CircuitBreaker
+
+# errors of `op`, Connect and the local backend for references to vaults,
+# items or fields that do not exist
+MISSING_REFERENCE_RE = re.compile(
+    r"isn't an? (?:vault|item|field)|not found|\b404\b", re.IGNORECASE
+)
+
+
+def is_missing_reference(exc: BaseException) -> bool:
+    """Whether `exc` reports a reference that does not exist, rather than an outage."""
+    return isinstance(exc, ValueError) and bool(MISSING_REFERENCE_RE.search(str(exc)))
+
+
+def find_item_field(
+    item: dict[str, Any], section: str | None, field: str
+) -> dict[str, Any] | None:
+    """Return the field of a 1Password item matching a reference, if any.
+
+    `item` is the JSON representation of an item, as returned by both
+    `op item get --format json` and the Connect API. Sections and fields
+    may be referenced by either ID or label.
+    """
+    # drop query parameters such as `?attribute=otp`
+    field = field.split("?", 1)[0]
+    section_ids = None
+    if section is not None:
+        section_ids = {
+            s["id"]
+            for s in item.get("sections", [])
+            if section in (s.get("id"), s.get("label"))
+        }
+    for item_field in item.get("fields", []):
+        if field not in (item_field.get("id"), item_field.get("label")):
+            continue
+        if (
+            section_ids is not None
+            and item_field.get("section", {}).get("id") not in section_ids
+        ):
+            continue
+        return item_field
+    return None
+
+
+def verify_items(
+    op_uris: list[str], get_item: Callable[[str, str], dict[str, Any]]
+) -> dict[str, Exception]:
+    """Check `op_uris` against their items, fetching each item only once.
+
+    `get_item(vault, item)` returns the JSON representation of an item and
+    raises if it cannot be found. Returns the errors of the references that
+    do not resolve.
+    """
+    groups: dict[tuple[str, str], list[tuple[str, str | None, str]]] = {}
+    errors: dict[str, Exception] = {}
+    for op_uri in op_uris:
+        match = OPURIValidator.op_regex.match(op_uri)
+        if not match:
+            errors[op_uri] = ValueError(
+                f"Could not read secret from 1Password: invalid reference {op_uri}"
+            )
+            continue
+        vault, item, section, field = match.group("vault", "item", "section", "field")
+        groups.setdefault((vault, item), []).append((op_uri, section, field))
+
+    for (vault, item), references in groups.items():
+        try:
+            data = get_item(vault, item)
+        except Exception as exc:
+            errors.update(dict.fromkeys((ref[0] for ref in references), exc))
+            continue
+        for op_uri, section, field in references:
+            if find_item_field(data, section, field) is None:
+                errors[op_uri] = ValueError(
+                    f"Could not read secret from 1Password: field '{field}' not found in {op_uri}"
+                )
+    return errors
+
+
+class BaseBackend:
+    """Base class for the backends that read secrets from 1Password.
+
+    Subclasses must implement `read`. The default `aread` runs `read` in a
+    worker thread; backends with a native asyncio client should override it.
+    Backends able to read several secrets in one call set
+    `supports_read_many` and implement `read_many`, which `resolve_many`
+    then uses instead of reading each secret separately.
+
+    `verify_many` checks that references resolve; backends able to do so
+    without fetching every secret value should override it. Backends that
+    can list vaults and items implement `list_vaults`, `list_items` and
+    `get_items`, which build the `django_opfield.index.secret_index`.
+    """
+
+    supports_read_many = False
+
+    def __init__(self, **options: Any) -> None:
+        self.options = options
+
+    @cached_property
+    def breaker(self) -> CircuitBreaker:
+        """The circuit breaker guarding calls to this backend."""
+        from django_opfield.breaker import CircuitBreaker
+
+        return CircuitBreaker()
+
+    def read(self, op_uri: str) -> str:
+        raise NotImplementedError(
+            "subclasses of BaseBackend must provide a read() method"
+        )
+
+    async def aread(self, op_uri: str) -> str:
+        return await sync_to_async(self.read, thread_sensitive=False)(op_uri)
+
+    def read_many(self, op_uris: list[str]) -> dict[str, str]:
+        """Read all of `op_uris`, raising if any of them cannot be read."""
+        return {op_uri: self.read(op_uri) for op_uri in op_uris}
+
+    async def aread_many(self, op_uris: list[str]) -> dict[str, str]:
+        return await sync_to_async(self.read_many, thread_sensitive=False)(op_uris)
+
+    def verify_many(self, op_uris: list[str]) -> dict[str, Exception]:
+        """Check that each of `op_uris` resolves, returning the errors of those that do not."""
+        errors: dict[str, Exception] = {}
+        for op_uri in op_uris:
+            try:
+                self.read(op_uri)
+            except Exception as exc:
+                errors[op_uri] = exc
+        return errors
+
+    def get_version(self, op_uri: str) -> Any:
+        """Return the version of the item `op_uri` references.
+
+        Used to revalidate cached secrets without reading them again.
+        Backends unable to tell return `None`, which disables revalidation.
+        """
+        return None
+
+    async def aget_version(self, op_uri: str) -> Any:
+        return await sync_to_async(self.get_version, thread_sensitive=False)(op_uri)
+
+    def list_vaults(self) -> list[dict[str, Any]]:
+        """Return the vaults visible to 1Password, each with an `id` and `name`."""
+        raise NotImplementedError(
+            "subclasses of BaseBackend must provide a list_vaults() method"
+        )
+
+    def list_items(self, vault: str) -> list[dict[str, Any]]:
+        """Return a summary of each item in `vault`, with its `id`, `title` and `version`."""
+        raise NotImplementedError(
+            "subclasses of BaseBackend must provide a list_items() method"
+        )
+
+    def get_items(self, vault: str, items: list[str]) -> list[dict[str, Any]]:
+        """Return the JSON representation, including fields, of `items` in `vault`."""
+        raise NotImplementedError(
+            "subclasses of BaseBackend must provide a get_items() method"
+        )
+
+    def close(self) -> None:
+        pass
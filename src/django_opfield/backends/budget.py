@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from collections.abc import Iterator
+from contextlib import asynccontextmanager
+from contextlib import contextmanager
+
+from django_opfield.conf import app_settings
+from django_opfield.metrics import get_metrics
+
+
+class _Waiter:
+    __slots__ = ("event", "future", "granted", "loop")
+
+    def __init__(
+        self,
+        event: threading.Event | None = None,
+        loop: asyncio.AbstractEventLoop | None = None,
+        future: asyncio.Future[None] | None = None,
+    ) -> None:
+        self.event = event
+        self.loop = loop
+        self.future = future
+        self.granted = False
+
+
+class ProcessWaitTimeout(TimeoutError):
+    """Raised after waiting `OP_PROCESS_WAIT_TIMEOUT` seconds to start an `op` process.
+
+    1Password itself was not called, so this is not a failure of 1Password.
+    """
+
+
+class ProcessBudget:
+    """Limits how many `op` processes run at once, across threads and event loops.
+
+    Callers over the `OP_MAX_PROCESSES` limit queue in arrival order, sync
+    and async alike, and raise `ProcessWaitTimeout` after waiting
+    `OP_PROCESS_WAIT_TIMEOUT` seconds. A limit of 0 leaves the number of
+    processes unbounded. After `back_off`, no new process starts until the
+    delay has passed, so every caller backs off together when 1Password is
+    rate limiting.
+    """
+
+    def __init__(self, limit: int | None = None) -> None:
+        self._limit = limit
+        self._lock = threading.Lock()
+        self._active = 0
+        self._waiters: deque[_Waiter] = deque()
+        self._resume_at = 0.0
+
+    @property
+    def limit(self) -> int:
+        if self._limit is not None:
+            return self._limit
+        return int(app_settings.OP_MAX_PROCESSES)
+
+    @property
+    def wait_timeout(self) -> float:
+        return float(app_settings.OP_PROCESS_WAIT_TIMEOUT)
+
+    @property
+    def active(self) -> int:
+        with self._lock:
+            return self._active
+
+    def _take(self) -> bool:
+        """Take a slot if one is free and nobody is queued for it."""
+        limit = self.limit
+        if limit <= 0 or (self._active < limit and not self._waiters):
+            self._active += 1
+            return True
+        return False
+
+    def back_off(self, delay: float) -> None:
+        """Hold back new processes for `delay` seconds."""
+        with self._lock:
+            self._resume_at = max(self._resume_at, time.monotonic() + delay)
+
+    def _pause(self) -> float:
+        with self._lock:
+            return max(self._resume_at - time.monotonic(), 0.0)
+
+    def acquire(self) -> None:
+        start = time.monotonic()
+        event = threading.Event()
+        with self._lock:
+            waiter = None if self._take() else _Waiter(event=event)
+            if waiter is not None:
+                self._waiters.append(waiter)
+        if waiter is not None and not event.wait(self.wait_timeout):
+            with self._lock:
+                if not waiter.granted:
+                    self._waiters.remove(waiter)
+                    raise self._timeout()
+        get_metrics().queue_wait(duration=time.monotonic() - start)
+
+    async def aacquire(self) -> None:
+        start = time.monotonic()
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[None] = loop.create_future()
+        with self._lock:
+            waiter = None if self._take() else _Waiter(loop=loop, future=future)
+            if waiter is not None:
+                self._waiters.append(waiter)
+        if waiter is not None:
+            try:
+                await asyncio.wait_for(future, self.wait_timeout)
+            except BaseException as exc:
+                with self._lock:
+                    granted = waiter.granted
+                    if not granted:
+                        self._waiters.remove(waiter)
+                if granted and future.done() and not future.cancelled():
+                    self.release()
+                # otherwise, if the slot was granted meanwhile, `_grant` passes
+                # it on
+                if isinstance(exc, asyncio.TimeoutError):
+                    raise self._timeout() from None
+                raise
+        get_metrics().queue_wait(duration=time.monotonic() - start)
+
+    def release(self) -> None:
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.granted = True
+                if waiter.event is not None:
+                    waiter.event.set()
+                    return
+                if waiter.loop is not None and not waiter.loop.is_closed():
+                    waiter.loop.call_soon_threadsafe(self._grant, waiter)
+                    return
+            self._active -= 1
+
+    def _grant(self, waiter: _Waiter) -> None:
+        if waiter.future is None or waiter.future.done():
+            # the waiter gave up before it was woken, pass the slot on
+            self.release()
+        else:
+            waiter.future.set_result(None)
+
+    def _timeout(self) -> ProcessWaitTimeout:
+        return ProcessWaitTimeout(
+            f"Timed out after {self.wait_timeout:g}s waiting to run the 'op' CLI, "
+            f"{self.limit} processes are already running"
+        )
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Hold a slot for one `op` process, waiting out any back-off first."""
+        self.acquire()
+        try:
+            if pause := self._pause():
+                time.sleep(pause)
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def aslot(self) -> AsyncIterator[None]:
+        """Async counterpart of `slot`."""
+        await self.aacquire()
+        try:
+            if pause := self._pause():
+                await asyncio.sleep(pause)
+            yield
+        finally:
+            self.release()
+
+
+process_budget = ProcessBudget()
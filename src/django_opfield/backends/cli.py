@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import re
+import secrets
+import subprocess
+import sys
+from typing import Any
+
+from django_opfield.backends.base import BaseBackend
+from django_opfield.backends.base import verify_items
+from django_opfield.backends.budget import process_budget
+from django_opfield.conf import app_settings
+from django_opfield.validators import OPURIValidator
+
+if sys.version_info >= (3, 12):
+    from typing import override
+else:
+    from typing_extensions import (
+        override,  # pyright: ignore[reportUnreachable]  # pragma: no cover
+    )
+
+
+RATE_LIMITED_RE = re.compile(r"too many requests|rate limit|\b429\b", re.IGNORECASE)
+
+
+def is_rate_limited(result: subprocess.CompletedProcess[bytes]) -> bool:
+    return result.returncode != 0 and bool(
+        RATE_LIMITED_RE.search(result.stderr.decode("utf-8", "replace"))
+    )
+
+
+def rate_limit_delay(attempt: int) -> float:
+    """Exponential back-off with jitter, so waiting callers do not retry in lockstep."""
+    delay = float(app_settings.OP_RATE_LIMIT_BACKOFF) * 2**attempt
+    return random.uniform(delay / 2, delay)  # noqa: S311
+
+
+class CLIBackend(BaseBackend):
+    """Reads secrets by running `op read` for each URI.
+
+    `read_many` resolves any number of URIs with a single `op inject`, and
+    `verify_many` checks references with one `op item get` per item rather
+    than reading each secret.
+
+    At most `OP_MAX_PROCESSES` `op` processes run at once in the process,
+    and commands failing because 1Password is rate limiting are retried up
+    to `OP_RATE_LIMIT_RETRIES` times.
+    """
+
+    supports_read_many = True
+
+    def run(
+        self, *args: str, stdin_data: bytes | None = None
+    ) -> subprocess.CompletedProcess[bytes]:
+        """Run the `op` CLI with `args`, raising `subprocess.TimeoutExpired` on timeout."""
+        retries = max(int(app_settings.OP_RATE_LIMIT_RETRIES), 0)
+        for attempt in range(retries + 1):
+            with process_budget.slot():
+                result = self._run(*args, stdin_data=stdin_data)
+            if attempt == retries or not is_rate_limited(result):
+                break
+            process_budget.back_off(rate_limit_delay(attempt))
+        return result
+
+    async def arun(
+        self, *args: str, stdin_data: bytes | None = None
+    ) -> subprocess.CompletedProcess[bytes]:
+        """Async counterpart of `run`, using an asyncio subprocess."""
+        retries = max(int(app_settings.OP_RATE_LIMIT_RETRIES), 0)
+        for attempt in range(retries + 1):
+            async with process_budget.aslot():
+                result = await self._arun(*args, stdin_data=stdin_data)
+            if attempt == retries or not is_rate_limited(result):
+                break
+            process_budget.back_off(rate_limit_delay(attempt))
+        return result
+
+    def _run(
+        self, *args: str, stdin_data: bytes | None = None
+    ) -> subprocess.CompletedProcess[bytes]:
+        op = app_settings.get_op_cli_path()
+        # call to check that the token is configured correctly
+        _ = app_settings.get_op_service_account_token()
+        kwargs: dict[str, Any] = {
+            "capture_output": True,
+            "timeout": app_settings.OP_COMMAND_TIMEOUT,
+        }
+        if stdin_data is not None:
+            kwargs["input"] = stdin_data
+        try:
+            return subprocess.run([op, *args], **kwargs)  # noqa: S603
+        except FileNotFoundError:
+            # the `op` binary moved since its path was cached, look it up again
+            app_settings.clear_op_cli_path()
+            op = app_settings.get_op_cli_path()
+            return subprocess.run([op, *args], **kwargs)  # noqa: S603
+
+    async def _arun(
+        self, *args: str, stdin_data: bytes | None = None
+    ) -> subprocess.CompletedProcess[bytes]:
+        op = app_settings.get_op_cli_path()
+        # call to check that the token is configured correctly
+        _ = app_settings.get_op_service_account_token()
+        op_timeout = app_settings.OP_COMMAND_TIMEOUT
+        stdin = asyncio.subprocess.PIPE if stdin_data is not None else None
+        kwargs: dict[str, Any] = {
+            "stdout": asyncio.subprocess.PIPE,
+            "stderr": asyncio.subprocess.PIPE,
+        }
+        if stdin is not None:
+            kwargs["stdin"] = stdin
+        try:
+            process = await asyncio.create_subprocess_exec(op, *args, **kwargs)
+        except FileNotFoundError:
+            # the `op` binary moved since its path was cached, look it up again
+            app_settings.clear_op_cli_path()
+            op = app_settings.get_op_cli_path()
+            process = await asyncio.create_subprocess_exec(op, *args, **kwargs)
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                process.communicate(stdin_data), timeout=op_timeout
+            )
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise subprocess.TimeoutExpired([op, *args], op_timeout) from None
+        return subprocess.CompletedProcess(
+            [op, *args], process.returncode or 0, stdout, stderr
+        )
+
+    @override
+    def read(self, op_uri: str) -> str:
+        result = self.run("read", op_uri)
+        if result.returncode != 0:
+            raise ValueError(
+                f"Could not read secret from 1Password: {result.stderr.decode('utf-8')}"
+            )
+        return result.stdout.decode("utf-8").strip()
+
+    @override
+    async def aread(self, op_uri: str) -> str:
+        result = await self.arun("read", op_uri)
+        if result.returncode != 0:
+            raise ValueError(
+                f"Could not read secret from 1Password: {result.stderr.decode('utf-8')}"
+            )
+        return result.stdout.decode("utf-8").strip()
+
+    def _inject_template(self, op_uris: list[str]) -> tuple[str, str]:
+        # delimit each value with a random marker, so values spanning several
+        # lines are parsed back unambiguously
+        marker = secrets.token_hex(8)
+        template = "".join(
+            f"{marker}:{i}:start\n{{{{ {op_uri} }}}}\n{marker}:{i}:end\n"
+            for i, op_uri in enumerate(op_uris)
+        )
+        return marker, template
+
+    def _parse_injected(
+        self,
+        op_uris: list[str],
+        marker: str,
+        result: subprocess.CompletedProcess[bytes],
+    ) -> dict[str, str]:
+        if result.returncode != 0:
+            raise ValueError(
+                f"Could not read secrets from 1Password: {result.stderr.decode('utf-8')}"
+            )
+        output = result.stdout.decode("utf-8")
+        values: dict[str, str] = {}
+        position = 0
+        for i, op_uri in enumerate(op_uris):
+            opening = f"{marker}:{i}:start\n"
+            start = output.find(opening, position)
+            end = output.find(f"\n{marker}:{i}:end\n", start)
+            if start == -1 or end == -1:
+                raise ValueError(
+                    f"Could not read secrets from 1Password: no value for {op_uri}"
+                )
+            values[op_uri] = output[start + len(opening) : end].strip()
+            position = end
+        return values
+
+    @override
+    def read_many(self, op_uris: list[str]) -> dict[str, str]:
+        marker, template = self._inject_template(op_uris)
+        result = self.run("inject", stdin_data=template.encode("utf-8"))
+        return self._parse_injected(op_uris, marker, result)
+
+    @override
+    async def aread_many(self, op_uris: list[str]) -> dict[str, str]:
+        marker, template = self._inject_template(op_uris)
+        result = await self.arun("inject", stdin_data=template.encode("utf-8"))
+        return self._parse_injected(op_uris, marker, result)
+
+    def _get_item(self, vault: str, item: str) -> dict[str, Any]:
+        result = self.run("item", "get", item, "--vault", vault, "--format", "json")
+        if result.returncode != 0:
+            raise ValueError(
+                f"Could not read secret from 1Password: {result.stderr.decode('utf-8')}"
+            )
+        return json.loads(result.stdout)
+
+    @override
+    def verify_many(self, op_uris: list[str]) -> dict[str, Exception]:
+        return verify_items(op_uris, self._get_item)
+
+    @override
+    def get_version(self, op_uri: str) -> Any:
+        match = OPURIValidator.op_regex.match(op_uri)
+        if not match:
+            return None
+        return self._get_item(*match.group("vault", "item")).get("version")
+
+    def _run_json(self, *args: str, stdin_data: bytes | None = None) -> str:
+        result = self.run(*args, "--format", "json", stdin_data=stdin_data)
+        if result.returncode != 0:
+            raise ValueError(
+                f"Could not list 1Password items: {result.stderr.decode('utf-8')}"
+            )
+        return result.stdout.decode("utf-8")
+
+    @override
+    def list_vaults(self) -> list[dict[str, Any]]:
+        return json.loads(self._run_json("vault", "list"))
+
+    @override
+    def list_items(self, vault: str) -> list[dict[str, Any]]:
+        return json.loads(self._run_json("item", "list", "--vault", vault))
+
+    @override
+    def get_items(self, vault: str, items: list[str]) -> list[dict[str, Any]]:
+        if not items:
+            return []
+        # `op item get -` fetches every item piped to it in a single process,
+        # writing one JSON object after another
+        stdin_data = json.dumps(
+            [{"id": item, "vault": {"id": vault}} for item in items]
+        ).encode("utf-8")
+        output = self._run_json("item", "get", "-", stdin_data=stdin_data)
+        decoder = json.JSONDecoder()
+        objects: list[dict[str, Any]] = []
+        position = 0
+        while True:
+            while position < len(output) and output[position].isspace():
+                position += 1
+            if position == len(output):
+                return objects
+            obj, position = decoder.raw_decode(output, position)
+            objects.append(obj)
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import http.client
+import json
+import sys
+import threading
+from typing import Any
+from urllib.parse import quote
+from urllib.parse import urlsplit
+
+from django.core.exceptions import ImproperlyConfigured
+
+from django_opfield.backends.base import BaseBackend
+from django_opfield.backends.base import find_item_field
+from django_opfield.backends.base import verify_items
+from django_opfield.conf import app_settings
+from django_opfield.validators import OPURIValidator
+
+if sys.version_info >= (3, 12):
+    from typing import override
+else:
+    from typing_extensions import (
+        override,  # pyright: ignore[reportUnreachable]  # pragma: no cover
+    )
+
+
+class ConnectBackend(BaseBackend):
+    """Reads secrets over HTTP from a 1Password Connect server.
+
+    Each thread keeps one keep-alive connection to the server, so a read
+    costs an HTTP round trip instead of spawning `op`. Vault and item names
+    are resolved to IDs once and remembered for the life of the backend.
+    The server is configured with the `OP_CONNECT_HOST` and
+    `OP_CONNECT_TOKEN` settings, or the `host` and `token` options.
+    """
+
+    def __init__(
+        self, host: str | None = None, token: str | None = None, **options: Any
+    ) -> None:
+        super().__init__(**options)
+        self._host = host
+        self._token = token
+        self._local = threading.local()
+        self._ids: dict[tuple[str, ...], str] = {}
+
+    @property
+    def host(self) -> str:
+        host = self._host or app_settings.OP_CONNECT_HOST
+        if not host:
+            raise ImproperlyConfigured("OP_CONNECT_HOST is not set")
+        return host
+
+    @property
+    def token(self) -> str:
+        token = self._token or app_settings.OP_CONNECT_TOKEN
+        if not token:
+            raise ImproperlyConfigured("OP_CONNECT_TOKEN is not set")
+        return token
+
+    def _connect(self) -> http.client.HTTPConnection:
+        url = urlsplit(self.host)
+        timeout = float(app_settings.OP_COMMAND_TIMEOUT)
+        if url.scheme == "https":
+            return http.client.HTTPSConnection(url.netloc, timeout=timeout)
+        return http.client.HTTPConnection(url.netloc, timeout=timeout)
+
+    def _request(self, path: str) -> Any:
+        for attempt in range(2):
+            conn = getattr(self._local, "conn", None)
+            if conn is None:
+                conn = self._local.conn = self._connect()
+            headers = {"Authorization": f"Bearer {self.token}"}
+            try:
+                conn.request("GET", path, headers=headers)
+                response = conn.getresponse()
+                body = response.read()
+            except Exception as exc:
+                # the connection may be left mid-request, e.g. after a
+                # timeout, so never reuse it
+                conn.close()
+                self._local.conn = None
+                if attempt or not isinstance(
+                    exc, (http.client.RemoteDisconnected, ConnectionError)
+                ):
+                    raise
+                # the server closed the keep-alive connection, retry once on a
+                # fresh one
+                continue
+            if response.status != 200:
+                raise ValueError(
+                    f"Could not read secret from 1Password: {response.status} {body.decode('utf-8')}"
+                )
+            return json.loads(body)
+        raise AssertionError("unreachable")  # pragma: no cover
+
+    def _lookup_id(self, key: tuple[str, ...], path: str, name: str, attr: str) -> str:
+        try:
+            return self._ids[key]
+        except KeyError:
+            pass
+        query = quote(f'{attr} eq "{name}"')
+        matches = self._request(f"{path}?filter={query}")
+        # references may use IDs instead of names
+        object_id = matches[0]["id"] if matches else name
+        self._ids[key] = object_id
+        return object_id
+
+    def _get_item(self, vault: str, item: str) -> dict[str, Any]:
+        vault_id = self._lookup_id((vault,), "/v1/vaults", vault, "name")
+        item_id = self._lookup_id(
+            (vault, item), f"/v1/vaults/{vault_id}/items", item, "title"
+        )
+        return self._request(f"/v1/vaults/{vault_id}/items/{item_id}")
+
+    @override
+    def read(self, op_uri: str) -> str:
+        match = OPURIValidator.op_regex.match(op_uri)
+        if not match:
+            raise ValueError(
+                f"Could not read secret from 1Password: invalid reference {op_uri}"
+            )
+        vault, item, section, field = match.group("vault", "item", "section", "field")
+
+        data = self._get_item(vault, item)
+        item_field = find_item_field(data, section, field)
+        if item_field is None:
+            raise ValueError(
+                f"Could not read secret from 1Password: field '{field}' not found in {op_uri}"
+            )
+        return str(item_field.get("value", ""))
+
+    @override
+    def verify_many(self, op_uris: list[str]) -> dict[str, Exception]:
+        """Fetch each referenced item once and check the referenced fields exist."""
+        return verify_items(op_uris, self._get_item)
+
+    @override
+    def get_version(self, op_uri: str) -> Any:
+        match = OPURIValidator.op_regex.match(op_uri)
+        if not match:
+            return None
+        return self._get_item(*match.group("vault", "item")).get("version")
+
+    @override
+    def list_vaults(self) -> list[dict[str, Any]]:
+        return self._request("/v1/vaults")
+
+    @override
+    def list_items(self, vault: str) -> list[dict[str, Any]]:
+        vault_id = self._lookup_id((vault,), "/v1/vaults", vault, "name")
+        return self._request(f"/v1/vaults/{vault_id}/items")
+
+    @override
+    def get_items(self, vault: str, items: list[str]) -> list[dict[str, Any]]:
+        vault_id = self._lookup_id((vault,), "/v1/vaults", vault, "name")
+        return [self._request(f"/v1/vaults/{vault_id}/items/{item}") for item in items]
+
+    @override
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
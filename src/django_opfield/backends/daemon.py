@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import importlib.util
+import itertools
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import IO
+from typing import Any
+
+from django_opfield.backends.base import BaseBackend
+from django_opfield.conf import app_settings
+
+if sys.version_info >= (3, 12):
+    from typing import override
+else:
+    from typing_extensions import (
+        override,  # pyright: ignore[reportUnreachable]  # pragma: no cover
+    )
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerProcess:
+    """A running `django_opfield.worker` process and its in-flight requests."""
+
+    def __init__(self, args: list[str], env: dict[str, str], token: str) -> None:
+        self.token = token
+        self.pid = os.getpid()
+        self.process = subprocess.Popen(  # noqa: S603
+            args,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            env=env,
+        )
+        self._stdin: IO[bytes] = self.process.stdin  # type: ignore[assignment]
+        self._stdout: IO[bytes] = self.process.stdout  # type: ignore[assignment]
+        self._ids = itertools.count(1)
+        self._pending: dict[int, Future[str]] = {}
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(
+            target=self._read_responses,
+            name="django-opfield-worker",
+            daemon=True,
+        )
+        self._thread.start()
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None and self._thread.is_alive()
+
+    def submit(self, op_uri: str) -> Future[str]:
+        future: Future[str] = Future()
+        with self._lock:
+            request_id = next(self._ids)
+            request = {"id": request_id, "op_uri": op_uri}
+            self._pending[request_id] = future
+            try:
+                self._stdin.write(json.dumps(request).encode("utf-8") + b"\n")
+                self._stdin.flush()
+            except (OSError, ValueError) as exc:
+                del self._pending[request_id]
+                raise RuntimeError(
+                    f"Could not send the request to the 1Password worker: {exc}"
+                ) from exc
+        return future
+
+    def _read_responses(self) -> None:
+        for line in self._stdout:
+            try:
+                response = json.loads(line)
+            except ValueError:
+                continue
+            with self._lock:
+                future = self._pending.pop(response.get("id"), None)
+            if future is None or not future.set_running_or_notify_cancel():
+                continue
+            if "error" in response:
+                future.set_exception(
+                    ValueError(
+                        f"Could not read secret from 1Password: {response['error']}"
+                    )
+                )
+            else:
+                future.set_result(response["value"])
+
+        # the worker exited, fail whatever it did not answer
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if future.set_running_or_notify_cancel():
+                future.set_exception(
+                    RuntimeError("The 1Password worker process exited unexpectedly")
+                )
+
+    def close(self) -> None:
+        with contextlib.suppress(OSError):
+            self._stdin.close()
+        try:
+            self.process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+class DaemonBackend(BaseBackend):
+    """Reads secrets through a long-lived worker process.
+
+    The worker, started on first use, handles any number of concurrent
+    requests over its stdin and stdout. With the `onepassword-sdk` package
+    installed (the `daemon` extra), it reads secrets through one 1Password
+    SDK client, authenticated once, so reads skip the `op` start-up and
+    authentication. Otherwise it runs `op read` for each request, outside
+    `OP_MAX_PROCESSES` and without the rate limit retries of `CLIBackend`.
+    The `engine` option (`"auto"`, `"sdk"` or `"cli"`) forces one or the
+    other; `"auto"` logs a warning when it falls back to `op read`. The
+    worker is restarted if it exits, if the service account token changes,
+    or in a forked child process.
+    """
+
+    supports_read_many = True
+
+    def __init__(
+        self, engine: str = "auto", max_concurrency: int = 8, **options: Any
+    ) -> None:
+        super().__init__(**options)
+        self.engine = engine
+        self.max_concurrency = max_concurrency
+        self._worker: WorkerProcess | None = None
+        self._lock = threading.Lock()
+
+    def _args(self) -> list[str]:
+        args = [
+            sys.executable,
+            "-m",
+            "django_opfield.worker",
+            "--engine",
+            self.engine,
+            "--timeout",
+            str(app_settings.OP_COMMAND_TIMEOUT),
+            "--max-concurrency",
+            str(self.max_concurrency),
+        ]
+        if self.engine != "sdk":
+            try:
+                args += ["--op", str(app_settings.get_op_cli_path())]
+            except RuntimeError:
+                if self.engine == "cli":
+                    raise
+        return args
+
+    def _env(self, token: str) -> dict[str, str]:
+        env = dict(os.environ)
+        env["OP_SERVICE_ACCOUNT_TOKEN"] = token
+        # let the worker import this package however it was installed
+        env["PYTHONPATH"] = os.pathsep.join(path for path in sys.path if path)
+        return env
+
+    def get_worker(self) -> WorkerProcess:
+        token = app_settings.get_op_service_account_token()
+        with self._lock:
+            worker = self._worker
+            if (
+                worker is not None
+                and worker.pid == os.getpid()
+                and worker.alive
+                and worker.token == token
+            ):
+                return worker
+            if worker is not None and worker.pid == os.getpid():
+                worker.close()
+            # checked without importing the SDK, which only the worker uses
+            if (
+                self.engine == "auto"
+                and importlib.util.find_spec("onepassword") is None
+            ):
+                logger.warning(
+                    "onepassword-sdk is not installed, so the 1Password worker "
+                    "runs `op read` for each secret, outside OP_MAX_PROCESSES. "
+                    "Install django-opfield[daemon], or set the `engine` option "
+                    'to "cli" to use it anyway.'
+                )
+            worker = self._worker = WorkerProcess(self._args(), self._env(token), token)
+            return worker
+
+    def _timeout_error(self, timeout: float) -> TimeoutError:
+        return TimeoutError(
+            f"Timed out after {timeout:g}s waiting for the 1Password worker"
+        )
+
+    @override
+    def read(self, op_uri: str) -> str:
+        timeout = float(app_settings.OP_COMMAND_TIMEOUT)
+        future = self.get_worker().submit(op_uri)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise self._timeout_error(timeout) from None
+
+    @override
+    async def aread(self, op_uri: str) -> str:
+        timeout = float(app_settings.OP_COMMAND_TIMEOUT)
+        future = self.get_worker().submit(op_uri)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            raise self._timeout_error(timeout) from None
+
+    @override
+    def read_many(self, op_uris: list[str]) -> dict[str, str]:
+        timeout = float(app_settings.OP_COMMAND_TIMEOUT)
+        worker = self.get_worker()
+        # pipeline all the requests before waiting for any of the responses
+        futures = {op_uri: worker.submit(op_uri) for op_uri in op_uris}
+        deadline = time.monotonic() + timeout
+        values: dict[str, str] = {}
+        try:
+            for op_uri, future in futures.items():
+                remaining = max(deadline - time.monotonic(), 0)
+                values[op_uri] = future.result(timeout=remaining)
+        except FutureTimeoutError:
+            raise self._timeout_error(timeout) from None
+        finally:
+            for future in futures.values():
+                future.cancel()
+        return values
+
+    @override
+    async def aread_many(self, op_uris: list[str]) -> dict[str, str]:
+        timeout = float(app_settings.OP_COMMAND_TIMEOUT)
+        worker = self.get_worker()
+        futures = [asyncio.wrap_future(worker.submit(op_uri)) for op_uri in op_uris]
+        try:
+            values = await asyncio.wait_for(asyncio.gather(*futures), timeout)
+        except asyncio.TimeoutError:
+            raise self._timeout_error(timeout) from None
+        return dict(zip(op_uris, values))
+
+    @override
+    def close(self) -> None:
+        with self._lock:
+            worker, self._worker = self._worker, None
+        if worker is not None and worker.pid == os.getpid():
+            worker.close()
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import hashlib
+import sys
+from typing import Any
+
+from django_opfield.backends.base import BaseBackend
+from django_opfield.validators import OPURIValidator
+
+if sys.version_info >= (3, 12):
+    from typing import override
+else:
+    from typing_extensions import (
+        override,  # pyright: ignore[reportUnreachable]  # pragma: no cover
+    )
+
+
+class LocMemBackend(BaseBackend):
+    """Serves secrets from an in-memory mapping of `op://` URI to value.
+
+    Intended for tests and local development, configured through the
+    `secrets` option:
+
+        DJANGO_OPFIELD = {
+            "OP_BACKEND": "django_opfield.backends.locmem.LocMemBackend",
+            "OP_BACKEND_OPTIONS": {"secrets": {"op://vault/item/field": "value"}},
+        }
+    """
+
+    def __init__(self, secrets: dict[str, str] | None = None, **options: Any) -> None:
+        super().__init__(**options)
+        self.secrets = dict(secrets or {})
+
+    @override
+    def read(self, op_uri: str) -> str:
+        try:
+            return self.secrets[op_uri]
+        except KeyError:
+            raise ValueError(
+                f"Could not read secret from 1Password: {op_uri} not found"
+            ) from None
+
+    @override
+    async def aread(self, op_uri: str) -> str:
+        return self.read(op_uri)
+
+    def _items(self) -> dict[str, dict[str, dict[str, Any]]]:
+        vaults: dict[str, dict[str, dict[str, Any]]] = {}
+        for op_uri in self.secrets:
+            match = OPURIValidator.op_regex.match(op_uri)
+            if not match:
+                continue
+            vault, item, section, field = match.group(
+                "vault", "item", "section", "field"
+            )
+            data = vaults.setdefault(vault, {}).setdefault(
+                item, {"id": item, "title": item, "sections": [], "fields": []}
+            )
+            item_field: dict[str, Any] = {"id": field, "label": field}
+            if section is not None:
+                item_field["section"] = {"id": section}
+                if {"id": section, "label": section} not in data["sections"]:
+                    data["sections"].append({"id": section, "label": section})
+            data["fields"].append(item_field)
+        for vault, items in vaults.items():
+            for item, data in items.items():
+                data["version"] = self._version(vault, item)
+        return vaults
+
+    def _version(self, vault: str, item: str) -> str:
+        # derived from the item's values, so changing a secret changes it
+        prefix = f"op://{vault}/{item}/"
+        digest = hashlib.sha256()
+        for op_uri in sorted(self.secrets):
+            if op_uri.startswith(prefix):
+                digest.update(f"{op_uri}={self.secrets[op_uri]}\n".encode())
+        return digest.hexdigest()[:16]
+
+    @override
+    def get_version(self, op_uri: str) -> Any:
+        match = OPURIValidator.op_regex.match(op_uri)
+        if not match or op_uri not in self.secrets:
+            raise ValueError(
+                f"Could not read secret from 1Password: {op_uri} not found"
+            )
+        return self._version(*match.group("vault", "item"))
+
+    @override
+    def list_vaults(self) -> list[dict[str, Any]]:
+        return [{"id": vault, "name": vault} for vault in self._items()]
+
+    @override
+    def list_items(self, vault: str) -> list[dict[str, Any]]:
+        return [
+            {"id": item["id"], "title": item["title"], "version": item["version"]}
+            for item in self._items().get(vault, {}).values()
+        ]
+
+    @override
+    def get_items(self, vault: str, items: list[str]) -> list[dict[str, Any]]:
+        vault_items = self._items().get(vault, {})
+        return [vault_items[item] for item in items if item in vault_items]
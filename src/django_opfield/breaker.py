@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from django_opfield.backends.base import is_missing_reference
+from django_opfield.backends.budget import ProcessWaitTimeout
+from django_opfield.conf import app_settings
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitOpenError(ValueError):
+    """Raised instead of calling a backend while its circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Fails fast while a backend keeps failing, instead of waiting on each call.
+
+    After `OP_CIRCUIT_BREAKER_THRESHOLD` consecutive failures, such as
+    timeouts or `op` exiting with an error, the circuit opens and calls
+    raise `CircuitOpenError` straight away. Once
+    `OP_CIRCUIT_BREAKER_RESET_TIMEOUT` seconds have passed, it is half-open:
+    a single call goes through as a probe, closing the circuit if it
+    succeeds and opening it again if it fails. References that do not exist
+    show 1Password is reachable, so they do not count as failures, and
+    timing out in the `OP_MAX_PROCESSES` queue never reached 1Password, so
+    it counts as neither. A threshold of 0 disables the breaker.
+    """
+
+    def __init__(
+        self, threshold: int | None = None, reset_timeout: float | None = None
+    ) -> None:
+        self._threshold = threshold
+        self._reset_timeout = reset_timeout
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def threshold(self) -> int:
+        if self._threshold is not None:
+            return self._threshold
+        return int(app_settings.OP_CIRCUIT_BREAKER_THRESHOLD)
+
+    @property
+    def reset_timeout(self) -> float:
+        if self._reset_timeout is not None:
+            return self._reset_timeout
+        return float(app_settings.OP_CIRCUIT_BREAKER_RESET_TIMEOUT)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if (
+                self._state == OPEN
+                and time.monotonic() - self._opened_at >= self.reset_timeout
+            ):
+                return HALF_OPEN
+            return self._state
+
+    def before_call(self) -> None:
+        """Raise `CircuitOpenError` unless a call to the backend may go ahead."""
+        if self.threshold <= 0:
+            return
+        with self._lock:
+            if self._state == CLOSED:
+                return
+            if self._state == OPEN:
+                remaining = self._opened_at + self.reset_timeout - time.monotonic()
+                if remaining > 0:
+                    raise CircuitOpenError(
+                        "Could not read secret from 1Password: too many failures, "
+                        f"not retrying for {remaining:.1f}s"
+                    )
+                self._state = HALF_OPEN
+            if self._probing:
+                raise CircuitOpenError(
+                    "Could not read secret from 1Password: too many failures, "
+                    "waiting for a probe to finish"
+                )
+            self._probing = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        threshold = self.threshold
+        if threshold <= 0:
+            return
+        with self._lock:
+            self._probing = False
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= threshold:
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+
+    def _release(self) -> None:
+        with self._lock:
+            self._probing = False
+
+    @contextmanager
+    def guard(self) -> Iterator[None]:
+        """Run the body as a call to the backend, recording its outcome."""
+        self.before_call()
+        try:
+            yield
+        except ProcessWaitTimeout:
+            # queued locally, 1Password was not called
+            self._release()
+            raise
+        except Exception as exc:
+            if is_missing_reference(exc):
+                self.record_success()
+            else:
+                self.record_failure()
+            raise
+        except BaseException:
+            # cancelled, so neither a success nor a failure
+            self._release()
+            raise
+        self.record_success()
+
+    def reset(self) -> None:
+        self.record_success()
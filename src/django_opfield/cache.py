@@ -0,0 +1,417 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Awaitable
+from collections.abc import Callable
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import BaseCache
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.crypto import salted_hmac
+
+from django_opfield.conf import app_settings
+
+
+def get_vault(op_uri: str) -> str:
+    return op_uri.removeprefix("op://").split("/", 1)[0]
+
+
+class SecretCache:
+    """A thread-safe, in-process TTL cache of resolved secrets.
+
+    Entries are keyed by `op://` URI and evicted least-recently-used once the
+    cache grows beyond `max_size`. Unless passed explicitly, `ttl` and
+    `max_size` are read from the `OP_SECRET_CACHE_TTL` and
+    `OP_SECRET_CACHE_MAX_SIZE` settings. A `ttl` of 0 disables the cache.
+
+    Expired entries are kept for a further `OP_SECRET_CACHE_STALE_TTL`
+    seconds, so the last known value can be served if 1Password is failing.
+    With `OP_SECRET_CACHE_REVALIDATE`, expired entries are kept until
+    evicted, so they can be revalidated against their item's current
+    version instead of read again. Entries stored without a version, such
+    as those read in bulk, are read again once and then stored with one.
+    """
+
+    def __init__(self, ttl: int | None = None, max_size: int | None = None) -> None:
+        self._ttl = ttl
+        self._max_size = max_size
+        self._entries: OrderedDict[str, tuple[str, float, Any]] = OrderedDict()
+        self._lock = threading.RLock()
+
+    @property
+    def ttl(self) -> float:
+        ttl = self._ttl if self._ttl is not None else app_settings.OP_SECRET_CACHE_TTL
+        return float(ttl)
+
+    @property
+    def max_size(self) -> int:
+        if self._max_size is not None:
+            return self._max_size
+        return int(app_settings.OP_SECRET_CACHE_MAX_SIZE)
+
+    @property
+    def refresh_ahead(self) -> float:
+        return float(app_settings.OP_SECRET_CACHE_REFRESH_AHEAD)
+
+    @property
+    def stale_ttl(self) -> float:
+        return float(app_settings.OP_SECRET_CACHE_STALE_TTL)
+
+    @property
+    def revalidate(self) -> bool:
+        return bool(app_settings.OP_SECRET_CACHE_REVALIDATE)
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def _discard_expired(self, op_uri: str) -> None:
+        # keep entries around to be revalidated
+        if not self.revalidate:
+            del self._entries[op_uri]
+
+    def get(self, op_uri: str) -> str | None:
+        with self._lock:
+            try:
+                value, expires_at, _ = self._entries[op_uri]
+            except KeyError:
+                return None
+            now = time.monotonic()
+            if expires_at <= now:
+                if expires_at + self.stale_ttl <= now:
+                    self._discard_expired(op_uri)
+                return None
+            self._entries.move_to_end(op_uri)
+            return value
+
+    def get_stale(self, op_uri: str) -> str | None:
+        """Return the cached value, even if expired, while within the stale grace window."""
+        with self._lock:
+            try:
+                value, expires_at, _ = self._entries[op_uri]
+            except KeyError:
+                return None
+            if expires_at + self.stale_ttl <= time.monotonic():
+                self._discard_expired(op_uri)
+                return None
+            return value
+
+    def get_versioned(self, op_uri: str) -> tuple[str, Any] | None:
+        """Return the cached value and its item's version, even if expired.
+
+        The version is `None` if the entry was stored without one. Returns
+        `None` if nothing is cached for `op_uri`.
+        """
+        with self._lock:
+            try:
+                value, _, version = self._entries[op_uri]
+            except KeyError:
+                return None
+            return value, version
+
+    def needs_refresh(self, op_uri: str) -> bool:
+        """Whether the entry expires within the `OP_SECRET_CACHE_REFRESH_AHEAD` window."""
+        refresh_ahead = self.refresh_ahead
+        if refresh_ahead <= 0:
+            return False
+        with self._lock:
+            try:
+                _, expires_at, _ = self._entries[op_uri]
+            except KeyError:
+                return False
+        return expires_at - time.monotonic() <= refresh_ahead
+
+    def set(self, op_uri: str, value: str, version: Any = None) -> None:
+        ttl = self.ttl
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[op_uri] = (value, time.monotonic() + ttl, version)
+            self._entries.move_to_end(op_uri)
+            while len(self._entries) > max(self.max_size, 0):
+                self._entries.popitem(last=False)
+
+    def invalidate(self, op_uri: str) -> bool:
+        with self._lock:
+            return self._entries.pop(op_uri, None) is not None
+
+    def invalidate_vault(self, vault: str) -> int:
+        with self._lock:
+            stale = [uri for uri in self._entries if get_vault(uri) == vault]
+            for uri in stale:
+                del self._entries[uri]
+            return len(stale)
+
+    def vaults(self) -> set[str]:
+        """Return the vaults referenced by the cached entries."""
+        with self._lock:
+            return {get_vault(uri) for uri in self._entries}
+
+    def invalidate_item(self, vault: str, item: str) -> list[str]:
+        """Invalidate the entries referencing `item` in `vault`, returning their URIs."""
+        prefix = f"op://{vault}/{item}/"
+        with self._lock:
+            stale = [uri for uri in self._entries if uri.startswith(prefix)]
+            for uri in stale:
+                del self._entries[uri]
+            return stale
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __contains__(self, op_uri: object) -> bool:
+        return isinstance(op_uri, str) and self.get(op_uri) is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class NegativeCache(SecretCache):
+    """Remembers the errors of references that do not exist, for `OP_NEGATIVE_CACHE_TTL` seconds.
+
+    Reading such a reference again raises the remembered error straight
+    away instead of calling 1Password.
+    """
+
+    @property
+    def ttl(self) -> float:
+        ttl = self._ttl if self._ttl is not None else app_settings.OP_NEGATIVE_CACHE_TTL
+        return float(ttl)
+
+    @property
+    def stale_ttl(self) -> float:
+        return 0.0
+
+
+negative_cache = NegativeCache()
+
+
+class SharedSecretCache:
+    """A secret cache shared between processes, stored in a Django cache.
+
+    Values are encrypted with Fernet using a key derived from the
+    `OP_SHARED_CACHE_KEY` setting, falling back to `SECRET_KEY`, and expire
+    after `OP_SHARED_CACHE_TTL` seconds. The cache alias is set with
+    `OP_SHARED_CACHE_ALIAS`; leaving it empty disables the shared cache.
+    Requires the `cryptography` package.
+
+    Keys are hashed, so entries cannot be listed. Instead, each key includes
+    a generation for all entries and one for the entry's vault, and
+    `invalidate_vault` and `clear` replace the generation, orphaning the
+    entries until they expire.
+    """
+
+    key_prefix = "django_opfield:secret:"
+    generation_prefix = "django_opfield:generation:"
+
+    def __init__(self) -> None:
+        self._fernets: dict[str, Any] = {}
+
+    @property
+    def alias(self) -> str:
+        return app_settings.OP_SHARED_CACHE_ALIAS
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.alias)
+
+    @property
+    def cache(self) -> BaseCache:
+        return caches[self.alias]
+
+    @property
+    def ttl(self) -> float:
+        return float(app_settings.OP_SHARED_CACHE_TTL)
+
+    def _get_fernet(self) -> Any:
+        secret = app_settings.OP_SHARED_CACHE_KEY or settings.SECRET_KEY
+        try:
+            return self._fernets[secret]
+        except KeyError:
+            pass
+        try:
+            from cryptography.fernet import Fernet
+        except ImportError as exc:
+            raise ImproperlyConfigured(
+                "The shared secret cache requires the 'cryptography' package, "
+                "install it with 'django-opfield[shared-cache]'"
+            ) from exc
+        digest = salted_hmac(
+            "django_opfield.cache.SharedSecretCache",
+            b"",
+            secret=secret,
+            algorithm="sha256",
+        ).digest()
+        fernet = self._fernets[secret] = Fernet(base64.urlsafe_b64encode(digest))
+        return fernet
+
+    def _generation_keys(self, op_uri: str) -> list[str]:
+        vault = hashlib.sha256(get_vault(op_uri).encode("utf-8")).hexdigest()
+        return [f"{self.generation_prefix}all", f"{self.generation_prefix}{vault}"]
+
+    def _make_key(self, op_uri: str, generations: dict[str, Any]) -> str:
+        keys = self._generation_keys(op_uri)
+        generation = ".".join(str(generations.get(key, 0)) for key in keys)
+        # hash the URI so references are not exposed in the cache backend
+        digest = hashlib.sha256(op_uri.encode("utf-8")).hexdigest()
+        return f"{self.key_prefix}{generation}:{digest}"
+
+    def make_key(self, op_uri: str) -> str:
+        generations = self.cache.get_many(self._generation_keys(op_uri))
+        return self._make_key(op_uri, generations)
+
+    async def amake_key(self, op_uri: str) -> str:
+        generations = await self.cache.aget_many(self._generation_keys(op_uri))
+        return self._make_key(op_uri, generations)
+
+    def _new_generation(self, key: str) -> None:
+        self.cache.set(key, uuid.uuid4().hex, timeout=None)
+
+    def _decrypt(self, token: bytes | None) -> str | None:
+        if token is None:
+            return None
+        from cryptography.fernet import InvalidToken
+
+        try:
+            return self._get_fernet().decrypt(token).decode("utf-8")
+        except InvalidToken:
+            # written with a different key, treat it as a miss
+            return None
+
+    def _encrypt(self, value: str) -> bytes:
+        return self._get_fernet().encrypt(value.encode("utf-8"))
+
+    def get(self, op_uri: str) -> str | None:
+        return self._decrypt(self.cache.get(self.make_key(op_uri)))
+
+    def set(self, op_uri: str, value: str) -> None:
+        self.cache.set(self.make_key(op_uri), self._encrypt(value), timeout=self.ttl)
+
+    def invalidate(self, op_uri: str) -> None:
+        self.cache.delete(self.make_key(op_uri))
+
+    def invalidate_vault(self, vault: str) -> None:
+        self._new_generation(self._generation_keys(f"op://{vault}/")[1])
+
+    def clear(self) -> None:
+        self._new_generation(f"{self.generation_prefix}all")
+
+    def get_or_set(self, op_uri: str, read: Callable[[str], str]) -> str:
+        """Return the cached secret, or read it while holding a per-URI lock.
+
+        Other processes missing the same URI at the same time wait for the
+        lock holder's result instead of all calling 1Password.
+        """
+        value = self.get(op_uri)
+        if value is not None:
+            return value
+
+        key = self.make_key(op_uri)
+        lock_key = f"{key}:lock"
+        lock_timeout = float(app_settings.OP_COMMAND_TIMEOUT) + 1
+        if self.cache.add(lock_key, 1, timeout=lock_timeout):
+            try:
+                value = read(op_uri)
+                self.set(op_uri, value)
+                return value
+            finally:
+                self.cache.delete(lock_key)
+
+        deadline = time.monotonic() + lock_timeout
+        delay = 0.01
+        while time.monotonic() < deadline:
+            time.sleep(delay)
+            delay = min(delay * 2, 0.25)
+            value = self.get(op_uri)
+            if value is not None:
+                return value
+            if self.cache.get(lock_key) is None:
+                # the lock holder failed to read the secret
+                break
+
+        value = read(op_uri)
+        self.set(op_uri, value)
+        return value
+
+    async def aget_or_set(
+        self, op_uri: str, read: Callable[[str], Awaitable[str]]
+    ) -> str:
+        """Async counterpart of `get_or_set`."""
+        key = await self.amake_key(op_uri)
+        value = self._decrypt(await self.cache.aget(key))
+        if value is not None:
+            return value
+
+        lock_key = f"{key}:lock"
+        lock_timeout = float(app_settings.OP_COMMAND_TIMEOUT) + 1
+        if await self.cache.aadd(lock_key, 1, timeout=lock_timeout):
+            try:
+                value = await read(op_uri)
+                await self.cache.aset(key, self._encrypt(value), timeout=self.ttl)
+                return value
+            finally:
+                await self.cache.adelete(lock_key)
+
+        deadline = time.monotonic() + lock_timeout
+        delay = 0.01
+        while time.monotonic() < deadline:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.25)
+            value = self._decrypt(await self.cache.aget(key))
+            if value is not None:
+                return value
+            if await self.cache.aget(lock_key) is None:
+                # the lock holder failed to read the secret
+                break
+
+        value = await read(op_uri)
+        await self.cache.aset(key, self._encrypt(value), timeout=self.ttl)
+        return value
+
+
+shared_secret_cache = SharedSecretCache()
+
+
+class ResolvedSecretCache(SecretCache):
+    """The in-process cache of resolved secrets.
+
+    Invalidating entries also invalidates them in the shared cache, if
+    enabled, so they are not read back from it.
+    """
+
+    def invalidate(self, op_uri: str) -> bool:
+        invalidated = super().invalidate(op_uri)
+        if shared_secret_cache.enabled:
+            shared_secret_cache.invalidate(op_uri)
+        return invalidated
+
+    def invalidate_vault(self, vault: str) -> int:
+        invalidated = super().invalidate_vault(vault)
+        if shared_secret_cache.enabled:
+            shared_secret_cache.invalidate_vault(vault)
+        return invalidated
+
+    def invalidate_item(self, vault: str, item: str) -> list[str]:
+        invalidated = super().invalidate_item(vault, item)
+        if shared_secret_cache.enabled:
+            for op_uri in invalidated:
+                shared_secret_cache.invalidate(op_uri)
+        return invalidated
+
+    def clear(self) -> None:
+        super().clear()
+        if shared_secret_cache.enabled:
+            shared_secret_cache.clear()
+
+
+secret_cache = ResolvedSecretCache()
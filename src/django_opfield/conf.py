@@ -2,13 +2,17 @@ from __future__ import annotations
 
 import os
 import shutil
+import subprocess
 import sys
 from dataclasses import dataclass
+from dataclasses import field
 from pathlib import Path
 from typing import Any
 
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 
 if sys.version_info >= (3, 12):
     from typing import override
@@ -36,13 +40,73 @@ class AppSettings:
     OP_COMMAND_TIMEOUT: int = 5  # in seconds
     OP_CLI_PATH: str = ""
     OP_SERVICE_ACCOUNT_TOKEN: str = ""
+    OP_SECRET_CACHE_TTL: int = 0  # in seconds, 0 disables the cache
+    OP_SECRET_CACHE_MAX_SIZE: int = 128
+    OP_SECRET_CACHE_REFRESH_AHEAD: int = 0  # in seconds, 0 disables refreshing
+    OP_SECRET_CACHE_STALE_TTL: int = 0  # in seconds
+    OP_SECRET_CACHE_REVALIDATE: bool = False
+    OP_MAX_WORKERS: int = 8
+    OP_BACKEND: str = "django_opfield.backends.cli.CLIBackend"
+    OP_BACKEND_OPTIONS: dict[str, Any] = field(default_factory=dict)
+    OP_CONNECT_HOST: str = ""
+    OP_CONNECT_TOKEN: str = ""
+    OP_CLI_PROBE: bool = False
+    OP_WARM_ON_STARTUP: bool = False
+    OP_SHARED_CACHE_ALIAS: str = ""  # empty disables the shared cache
+    OP_SHARED_CACHE_TTL: int = 300  # in seconds
+    OP_SHARED_CACHE_KEY: str = ""  # defaults to settings.SECRET_KEY
+    OP_METRICS_BACKEND: str = ""
+    OP_NPLUSONE_THRESHOLD: int = 0  # 0 disables the N+1 detector
+    OP_NPLUSONE_RAISE: bool = False
+    OP_MAX_PROCESSES: int = 0  # 0 leaves the number of `op` processes unbounded
+    OP_PROCESS_WAIT_TIMEOUT: int = 5  # in seconds
+    OP_RATE_LIMIT_RETRIES: int = 0
+    OP_RATE_LIMIT_BACKOFF: float = 1.0  # in seconds, doubled on each retry
+    OP_CIRCUIT_BREAKER_THRESHOLD: int = 0  # consecutive failures, 0 disables it
+    OP_CIRCUIT_BREAKER_RESET_TIMEOUT: int = 30  # in seconds
+    OP_NEGATIVE_CACHE_TTL: int = 0  # in seconds, 0 disables the negative cache
+    OP_INDEX_TTL: int = 300  # in seconds
+    OP_INDEX_CACHE_ALIAS: str = ""  # empty keeps the index in memory only
+    OP_CHANGE_POLL_INTERVAL: int = 0  # in seconds, 0 disables polling
+    OP_CHANGE_SOURCE: str = "django_opfield.poller.ItemListSource"
+    _cache: dict[str, Any] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
 
     @override
     def __getattribute__(self, __name: str) -> Any:
+        if __name.startswith("_") or not __name.isupper():
+            return super().__getattribute__(__name)
+        cache = super().__getattribute__("_cache")
+        try:
+            return cache[__name]
+        except KeyError:
+            pass
         user_setting = _get_user_setting(__name)
-        return user_setting or super().__getattribute__(__name)
+        value = user_setting or super().__getattribute__(__name)
+        cache[__name] = value
+        return value
+
+    def reload(self) -> None:
+        """Forget the resolved settings, so they are read again on next access.
+
+        Called automatically when the `DJANGO_OPFIELD` setting changes, e.g.
+        with `override_settings`. Call it after changing the environment
+        variables of a running process.
+        """
+        self._cache.clear()
 
     def get_op_cli_path(self) -> Path:
+        """Return the resolved path to the `op` CLI.
+
+        The path is looked up and verified once, then cached until the
+        settings are reloaded or `clear_op_cli_path` is called.
+        """
+        try:
+            return self._cache["_op_cli_path"]
+        except KeyError:
+            pass
+
         path: str | None = None
 
         if user_cli_path := self.OP_CLI_PATH:
@@ -53,7 +117,44 @@ class AppSettings:
         if not path:
             raise RuntimeError("Could not find the 'op' CLI command")
 
-        return Path(path).resolve()
+        resolved = Path(path).resolve()
+
+        if not resolved.is_file() or not os.access(resolved, os.X_OK):
+            raise RuntimeError(
+                f"The 'op' CLI command at '{resolved}' is not executable"
+            )
+
+        self._cache["_op_cli_path"] = resolved
+        return resolved
+
+    def clear_op_cli_path(self) -> None:
+        self._cache.pop("_op_cli_path", None)
+        self._cache.pop("_op_cli_version", None)
+
+    def get_op_cli_version(self) -> str:
+        """Run `op --version` to check the CLI can be executed, caching the result."""
+        try:
+            return self._cache["_op_cli_version"]
+        except KeyError:
+            pass
+
+        op = self.get_op_cli_path()
+        try:
+            result = subprocess.run(  # noqa: S603
+                [op, "--version"],
+                capture_output=True,
+                timeout=self.OP_COMMAND_TIMEOUT,
+            )
+        except (OSError, subprocess.TimeoutExpired) as exc:
+            raise RuntimeError(f"Could not run the 'op' CLI command: {exc}") from exc
+        if result.returncode != 0:
+            raise RuntimeError(
+                f"Could not run the 'op' CLI command: {result.stderr.decode('utf-8')}"
+            )
+
+        version = result.stdout.decode("utf-8").strip()
+        self._cache["_op_cli_version"] = version
+        return version
 
     def get_op_service_account_token(self) -> str:
         token = self.OP_SERVICE_ACCOUNT_TOKEN
@@ -65,3 +166,9 @@ class AppSettings:
 
 
 app_settings = AppSettings()
+
+
+@receiver(setting_changed)
+def _reload_settings(*, setting: str, **kwargs: Any) -> None:
+    if setting == OPFIELD_SETTINGS_NAME:
+        app_settings.reload()
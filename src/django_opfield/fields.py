@@ -1,12 +1,14 @@
 from __future__ import annotations
 
-import subprocess
 import sys
 from typing import Any
 
 from django.db import models
 
-from django_opfield.conf import app_settings
+from django_opfield.nplusone import record_access
+from django_opfield.resolver import aresolve
+from django_opfield.resolver import resolve
+from django_opfield.uri import OPURI
 from django_opfield.validators import OPURIValidator
 
 if sys.version_info >= (3, 12):
@@ -16,6 +18,28 @@ else:
         override,  # pyright: ignore[reportUnreachable]  # pragma: no cover
     )
 
+PREFETCHED_SECRETS_ATTR = "_opfield_secrets"
+
+
+def _missing_reference(field: OPField) -> ValueError:
+    return ValueError(
+        f"Could not read secret from 1Password: no reference in '{field.name}'"
+    )
+
+
+async def aget_secret(self: models.Model, field_name: str) -> str | None:
+    field = self._meta.get_field(field_name)
+    if not isinstance(field, OPField):
+        raise ValueError(f"'{field_name}' is not an OPField")
+    op_uri = getattr(self, field.attname)
+    if not op_uri:
+        raise _missing_reference(field)
+    prefetched = self.__dict__.get(PREFETCHED_SECRETS_ATTR)
+    if prefetched and op_uri in prefetched:
+        return prefetched[op_uri]
+    record_access(op_uri, field)
+    return await aresolve(op_uri, field)
+
 
 class OPField(models.CharField):
     description = "1Password secret"
@@ -25,36 +49,34 @@ class OPField(models.CharField):
         vaults: list[str] | None = None,
         secret_name: str | None = None,
         *args: Any,
+        parse_uri: bool = False,
+        verify: bool = False,
         **kwargs: Any,
     ) -> None:
         self.vaults = vaults
         self.secret_name = secret_name
+        self.parse_uri = parse_uri
+        self.verify = verify
         kwargs.setdefault("max_length", 255)
         super().__init__(*args, **kwargs)
-        self.validators.append(OPURIValidator(vaults=self.vaults))
+        self.validators.append(OPURIValidator(vaults=self.vaults, verify=verify))
 
     @override
     def contribute_to_class(
         self, cls: type[models.Model], name: str, private_only: bool = False
     ):
         super().contribute_to_class(cls, name, private_only)
+        field = self
 
         def get_secret(self: models.Model) -> str | None:
-            op = app_settings.get_op_cli_path()
             op_uri = getattr(self, name)
-            # call to check that the token is configured correctly
-            _ = app_settings.get_op_service_account_token()
-            op_timeout = app_settings.OP_COMMAND_TIMEOUT
-            result = subprocess.run(  # noqa: S603
-                [op, "read", op_uri],
-                capture_output=True,
-                timeout=op_timeout,
-            )
-            if result.returncode != 0:
-                raise ValueError(
-                    f"Could not read secret from 1Password: {result.stderr.decode('utf-8')}"
-                )
-            return result.stdout.decode("utf-8").strip()
+            if not op_uri:
+                raise _missing_reference(field)
+            prefetched = self.__dict__.get(PREFETCHED_SECRETS_ATTR)
+            if prefetched and op_uri in prefetched:
+                return prefetched[op_uri]
+            record_access(op_uri, field)
+            return resolve(op_uri, field)
 
         def set_secret(self: models.Model, value: str) -> None:
             raise NotImplementedError("OPField does not support setting secret value")
@@ -65,9 +87,31 @@ class OPField(models.CharField):
 
         setattr(cls, property_name, property(get_secret, set_secret))
 
+        if not hasattr(cls, "aget_secret"):
+            cls.aget_secret = aget_secret  # type: ignore[attr-defined]
+
+    def from_db_value(
+        self, value: str | None, expression: Any, connection: Any
+    ) -> OPURI | None:
+        if value is None:
+            return value
+        return OPURI(value)
+
+    @override
+    def get_db_converters(self, connection: Any) -> list[Any]:
+        converters = super().get_db_converters(connection)
+        if not self.parse_uri:
+            # skip the per-row conversion entirely when plain strings are wanted
+            converters = [c for c in converters if c != self.from_db_value]
+        return converters
+
     @override
     def deconstruct(self):
         name, path, args, kwargs = super().deconstruct()
         if self.vaults is not None:
             kwargs["vaults"] = self.vaults
+        if self.parse_uri:
+            kwargs["parse_uri"] = True
+        if self.verify:
+            kwargs["verify"] = True
         return name, path, args, kwargs
@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from django_opfield.backends import get_backend
+from django_opfield.backends.base import BaseBackend
+from django_opfield.conf import OPFIELD_SETTINGS_NAME
+from django_opfield.conf import app_settings
+from django_opfield.validators import OPURIValidator
+
+
+@dataclass
+class _Lookup:
+    # vault name or ID -> vault IDs
+    vaults: dict[str, set[str]] = field(default_factory=dict)
+    # (vault ID, item title or ID) -> item IDs
+    items: dict[tuple[str, str], set[str]] = field(default_factory=dict)
+    # (item ID, section label or ID, field label or ID)
+    references: set[tuple[str, str | None, str]] = field(default_factory=set)
+
+
+def _item_fields(item: dict[str, Any]) -> list[list[str | None]]:
+    # keep only the IDs and labels, never the values
+    sections = {s.get("id"): s.get("label") for s in item.get("sections", [])}
+    fields: list[list[str | None]] = []
+    for item_field in item.get("fields", []):
+        section_id = (item_field.get("section") or {}).get("id")
+        fields.append(
+            [
+                section_id,
+                sections.get(section_id),
+                item_field.get("id"),
+                item_field.get("label"),
+            ]
+        )
+    return fields
+
+
+class SecretIndex:
+    """An index of the vaults, items and fields visible to 1Password.
+
+    Built from the backend's `list_vaults`, `list_items` and `get_items`, it
+    answers whether a reference exists, and suggests references, without
+    calling 1Password. Once older than `OP_INDEX_TTL` seconds it is
+    refreshed incrementally: each vault's items are listed and only those
+    whose version changed are fetched again. Secret values are never kept.
+
+    When `OP_INDEX_CACHE_ALIAS` is set, the index is stored in that Django
+    cache and shared between processes.
+    """
+
+    cache_key = "django_opfield:index"
+
+    def __init__(self) -> None:
+        self._vaults: dict[str, dict[str, Any]] = {}
+        self._refreshed_at: float | None = None
+        self._lookup: _Lookup | None = None
+        self._lock = threading.RLock()
+
+    @property
+    def ttl(self) -> float:
+        return float(app_settings.OP_INDEX_TTL)
+
+    @property
+    def alias(self) -> str:
+        return app_settings.OP_INDEX_CACHE_ALIAS
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._refreshed_at is not None
+            and time.time() - self._refreshed_at < self.ttl
+        )
+
+    def _load(self) -> None:
+        if not self.alias:
+            return
+        data = caches[self.alias].get(self.cache_key)
+        if data is not None and data["refreshed_at"] > (self._refreshed_at or 0):
+            self._vaults = data["vaults"]
+            self._refreshed_at = data["refreshed_at"]
+            self._lookup = None
+
+    def _save(self) -> None:
+        if not self.alias:
+            return
+        caches[self.alias].set(
+            self.cache_key,
+            {"vaults": self._vaults, "refreshed_at": self._refreshed_at},
+            timeout=None,
+        )
+
+    def _refresh_vault(
+        self, backend: BaseBackend, vault_id: str, name: str
+    ) -> dict[str, Any]:
+        previous = self._vaults.get(vault_id, {}).get("items", {})
+        items: dict[str, dict[str, Any]] = {}
+        changed: list[str] = []
+        for summary in backend.list_items(vault_id):
+            old = previous.get(summary["id"])
+            version = summary.get("version")
+            if old is not None and version is not None and old["version"] == version:
+                items[summary["id"]] = old
+            else:
+                changed.append(summary["id"])
+        for item in backend.get_items(vault_id, changed):
+            items[item["id"]] = {
+                "title": item.get("title", ""),
+                "version": item.get("version"),
+                "fields": _item_fields(item),
+            }
+        return {"name": name, "items": items}
+
+    def refresh(self) -> None:
+        """Update the index from 1Password, fetching only the items that changed."""
+        backend = get_backend()
+        with self._lock:
+            self._load()
+            self._vaults = {
+                vault["id"]: self._refresh_vault(backend, vault["id"], vault["name"])
+                for vault in backend.list_vaults()
+            }
+            self._refreshed_at = time.time()
+            self._lookup = None
+            self._save()
+
+    def refresh_vault(self, vault: str) -> None:
+        """Update the items of a single vault, given its name or ID."""
+        backend = get_backend()
+        with self._lock:
+            vault_ids = self._get_lookup().vaults.get(vault)
+            if not vault_ids:
+                # a vault the index does not know about yet
+                self.refresh()
+                return
+            # replace rather than update the mapping, readers iterate it
+            # without holding the lock
+            vaults = dict(self._vaults)
+            for vault_id in vault_ids:
+                name = vaults[vault_id]["name"]
+                vaults[vault_id] = self._refresh_vault(backend, vault_id, name)
+            self._vaults = vaults
+            self._lookup = None
+            self._save()
+
+    def ensure_fresh(self) -> None:
+        if self._is_fresh():
+            return
+        with self._lock:
+            if self._is_fresh():
+                return
+            self._load()
+            if not self._is_fresh():
+                self.refresh()
+
+    def _get_lookup(self) -> _Lookup:
+        lookup = self._lookup
+        if lookup is not None:
+            return lookup
+        lookup = _Lookup()
+        for vault_id, vault in list(self._vaults.items()):
+            for vault_key in (vault_id, vault["name"]):
+                lookup.vaults.setdefault(vault_key, set()).add(vault_id)
+            for item_id, item in vault["items"].items():
+                for item_key in (item_id, item["title"]):
+                    lookup.items.setdefault((vault_id, item_key), set()).add(item_id)
+                for section_id, section_label, field_id, field_label in item["fields"]:
+                    sections = {None, section_id, section_label} - {""}
+                    for field_key in {field_id, field_label} - {None, ""}:
+                        for section_key in sections:
+                            lookup.references.add((item_id, section_key, field_key))
+        self._lookup = lookup
+        return lookup
+
+    def _contains(self, op_uri: str) -> bool:
+        match = OPURIValidator.op_regex.match(op_uri)
+        if not match:
+            return False
+        vault, item, section, field = match.group("vault", "item", "section", "field")
+        # drop query parameters such as `?attribute=otp`
+        field = field.split("?", 1)[0]
+        lookup = self._get_lookup()
+        for vault_id in lookup.vaults.get(vault, ()):
+            for item_id in lookup.items.get((vault_id, item), ()):
+                if (item_id, section, field) in lookup.references:
+                    return True
+        return False
+
+    def exists(self, op_uri: str, refresh_on_miss: bool = False) -> bool:
+        """Whether `op_uri` references a field of an item in the index.
+
+        With `refresh_on_miss`, the referenced vault is refreshed before
+        reporting a reference as missing, to find recently created items.
+        """
+        self.ensure_fresh()
+        if self._contains(op_uri):
+            return True
+        if not refresh_on_miss:
+            return False
+        match = OPURIValidator.op_regex.match(op_uri)
+        if not match:
+            return False
+        self.refresh_vault(match.group("vault"))
+        return self._contains(op_uri)
+
+    def suggest(
+        self, term: str, vaults: list[str] | None = None, limit: int = 20
+    ) -> list[str]:
+        """Return up to `limit` references completing `term`, for autocompletion.
+
+        Completes the vault, then the item, then the field of `term`,
+        matching case-insensitively on the start of each name.
+        """
+        self.ensure_fresh()
+        parts = term.removeprefix("op://").split("/")
+        prefix = parts[-1].lower()
+        suggestions: set[str] = set()
+        with self._lock:
+            for vault in self._vaults.values():
+                name = vault["name"]
+                if vaults and name not in vaults:
+                    continue
+                if len(parts) == 1:
+                    if name.lower().startswith(prefix):
+                        suggestions.add(f"op://{name}/")
+                    continue
+                if name != parts[0]:
+                    continue
+                for item in vault["items"].values():
+                    title = item["title"]
+                    if len(parts) == 2:
+                        if title.lower().startswith(prefix):
+                            suggestions.add(f"op://{name}/{title}/")
+                        continue
+                    if title != parts[1]:
+                        continue
+                    typed = "/".join(parts[2:]).lower()
+                    for _, section_label, field_id, field_label in item["fields"]:
+                        label = field_label or field_id
+                        path = f"{section_label}/{label}" if section_label else label
+                        if path and path.lower().startswith(typed):
+                            suggestions.add(f"op://{name}/{title}/{path}")
+        return sorted(suggestions)[:limit]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._vaults = {}
+            self._refreshed_at = None
+            self._lookup = None
+
+
+secret_index = SecretIndex()
+
+
+@receiver(setting_changed)
+def _clear_index(*, setting: str, **kwargs: Any) -> None:
+    if setting == OPFIELD_SETTINGS_NAME:
+        secret_index.clear()
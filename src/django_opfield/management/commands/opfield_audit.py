@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import json
+import time
+from collections import Counter
+from typing import Any
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from django_opfield.audit import INVALID
+from django_opfield.audit import OK
+from django_opfield.audit import UNRESOLVABLE
+from django_opfield.audit import audit
+
+
+class Command(BaseCommand):
+    help = (
+        "Check that every 1Password URI stored in an OPField is valid and "
+        "resolves, writing a JSON report."
+    )
+
+    def add_arguments(self, parser: Any) -> None:
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database to collect the op:// URIs from.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of distinct URIs to fetch and check at a time.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Number of concurrent checks, defaults to OP_MAX_WORKERS.",
+        )
+        parser.add_argument(
+            "--strict",
+            action="store_true",
+            help="Exit with an error if any URI is invalid or does not resolve.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        start = time.perf_counter()
+        # the URIs that resolve are only listed with --verbosity 2 or more
+        verbose = options["verbosity"] >= 2
+        counts: Counter[str] = Counter()
+        rows = 0
+        written = 0
+
+        # the report is written as it goes, so it is never held in memory
+        self.stdout.write('{"entries": [', ending="")
+        for entry in audit(
+            using=options["database"],
+            chunk_size=options["chunk_size"],
+            max_workers=options["workers"],
+        ):
+            counts[entry.status] += 1
+            rows += entry.rows
+            if entry.ok and not verbose:
+                continue
+            separator = ",\n  " if written else "\n  "
+            self.stdout.write(separator + json.dumps(entry.as_dict()), ending="")
+            written += 1
+        summary = {
+            "checked": sum(counts.values()),
+            "rows": rows,
+            OK: counts[OK],
+            INVALID: counts[INVALID],
+            UNRESOLVABLE: counts[UNRESOLVABLE],
+            "elapsed": round(time.perf_counter() - start, 3),
+        }
+        self.stdout.write(f'\n], "summary": {json.dumps(summary)}}}')
+
+        failed = counts[INVALID] + counts[UNRESOLVABLE]
+        if options["strict"] and failed:
+            raise CommandError(f"{failed} op:// URI(s) are invalid or do not resolve")
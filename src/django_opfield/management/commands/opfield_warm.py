@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from typing import Any
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from django_opfield.cache import shared_secret_cache
+from django_opfield.warm import collect_uris
+from django_opfield.warm import warm_cache
+
+
+class Command(BaseCommand):
+    help = "Resolve every 1Password secret referenced by an OPField in parallel."
+
+    def add_arguments(self, parser: Any) -> None:
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database to collect the op:// URIs from.",
+        )
+        parser.add_argument(
+            "--strict",
+            action="store_true",
+            help="Exit with an error if any secret could not be resolved.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if not shared_secret_cache.enabled:
+            # the in-process cache is gone as soon as the command exits
+            self.stderr.write(
+                self.style.WARNING(
+                    "The shared secret cache is disabled (OP_SHARED_CACHE_ALIAS "
+                    "is not set), so no other process will use the resolved "
+                    "secrets. Only checking that they resolve."
+                )
+            )
+
+        result = warm_cache(collect_uris(using=options["database"]))
+
+        for op_uri, exc in result.failed.items():
+            self.stderr.write(self.style.ERROR(f"{op_uri}: {exc}"))
+
+        self.stdout.write(
+            f"Resolved {len(result.resolved)} of {result.total} secret(s) "
+            f"in {result.elapsed:.2f}s ({len(result.failed)} failed)"
+        )
+
+        if options["strict"] and result.failed:
+            raise CommandError(f"{len(result.failed)} secret(s) could not be resolved")
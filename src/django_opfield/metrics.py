@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import threading
+from typing import Any
+
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from django_opfield.conf import OPFIELD_SETTINGS_NAME
+from django_opfield.conf import app_settings
+
+
+class BaseMetrics:
+    """Receives measurements of secret resolution; the default discards them.
+
+    Subclass it to forward the measurements to statsd, Prometheus or similar,
+    and set `OP_METRICS_BACKEND` to its dotted path. Every measurement is
+    tagged with the `vault` and the model `field` (as `app_label.Model.field`,
+    or an empty string when unknown).
+    """
+
+    def cache_hit(self, *, vault: str, field: str, tier: str) -> None:
+        pass
+
+    def cache_miss(self, *, vault: str, field: str) -> None:
+        pass
+
+    def secret_read(
+        self, *, vault: str, field: str, duration: float, outcome: str, size: int
+    ) -> None:
+        pass
+
+    def queue_wait(self, *, duration: float) -> None:
+        pass
+
+
+_metrics: BaseMetrics | None = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> BaseMetrics:
+    global _metrics
+    metrics = _metrics
+    if metrics is not None:
+        return metrics
+    with _metrics_lock:
+        if _metrics is None:
+            path = app_settings.OP_METRICS_BACKEND
+            _metrics = import_string(path)() if path else BaseMetrics()
+        return _metrics
+
+
+@receiver(setting_changed)
+def _reset_metrics(*, setting: str, **kwargs: Any) -> None:
+    global _metrics
+    if setting == OPFIELD_SETTINGS_NAME:
+        _metrics = None
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+from asgiref.sync import iscoroutinefunction
+from django.http import HttpRequest
+from django.http import HttpResponse
+from django.utils.decorators import sync_and_async_middleware
+
+from django_opfield.scope import secret_scope
+
+
+@sync_and_async_middleware
+def secret_scope_middleware(get_response: Callable[[HttpRequest], Any]) -> Any:
+    """Resolve each `op://` URI at most once per request."""
+    if iscoroutinefunction(get_response):
+
+        async def async_middleware(request: HttpRequest) -> HttpResponse:
+            with secret_scope():
+                return await get_response(request)
+
+        return async_middleware
+
+    def middleware(request: HttpRequest) -> HttpResponse:
+        with secret_scope():
+            return get_response(request)
+
+    return middleware
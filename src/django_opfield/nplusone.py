@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import warnings
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from dataclasses import field as dataclass_field
+from typing import TYPE_CHECKING
+
+from django_opfield.conf import app_settings
+
+if TYPE_CHECKING:
+    from django_opfield.fields import OPField
+
+
+class NPlusOneError(RuntimeError):
+    """Raised when a field's secret is resolved row by row too many times."""
+
+
+class NPlusOneWarning(UserWarning):
+    """Warned when a field's secret is resolved row by row too many times."""
+
+
+@dataclass
+class _Detector:
+    threshold: int
+    raise_error: bool
+    accesses: dict[str, set[str]] = dataclass_field(default_factory=dict)
+    reported: set[str] = dataclass_field(default_factory=set)
+
+
+_detector: ContextVar[_Detector | None] = ContextVar(
+    "django_opfield_nplusone_detector", default=None
+)
+
+
+@contextmanager
+def detect_nplusone(
+    threshold: int | None = None, raise_error: bool | None = None
+) -> Iterator[None]:
+    """Report `OPField` secrets resolved one row at a time within the block.
+
+    Once the secret of the same model field has been resolved individually
+    for more than `threshold` different URIs, an `NPlusOneWarning` is warned,
+    or an `NPlusOneError` raised if `raise_error` is set. Secrets loaded with
+    `prefetch_secrets` or `QuerySet.resolve_secrets` are not counted. The
+    defaults come from the `OP_NPLUSONE_THRESHOLD` and `OP_NPLUSONE_RAISE`
+    settings. Nested blocks share the outermost one.
+    """
+    if _detector.get() is not None:
+        yield
+        return
+
+    if threshold is None:
+        threshold = int(app_settings.OP_NPLUSONE_THRESHOLD)
+    if raise_error is None:
+        raise_error = bool(app_settings.OP_NPLUSONE_RAISE)
+    token = _detector.set(_Detector(threshold=threshold, raise_error=raise_error))
+    try:
+        yield
+    finally:
+        _detector.reset(token)
+
+
+def record_access(op_uri: str, field: OPField) -> None:
+    detector = _detector.get()
+    if detector is None or detector.threshold <= 0:
+        return
+    label = f"{field.model._meta.label}.{field.name}"
+    op_uris = detector.accesses.setdefault(label, set())
+    op_uris.add(op_uri)
+    if len(op_uris) <= detector.threshold or label in detector.reported:
+        return
+    detector.reported.add(label)
+    message = (
+        f"The secret of {label} was resolved individually for {len(op_uris)} "
+        "rows, load them in bulk with prefetch_secrets() or "
+        "QuerySet.resolve_secrets()"
+    )
+    if detector.raise_error:
+        raise NPlusOneError(message)
+    warnings.warn(message, NPlusOneWarning, stacklevel=3)
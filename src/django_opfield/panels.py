@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import threading
+from contextvars import ContextVar
+from contextvars import Token
+from typing import Any
+
+from debug_toolbar.panels import Panel
+from django.http import HttpRequest
+from django.http import HttpResponse
+
+from django_opfield.signals import secret_resolve_finished
+
+# the panel of the request being handled, signals are global so reads from
+# other requests and background threads are ignored
+_active_panel: ContextVar[SecretsPanel | None] = ContextVar(
+    "django_opfield_secrets_panel", default=None
+)
+
+
+class SecretsPanel(Panel):
+    """A django-debug-toolbar panel listing the secrets read during a request.
+
+    Only the `op://` references and timings are shown, never the secret
+    values. Add `"django_opfield.panels.SecretsPanel"` to
+    `DEBUG_TOOLBAR_PANELS` to enable it.
+    """
+
+    title = "1Password secrets"
+    template = "django_opfield/panels/secrets.html"
+    is_async = True
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._reads: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._token: Token[SecretsPanel | None] | None = None
+
+    @property
+    def nav_subtitle(self) -> str:
+        stats = self.get_stats()
+        return (
+            f"{len(stats.get('reads', []))} reads in {stats.get('total_time', 0):.2f}ms"
+        )
+
+    def enable_instrumentation(self) -> None:
+        self._token = _active_panel.set(self)
+        secret_resolve_finished.connect(self._record, dispatch_uid=id(self))
+
+    def disable_instrumentation(self) -> None:
+        secret_resolve_finished.disconnect(dispatch_uid=id(self))
+        if self._token is not None:
+            try:
+                _active_panel.reset(self._token)
+            except ValueError:
+                # enabled in another context
+                _active_panel.set(None)
+            self._token = None
+
+    def _record(
+        self,
+        sender: type,
+        *,
+        op_uri: str,
+        field: Any,
+        duration: float,
+        outcome: str,
+        size: int,
+        batch_size: int = 1,
+        **kwargs: Any,
+    ) -> None:
+        if _active_panel.get() is not self:
+            return
+        with self._lock:
+            self._reads.append(
+                {
+                    "op_uri": op_uri,
+                    "field": f"{field.model._meta.label}.{field.name}"
+                    if field is not None and hasattr(field, "model")
+                    else "",
+                    "backend": f"{sender.__module__}.{sender.__qualname__}",
+                    "duration": duration * 1000,
+                    "outcome": outcome,
+                    "size": size,
+                    "batch_size": batch_size,
+                }
+            )
+
+    def generate_stats(self, request: HttpRequest, response: HttpResponse) -> None:
+        with self._lock:
+            reads = list(self._reads)
+        counts: dict[str, int] = {}
+        for read in reads:
+            counts[read["op_uri"]] = counts.get(read["op_uri"], 0) + 1
+        for read in reads:
+            read["duplicates"] = counts[read["op_uri"]] - 1
+        self.record_stats(
+            {
+                "reads": reads,
+                # secrets read in one batch share its duration
+                "total_time": sum(
+                    read["duration"] / read["batch_size"] for read in reads
+                ),
+                "duplicate_count": sum(1 for read in reads if read["duplicates"]),
+            }
+        )
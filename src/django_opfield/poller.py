@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import logging
+import threading
+from collections.abc import Iterable
+from typing import Any
+
+from django.utils.module_loading import import_string
+
+from django_opfield.backends import get_backend
+from django_opfield.cache import negative_cache
+from django_opfield.cache import secret_cache
+from django_opfield.conf import app_settings
+
+logger = logging.getLogger(__name__)
+
+
+class BaseChangeSource:
+    """Reports the 1Password items that changed, for `ChangePoller` to invalidate.
+
+    Subclasses implement `changes`, for example on top of the 1Password
+    Events API.
+    """
+
+    def changes(self, vaults: list[str]) -> Iterable[tuple[str, str]]:
+        """Return the `(vault, item)` pairs changed in `vaults` since the last call.
+
+        Items may be given by ID or title, as they are referenced in URIs.
+        """
+        raise NotImplementedError(
+            "subclasses of BaseChangeSource must provide a changes() method"
+        )
+
+
+class ItemListSource(BaseChangeSource):
+    """Detects changed items by comparing the versions from `list_items`.
+
+    Costs one backend call, like `op item list`, per vault and poll. The
+    first poll of a vault only records the versions of its items; later
+    polls report the items changed, deleted or created since.
+    """
+
+    def __init__(self) -> None:
+        # vault -> item ID -> (title, version)
+        self._versions: dict[str, dict[str, tuple[str, Any]]] = {}
+
+    def changes(self, vaults: list[str]) -> list[tuple[str, str]]:
+        backend = get_backend()
+        changed: list[tuple[str, str]] = []
+        for vault in vaults:
+            current = {
+                item["id"]: (item.get("title", item["id"]), item.get("version"))
+                for item in backend.list_items(vault)
+            }
+            previous = self._versions.get(vault)
+            self._versions[vault] = current
+            if previous is None:
+                continue
+            for item_id, (title, version) in previous.items():
+                if current.get(item_id, (title, None))[1] != version:
+                    changed.extend([(vault, item_id), (vault, title)])
+            # items created since the last poll
+            for item_id, (title, _version) in current.items():
+                if item_id not in previous:
+                    changed.extend([(vault, item_id), (vault, title)])
+        return changed
+
+
+class ChangePoller:
+    """Invalidates cached secrets as soon as their 1Password items change.
+
+    Every `interval` seconds, defaulting to `OP_CHANGE_POLL_INTERVAL`, asks
+    `source`, defaulting to an instance of `OP_CHANGE_SOURCE`, which items
+    changed in the vaults of the cached or missing secrets, and invalidates
+    exactly the URIs referencing them, locally and in the shared cache.
+    """
+
+    def __init__(
+        self, source: BaseChangeSource | None = None, interval: float | None = None
+    ) -> None:
+        if source is None:
+            source = import_string(app_settings.OP_CHANGE_SOURCE)()
+        self.source = source
+        self.interval = float(
+            interval if interval is not None else app_settings.OP_CHANGE_POLL_INTERVAL
+        )
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def poll(self) -> list[str]:
+        """Invalidate the cached secrets whose items changed, returning their URIs."""
+        # missing references may have been created since
+        vaults = sorted(secret_cache.vaults() | negative_cache.vaults())
+        if not vaults:
+            return []
+        invalidated: list[str] = []
+        for vault, item in self.source.changes(vaults):
+            # references to the item may resolve now
+            negative_cache.invalidate_item(vault, item)
+            # also invalidated in the shared cache
+            invalidated += secret_cache.invalidate_item(vault, item)
+        if invalidated:
+            logger.info("Invalidated %d changed secret(s)", len(invalidated))
+        return invalidated
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("Could not poll 1Password for changed items")
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="django-opfield-poller", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import contextvars
+from collections.abc import Iterable
+from collections.abc import Iterator
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any
+
+from django.db import models
+from django.db.models.query import ModelIterable
+
+from django_opfield.fields import PREFETCHED_SECRETS_ATTR
+from django_opfield.fields import OPField
+from django_opfield.resolver import SecretResolutionError
+from django_opfield.resolver import aresolve_many
+from django_opfield.resolver import resolve_many
+from django_opfield.scope import outside_scope
+
+
+def get_opfields(
+    model: type[models.Model], field_names: Iterable[str] = ()
+) -> list[OPField]:
+    field_names = set(field_names)
+    fields = [
+        field for field in model._meta.concrete_fields if isinstance(field, OPField)
+    ]
+    if field_names:
+        fields = [field for field in fields if field.name in field_names]
+    return fields
+
+
+def _collect_secret_uris(
+    instances: Iterable[models.Model], field_names: Iterable[str]
+) -> list[tuple[models.Model, list[str]]]:
+    wanted: list[tuple[models.Model, list[str]]] = []
+    fields_by_model: dict[type[models.Model], list[OPField]] = {}
+    for instance in instances:
+        model = type(instance)
+        if model not in fields_by_model:
+            fields_by_model[model] = get_opfields(model, field_names)
+        op_uris = [
+            op_uri
+            for field in fields_by_model[model]
+            if (op_uri := getattr(instance, field.attname))
+        ]
+        if op_uris:
+            wanted.append((instance, op_uris))
+    return wanted
+
+
+def _attach_secrets(
+    wanted: list[tuple[models.Model, list[str]]], results: dict[str, str]
+) -> None:
+    for instance, op_uris in wanted:
+        secrets = instance.__dict__.setdefault(PREFETCHED_SECRETS_ATTR, {})
+        secrets.update(
+            (op_uri, results[op_uri]) for op_uri in op_uris if op_uri in results
+        )
+
+
+def prefetch_secrets(instances: Iterable[models.Model], *field_names: str) -> None:
+    """Resolve the secrets of every `OPField` on `instances` in one concurrent batch.
+
+    The resolved values are attached to each instance, so subsequent
+    `<field>_secret` accesses do not call 1Password again. Pass `field_names`
+    to limit which fields are resolved. Secrets that fail to resolve are not
+    attached and will raise when accessed.
+    """
+    wanted = _collect_secret_uris(instances, field_names)
+    if not wanted:
+        return
+
+    try:
+        results = resolve_many(op_uri for _, op_uris in wanted for op_uri in op_uris)
+    except SecretResolutionError as exc:
+        results = exc.results
+
+    _attach_secrets(wanted, results)
+
+
+async def aprefetch_secrets(
+    instances: Iterable[models.Model], *field_names: str
+) -> None:
+    """Async counterpart of `prefetch_secrets`."""
+    wanted = _collect_secret_uris(instances, field_names)
+    if not wanted:
+        return
+
+    try:
+        results = await aresolve_many(
+            op_uri for _, op_uris in wanted for op_uri in op_uris
+        )
+    except SecretResolutionError as exc:
+        results = exc.results
+
+    _attach_secrets(wanted, results)
+
+
+def _prefetch_chunk(chunk: list[models.Model], *field_names: str) -> None:
+    # streamed secrets are dropped with their chunk, not kept in the scope
+    with outside_scope():
+        prefetch_secrets(chunk, *field_names)
+
+
+def stream_secrets(
+    instances: Iterable[models.Model], chunk_size: int, *field_names: str
+) -> Iterator[models.Model]:
+    """Yield `instances` with their secrets attached, resolved `chunk_size` at a time.
+
+    While one chunk is being consumed, the secrets of the next are resolved
+    in a background thread, so at most two chunks are held in memory. The
+    secrets are resolved outside any `secret_scope`, so they are not kept
+    once their chunk is consumed.
+    """
+    iterator = iter(instances)
+    with ThreadPoolExecutor(
+        max_workers=1, thread_name_prefix="django-opfield-stream"
+    ) as executor:
+        pending: tuple[list[models.Model], Future[None]] | None = None
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if chunk:
+                future = executor.submit(
+                    contextvars.copy_context().run,
+                    _prefetch_chunk,
+                    chunk,
+                    *field_names,
+                )
+            if pending is not None:
+                previous, previous_future = pending
+                pending = None
+                previous_future.result()
+                yield from previous
+            if not chunk:
+                return
+            pending = (chunk, future)
+
+
+class OPFieldQuerySet(models.QuerySet):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._secret_fields: tuple[str, ...] | None = None
+        self._secrets_done = False
+
+    def resolve_secrets(self, *field_names: str) -> OPFieldQuerySet:
+        """Resolve the `OPField` secrets of all fetched rows in one batch.
+
+        Works like `prefetch_related`: the secrets are resolved when the
+        queryset is evaluated. Pass `field_names` to limit which fields are
+        resolved, or `None` to clear a previous call.
+        """
+        clone = self._chain()
+        if field_names == (None,):
+            clone._secret_fields = None
+        else:
+            clone._secret_fields = field_names
+        return clone
+
+    def with_secrets(
+        self, *field_names: str, chunk_size: int = 2000
+    ) -> Iterator[models.Model]:
+        """Stream the rows like `iterator()`, with their secrets already resolved.
+
+        The secrets of each `chunk_size` rows are resolved in one batch, the
+        next chunk's while the current one is consumed. Secrets are not kept
+        beyond the instances they are attached to. Equivalent to
+        `resolve_secrets(*field_names).iterator(chunk_size)`.
+        """
+        return self.resolve_secrets(*field_names).iterator(chunk_size=chunk_size)
+
+    async def aresolve_secrets(self, *field_names: str) -> list[models.Model]:
+        """Evaluate the queryset and resolve its secrets concurrently with asyncio.
+
+        Unlike `resolve_secrets`, this returns the fetched instances.
+        """
+        instances = [instance async for instance in self.resolve_secrets(None)]
+        await aprefetch_secrets(instances, *field_names)
+        return instances
+
+    def _clone(self) -> OPFieldQuerySet:
+        clone = super()._clone()
+        clone._secret_fields = self._secret_fields
+        return clone
+
+    def _iterator(self, use_chunked_fetch: bool, chunk_size: int | None) -> Any:
+        iterator = super()._iterator(use_chunked_fetch, chunk_size)
+        if self._secret_fields is None or not issubclass(
+            self._iterable_class, ModelIterable
+        ):
+            return iterator
+        return stream_secrets(iterator, chunk_size or 2000, *self._secret_fields)
+
+    def _fetch_all(self) -> None:
+        super()._fetch_all()
+        if (
+            self._secret_fields is not None
+            and not self._secrets_done
+            and issubclass(self._iterable_class, ModelIterable)
+        ):
+            prefetch_secrets(self._result_cache, *self._secret_fields)
+            self._secrets_done = True
+
+
+class OPFieldManager(models.Manager.from_queryset(OPFieldQuerySet)):  # type: ignore[misc]
+    pass
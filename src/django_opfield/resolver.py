@@ -0,0 +1,573 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import re
+import subprocess
+import threading
+import time
+from collections.abc import Awaitable
+from collections.abc import Callable
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
+from typing import TYPE_CHECKING
+from typing import Any
+
+from django_opfield.backends import get_backend
+from django_opfield.backends.base import BaseBackend
+from django_opfield.backends.base import is_missing_reference
+from django_opfield.cache import get_vault
+from django_opfield.cache import negative_cache
+from django_opfield.cache import secret_cache
+from django_opfield.cache import shared_secret_cache
+from django_opfield.conf import app_settings
+from django_opfield.metrics import get_metrics
+from django_opfield.scope import get_scope
+from django_opfield.signals import secret_resolve_finished
+from django_opfield.signals import secret_resolve_started
+from django_opfield.singleflight import SingleFlight
+
+if TYPE_CHECKING:
+    from django_opfield.fields import OPField
+
+logger = logging.getLogger(__name__)
+
+# a bare `op://vault/item/[section/]field` reference, or one wrapped in
+# `{{ }}` like in `op inject` templates
+OP_REFERENCE_RE = re.compile(
+    r"(?P<open>\{\{\s*)?"
+    r"(?P<op_uri>op://(?:[^\s/\"'<>{}]+/){2,3}[^\s/\"'<>{}]+)"
+    r"(?(open)\s*\}\})"
+)
+
+_refresh_executor: ThreadPoolExecutor | None = None
+_refreshing: set[str] = set()
+_refresh_lock = threading.Lock()
+
+# concurrent reads of the same URI share a single backend read
+_inflight = SingleFlight()
+
+
+class SecretResolutionError(ValueError):
+    """Raised by `resolve_many` when one or more secrets could not be read.
+
+    `errors` maps each failing URI to its exception and `results` holds the
+    secrets that were resolved successfully.
+    """
+
+    def __init__(self, errors: dict[str, Exception], results: dict[str, str]) -> None:
+        self.errors = errors
+        self.results = results
+        super().__init__(
+            f"Could not read {len(errors)} secret(s) from 1Password: "
+            + ", ".join(errors)
+        )
+
+
+def _field_label(field: OPField | None) -> str:
+    if field is None or not hasattr(field, "model"):
+        return ""
+    return f"{field.model._meta.label}.{field.name}"
+
+
+def _lookup(op_uri: str, field: OPField | None = None) -> str | None:
+    metrics = get_metrics()
+    scope = get_scope()
+    if scope is not None and op_uri in scope:
+        metrics.cache_hit(
+            vault=get_vault(op_uri), field=_field_label(field), tier="scope"
+        )
+        return scope[op_uri]
+    value = secret_cache.get(op_uri)
+    if value is None:
+        metrics.cache_miss(vault=get_vault(op_uri), field=_field_label(field))
+        return None
+    metrics.cache_hit(vault=get_vault(op_uri), field=_field_label(field), tier="local")
+    _schedule_refresh(op_uri)
+    if scope is not None:
+        scope[op_uri] = value
+    return value
+
+
+def _store(op_uri: str, value: str, version: Any = None) -> None:
+    scope = get_scope()
+    if scope is not None:
+        scope[op_uri] = value
+    secret_cache.set(op_uri, value, version)
+
+
+def _check_version(
+    op_uri: str, field: OPField | None, current: Any
+) -> tuple[str | None, Any]:
+    cached = secret_cache.get_versioned(op_uri)
+    if cached is None or current is None:
+        return None, current
+    value, version = cached
+    if version is None:
+        # stored without a version, read it again to store it with one
+        return None, current
+    if version != current:
+        # the item changed, so any copy in the shared cache is outdated too
+        if shared_secret_cache.enabled:
+            shared_secret_cache.invalidate(op_uri)
+        return None, current
+    get_metrics().cache_hit(
+        vault=get_vault(op_uri), field=_field_label(field), tier="revalidated"
+    )
+    _store(op_uri, value, version)
+    return value, version
+
+
+def _get_version(op_uri: str) -> Any:
+    backend = get_backend()
+    with backend.breaker.guard():
+        return backend.get_version(op_uri)
+
+
+async def _aget_version(op_uri: str) -> Any:
+    backend = get_backend()
+    with backend.breaker.guard():
+        return await backend.aget_version(op_uri)
+
+
+def _revalidate(op_uri: str, field: OPField | None = None) -> tuple[str | None, Any]:
+    """Check the version of the item behind an expired secret.
+
+    Returns the previously cached value if the item did not change since
+    it was read, and the item's current version, to store with the value if
+    it has to be read again. Does nothing unless `OP_SECRET_CACHE_REVALIDATE`
+    is set, or if the secret was never cached, so a cold read only costs
+    the read itself.
+    """
+    if not (secret_cache.enabled and secret_cache.revalidate):
+        return None, None
+    if secret_cache.get_versioned(op_uri) is None:
+        return None, None
+    try:
+        # looked up before reading the value, so a change made in between
+        # is caught by the next revalidation rather than missed
+        current = _inflight.do(f"{op_uri}#version", lambda: _get_version(op_uri))
+    except Exception:
+        logger.info("Could not revalidate the secret %s", op_uri, exc_info=True)
+        return None, None
+    return _check_version(op_uri, field, current)
+
+
+async def _arevalidate(
+    op_uri: str, field: OPField | None = None
+) -> tuple[str | None, Any]:
+    if not (secret_cache.enabled and secret_cache.revalidate):
+        return None, None
+    if secret_cache.get_versioned(op_uri) is None:
+        return None, None
+    try:
+        current = await _inflight.ado(
+            f"{op_uri}#version", lambda: _aget_version(op_uri)
+        )
+    except Exception:
+        logger.info("Could not revalidate the secret %s", op_uri, exc_info=True)
+        return None, None
+    return _check_version(op_uri, field, current)
+
+
+def _finished(
+    sender: type[BaseBackend],
+    op_uri: str,
+    field: OPField | None,
+    start: float,
+    value: str | None = None,
+    exception: Exception | None = None,
+    batch_size: int = 1,
+    end: float | None = None,
+) -> None:
+    duration = (time.perf_counter() if end is None else end) - start
+    size = len(value.encode("utf-8")) if value is not None else 0
+    if exception is None:
+        outcome = "ok"
+    elif isinstance(exception, (subprocess.TimeoutExpired, TimeoutError)):
+        outcome = "timeout"
+    else:
+        outcome = "error"
+    secret_resolve_finished.send(
+        sender=sender,
+        op_uri=op_uri,
+        field=field,
+        duration=duration,
+        outcome=outcome,
+        size=size,
+        exception=exception,
+        batch_size=batch_size,
+    )
+    get_metrics().secret_read(
+        vault=get_vault(op_uri),
+        field=_field_label(field),
+        duration=duration,
+        outcome=outcome,
+        size=size,
+    )
+
+
+def _read(op_uri: str, field: OPField | None = None) -> str:
+    return _inflight.do(op_uri, lambda: _read_backend(op_uri, field))
+
+
+async def _aread(op_uri: str, field: OPField | None = None) -> str:
+    return await _inflight.ado(op_uri, lambda: _aread_backend(op_uri, field))
+
+
+def _raise_if_missing(op_uri: str) -> None:
+    error = negative_cache.get(op_uri)
+    if error is not None:
+        raise ValueError(error)
+
+
+def _failed(op_uri: str, exc: Exception) -> None:
+    if is_missing_reference(exc):
+        negative_cache.set(op_uri, str(exc))
+
+
+def _read_guarded(backend: BaseBackend) -> Callable[[str], str]:
+    # only calls to the backend count towards its circuit breaker, not
+    # those to the shared cache
+    def read(op_uri: str) -> str:
+        with backend.breaker.guard():
+            return backend.read(op_uri)
+
+    return read
+
+
+def _aread_guarded(backend: BaseBackend) -> Callable[[str], Awaitable[str]]:
+    async def read(op_uri: str) -> str:
+        with backend.breaker.guard():
+            return await backend.aread(op_uri)
+
+    return read
+
+
+def _read_backend(op_uri: str, field: OPField | None = None) -> str:
+    _raise_if_missing(op_uri)
+    backend = get_backend()
+    if shared_secret_cache.enabled:
+        value = shared_secret_cache.get(op_uri)
+        if value is not None:
+            get_metrics().cache_hit(
+                vault=get_vault(op_uri), field=_field_label(field), tier="shared"
+            )
+            return value
+
+    sender = type(backend)
+    secret_resolve_started.send(sender=sender, op_uri=op_uri, field=field)
+    start = time.perf_counter()
+    read = _read_guarded(backend)
+    try:
+        if shared_secret_cache.enabled:
+            value = shared_secret_cache.get_or_set(op_uri, read)
+        else:
+            value = read(op_uri)
+    except Exception as exc:
+        _failed(op_uri, exc)
+        _finished(sender, op_uri, field, start, exception=exc)
+        raise
+    _finished(sender, op_uri, field, start, value=value)
+    return value
+
+
+async def _aread_backend(op_uri: str, field: OPField | None = None) -> str:
+    _raise_if_missing(op_uri)
+    backend = get_backend()
+    sender = type(backend)
+    secret_resolve_started.send(sender=sender, op_uri=op_uri, field=field)
+    start = time.perf_counter()
+    read = _aread_guarded(backend)
+    try:
+        if shared_secret_cache.enabled:
+            value = await shared_secret_cache.aget_or_set(op_uri, read)
+        else:
+            value = await read(op_uri)
+    except Exception as exc:
+        _failed(op_uri, exc)
+        _finished(sender, op_uri, field, start, exception=exc)
+        raise
+    _finished(sender, op_uri, field, start, value=value)
+    return value
+
+
+def _shared_hits(op_uris: list[str], results: dict[str, str]) -> list[str]:
+    if not shared_secret_cache.enabled:
+        return op_uris
+    misses = []
+    for op_uri in op_uris:
+        value = shared_secret_cache.get(op_uri)
+        if value is None:
+            misses.append(op_uri)
+            continue
+        get_metrics().cache_hit(vault=get_vault(op_uri), field="", tier="shared")
+        _store(op_uri, value)
+        results[op_uri] = value
+    return misses
+
+
+def _store_batch(
+    backend: BaseBackend,
+    op_uris: list[str],
+    start: float,
+    values: dict[str, str] | None,
+    exception: Exception | None,
+    results: dict[str, str],
+) -> list[str]:
+    sender = type(backend)
+    # the secrets of a batch share the duration of its backend call
+    end = time.perf_counter()
+    size = len(op_uris)
+    for op_uri in op_uris:
+        value = values[op_uri] if values is not None else None
+        _finished(sender, op_uri, None, start, value, exception, size, end)
+        if value is None:
+            continue
+        if shared_secret_cache.enabled:
+            shared_secret_cache.set(op_uri, value)
+        _store(op_uri, value)
+        results[op_uri] = value
+    if values is None:
+        # read the secrets one by one, to find out which of them failed
+        logger.info("Could not read secrets in bulk: %s", exception)
+        return op_uris
+    return []
+
+
+def _read_batch(op_uris: list[str], results: dict[str, str]) -> list[str]:
+    """Read `op_uris` with a single backend call, adding them to `results`.
+
+    Returns the URIs still to be read, all of them if the call failed.
+    """
+    op_uris = _shared_hits(op_uris, results)
+    if not op_uris:
+        return []
+    backend = get_backend()
+    for op_uri in op_uris:
+        secret_resolve_started.send(sender=type(backend), op_uri=op_uri, field=None)
+    start = time.perf_counter()
+    try:
+        with backend.breaker.guard():
+            values = backend.read_many(op_uris)
+    except Exception as exc:
+        return _store_batch(backend, op_uris, start, None, exc, results)
+    return _store_batch(backend, op_uris, start, values, None, results)
+
+
+async def _aread_batch(op_uris: list[str], results: dict[str, str]) -> list[str]:
+    op_uris = _shared_hits(op_uris, results)
+    if not op_uris:
+        return []
+    backend = get_backend()
+    for op_uri in op_uris:
+        secret_resolve_started.send(sender=type(backend), op_uri=op_uri, field=None)
+    start = time.perf_counter()
+    try:
+        with backend.breaker.guard():
+            values = await backend.aread_many(op_uris)
+    except Exception as exc:
+        return _store_batch(backend, op_uris, start, None, exc, results)
+    return _store_batch(backend, op_uris, start, values, None, results)
+
+
+def _refresh(op_uri: str) -> None:
+    try:
+        value, version = _revalidate(op_uri)
+        if value is None:
+            secret_cache.set(op_uri, _read(op_uri), version)
+    except Exception:
+        logger.warning("Could not refresh the secret %s", op_uri, exc_info=True)
+    finally:
+        with _refresh_lock:
+            _refreshing.discard(op_uri)
+
+
+def _schedule_refresh(op_uri: str) -> None:
+    """Refresh a cached secret in the background if it is about to expire."""
+    global _refresh_executor
+    if not secret_cache.needs_refresh(op_uri):
+        return
+    with _refresh_lock:
+        if op_uri in _refreshing:
+            return
+        _refreshing.add(op_uri)
+        if _refresh_executor is None:
+            _refresh_executor = ThreadPoolExecutor(
+                max_workers=max(int(app_settings.OP_MAX_WORKERS), 1),
+                thread_name_prefix="django-opfield-refresh",
+            )
+        executor = _refresh_executor
+    executor.submit(_refresh, op_uri)
+
+
+def _stale_or_raise(op_uri: str, exc: Exception) -> str:
+    stale = secret_cache.get_stale(op_uri)
+    if stale is None:
+        raise exc
+    logger.warning(
+        "Serving a stale value for the secret %s: %s", op_uri, exc, exc_info=exc
+    )
+    return stale
+
+
+def resolve(op_uri: str, field: OPField | None = None) -> str:
+    cached = _lookup(op_uri, field)
+    if cached is not None:
+        return cached
+    try:
+        # before revalidating, which would call 1Password too
+        _raise_if_missing(op_uri)
+    except ValueError as exc:
+        return _stale_or_raise(op_uri, exc)
+    value, version = _revalidate(op_uri, field)
+    if value is not None:
+        return value
+    try:
+        value = _read(op_uri, field)
+    except Exception as exc:
+        return _stale_or_raise(op_uri, exc)
+    _store(op_uri, value, version)
+    return value
+
+
+async def aresolve(op_uri: str, field: OPField | None = None) -> str:
+    cached = _lookup(op_uri, field)
+    if cached is not None:
+        return cached
+    try:
+        _raise_if_missing(op_uri)
+    except ValueError as exc:
+        return _stale_or_raise(op_uri, exc)
+    value, version = await _arevalidate(op_uri, field)
+    if value is not None:
+        return value
+    try:
+        value = await _aread(op_uri, field)
+    except Exception as exc:
+        return _stale_or_raise(op_uri, exc)
+    _store(op_uri, value, version)
+    return value
+
+
+def resolve_many(op_uris: Iterable[str]) -> dict[str, str]:
+    """Resolve the distinct `op_uris`, raising `SecretResolutionError` for any that fail.
+
+    Backends that support it read all the uncached secrets in one call, like
+    a single `op inject`. Otherwise, or if that call fails, the secrets are
+    read concurrently, at most `OP_MAX_WORKERS` at a time.
+    """
+    results: dict[str, str] = {}
+    misses: list[str] = []
+    for op_uri in dict.fromkeys(op_uris):
+        cached = _lookup(op_uri)
+        if cached is not None:
+            results[op_uri] = cached
+        else:
+            misses.append(op_uri)
+
+    errors: dict[str, Exception] = {}
+    if len(misses) > 1 and get_backend().supports_read_many:
+        # references known not to exist would fail the whole batch
+        batch = [op_uri for op_uri in misses if op_uri not in negative_cache]
+        known_missing = [op_uri for op_uri in misses if op_uri not in batch]
+        misses = _read_batch(batch, results) + known_missing
+    if misses:
+        max_workers = max(min(int(app_settings.OP_MAX_WORKERS), len(misses)), 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # read in the caller's context, so scopes and instrumentation apply
+            futures = {
+                executor.submit(contextvars.copy_context().run, _read, uri): uri
+                for uri in misses
+            }
+            for future in as_completed(futures):
+                op_uri = futures[future]
+                try:
+                    value = future.result()
+                except Exception as exc:
+                    if (stale := secret_cache.get_stale(op_uri)) is not None:
+                        results[op_uri] = stale
+                    else:
+                        errors[op_uri] = exc
+                else:
+                    _store(op_uri, value)
+                    results[op_uri] = value
+
+    if errors:
+        raise SecretResolutionError(errors, results)
+    return results
+
+
+async def aresolve_many(op_uris: Iterable[str]) -> dict[str, str]:
+    """Async counterpart of `resolve_many`, reading secrets as concurrent asyncio tasks."""
+    results: dict[str, str] = {}
+    misses: list[str] = []
+    for op_uri in dict.fromkeys(op_uris):
+        cached = _lookup(op_uri)
+        if cached is not None:
+            results[op_uri] = cached
+        else:
+            misses.append(op_uri)
+
+    errors: dict[str, Exception] = {}
+    if len(misses) > 1 and get_backend().supports_read_many:
+        batch = [op_uri for op_uri in misses if op_uri not in negative_cache]
+        known_missing = [op_uri for op_uri in misses if op_uri not in batch]
+        misses = await _aread_batch(batch, results) + known_missing
+    if misses:
+        semaphore = asyncio.Semaphore(max(int(app_settings.OP_MAX_WORKERS), 1))
+
+        async def read(op_uri: str) -> str:
+            async with semaphore:
+                return await _aread(op_uri)
+
+        values = await asyncio.gather(
+            *(read(op_uri) for op_uri in misses), return_exceptions=True
+        )
+        for op_uri, value in zip(misses, values):
+            if isinstance(value, BaseException):
+                if not isinstance(value, Exception):
+                    raise value
+                if (stale := secret_cache.get_stale(op_uri)) is not None:
+                    results[op_uri] = stale
+                else:
+                    errors[op_uri] = value
+            else:
+                _store(op_uri, value)
+                results[op_uri] = value
+
+    if errors:
+        raise SecretResolutionError(errors, results)
+    return results
+
+
+def inject(text: str, escape: Callable[[str], str] | None = None) -> str:
+    """Replace the `op://` references in `text` with their secrets.
+
+    References may be bare or wrapped in `{{ }}`, as in `op inject`
+    templates. All of them are resolved together with `resolve_many`, so
+    failures raise `SecretResolutionError`. Each secret is passed through
+    `escape`, if given, before being inserted.
+    """
+    secrets = resolve_many(m.group("op_uri") for m in OP_REFERENCE_RE.finditer(text))
+    return _substitute(text, secrets, escape)
+
+
+async def ainject(text: str, escape: Callable[[str], str] | None = None) -> str:
+    """Async counterpart of `inject`."""
+    secrets = await aresolve_many(
+        m.group("op_uri") for m in OP_REFERENCE_RE.finditer(text)
+    )
+    return _substitute(text, secrets, escape)
+
+
+def _substitute(
+    text: str, secrets: dict[str, str], escape: Callable[[str], str] | None
+) -> str:
+    def replace(match: re.Match[str]) -> str:
+        value = secrets[match.group("op_uri")]
+        return escape(value) if escape is not None else value
+
+    return OP_REFERENCE_RE.sub(replace, text)
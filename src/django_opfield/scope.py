@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django_opfield.nplusone import detect_nplusone
+
+_scope: ContextVar[dict[str, str] | None] = ContextVar(
+    "django_opfield_secret_scope", default=None
+)
+
+
+def get_scope() -> dict[str, str] | None:
+    """Return the secrets resolved in the current scope, or `None` outside one."""
+    return _scope.get()
+
+
+@contextmanager
+def secret_scope() -> Iterator[dict[str, str]]:
+    """Resolve each `op://` URI at most once within the block.
+
+    Useful around a unit of work outside the request/response cycle, like a
+    Celery task. The resolved secrets are discarded when the block exits.
+    Nested scopes share the outermost one. Can also be used as a decorator.
+    Row-by-row secret access is reported within the scope when
+    `OP_NPLUSONE_THRESHOLD` is set, see `detect_nplusone`.
+    """
+    current = _scope.get()
+    if current is not None:
+        yield current
+        return
+
+    secrets: dict[str, str] = {}
+    token = _scope.set(secrets)
+    try:
+        with detect_nplusone():
+            yield secrets
+    finally:
+        _scope.reset(token)
+        secrets.clear()
+
+
+@contextmanager
+def outside_scope() -> Iterator[None]:
+    """Resolve secrets without the current scope within the block.
+
+    Secrets resolved in the block are neither read from nor kept in the
+    scope, for example when streaming more rows than should stay in memory.
+    """
+    token = _scope.set(None)
+    try:
+        yield
+    finally:
+        _scope.reset(token)
@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from django.dispatch import Signal
+
+# Sent before a secret is read from the backend, i.e. on a cache miss.
+# Arguments: sender (the backend class), op_uri, field (the `OPField`, or `None`)
+secret_resolve_started = Signal()
+
+# Sent after a secret was read from the backend, successfully or not.
+# Arguments: sender (the backend class), op_uri, field, duration (in seconds),
+# outcome ("ok", "timeout" or "error"), size (bytes read), exception,
+# batch_size (the number of secrets read by the same backend call, sharing
+# its duration)
+secret_resolve_finished = Signal()
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import Awaitable
+from collections.abc import Callable
+from typing import Any
+
+
+def _running_loop() -> asyncio.AbstractEventLoop | None:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class _Call:
+    __slots__ = ("done", "exception", "loop", "ok", "value", "waiters")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop | None = None) -> None:
+        self.done = threading.Event()
+        # the loop of an async caller doing the work, if any
+        self.loop = loop
+        self.ok = False
+        self.value: Any = None
+        self.exception: BaseException | None = None
+        self.waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future[Any]]] = []
+
+
+def _notify(future: asyncio.Future[Any]) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one.
+
+    The first caller for a key does the work, while callers arriving before
+    it finishes wait for and share its result or exception, whether they are
+    threads (`do`) or asyncio tasks (`ado`), on any event loop. Nothing is
+    kept once the call completes. If the first caller is interrupted, e.g.
+    its task is cancelled, a waiting caller takes over.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[str, _Call] = {}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def _join(
+        self, key: str, loop: asyncio.AbstractEventLoop | None
+    ) -> tuple[_Call, bool]:
+        """Return the call in flight for `key`, starting one if there is none."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                return call, False
+            call = self._calls[key] = _Call(loop)
+            return call, True
+
+    def _finish(self, key: str, call: _Call) -> None:
+        with self._lock:
+            del self._calls[key]
+            call.done.set()
+            waiters = call.waiters
+        for loop, future in waiters:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(_notify, future)
+
+    def _result(self, call: _Call) -> Any:
+        if call.exception is not None:
+            raise call.exception
+        return call.value
+
+    def do(self, key: str, func: Callable[[], Any]) -> Any:
+        while True:
+            call, leader = self._join(key, None)
+            if leader:
+                return self._run(key, call, func)
+            if call.loop is not None and call.loop is _running_loop():
+                # blocking here would stall the loop the call is running on
+                return func()
+            call.done.wait()
+            if call.ok:
+                return self._result(call)
+
+    def _run(self, key: str, call: _Call, func: Callable[[], Any]) -> Any:
+        try:
+            call.value = func()
+        except Exception as exc:
+            call.exception = exc
+            call.ok = True
+            raise
+        else:
+            call.ok = True
+            return call.value
+        finally:
+            self._finish(key, call)
+
+    async def ado(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        while True:
+            call, leader = self._join(key, loop)
+            if leader:
+                return await self._arun(key, call, func)
+            future = loop.create_future()
+            with self._lock:
+                if not call.done.is_set():
+                    call.waiters.append((loop, future))
+                else:
+                    future.set_result(None)
+            await future
+            if call.ok:
+                return self._result(call)
+
+    async def _arun(
+        self, key: str, call: _Call, func: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        try:
+            call.value = await func()
+        except Exception as exc:
+            call.exception = exc
+            call.ok = True
+            raise
+        else:
+            call.ok = True
+            return call.value
+        finally:
+            self._finish(key, call)
@@ -0,0 +1,34 @@
+"use strict";
+{
+  const timers = new WeakMap();
+
+  async function suggest(input) {
+    const url = new URL(input.dataset.opfieldAutocomplete, window.location.href);
+    url.searchParams.set("term", input.value);
+    const response = await fetch(url, { credentials: "same-origin" });
+    if (!response.ok) {
+      return;
+    }
+    const { results } = await response.json();
+    const datalist = document.getElementById(input.getAttribute("list"));
+    datalist.replaceChildren(
+      ...results.map((value) => {
+        const option = document.createElement("option");
+        option.value = value;
+        return option;
+      }),
+    );
+  }
+
+  document.addEventListener("input", (event) => {
+    const input = event.target;
+    if (!input.dataset || !input.dataset.opfieldAutocomplete) {
+      return;
+    }
+    clearTimeout(timers.get(input));
+    timers.set(
+      input,
+      setTimeout(() => suggest(input), 150),
+    );
+  });
+}
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from django import template
+from django.template.base import NodeList
+from django.template.base import Parser
+from django.template.base import TextNode
+from django.template.base import Token
+from django.template.context import Context
+from django.template.defaulttags import IfNode
+from django.utils.html import conditional_escape
+
+from django_opfield.resolver import OP_REFERENCE_RE
+from django_opfield.resolver import _substitute
+from django_opfield.resolver import resolve
+from django_opfield.resolver import resolve_many
+
+register = template.Library()
+
+
+@register.filter
+def op_secret(op_uri: str) -> str:
+    """Resolve a single `op://` URI, e.g. `{{ "op://vault/item/field"|op_secret }}`."""
+    return resolve(str(op_uri))
+
+
+class OPTextNode(TextNode):
+    """Literal text of an `opinject` block, with its references replaced."""
+
+    def __init__(self, node: TextNode, owner: OPInjectNode) -> None:
+        super().__init__(node.s)
+        self.origin = node.origin
+        self.token = node.token
+        self.owner = owner
+
+    def render(self, context: Context) -> str:
+        secrets = context.render_context.get(self.owner, {})
+        escape = conditional_escape if context.autoescape else None
+        return _substitute(self.s, secrets, escape)
+
+    def render_annotated(self, context: Context) -> str:
+        return self.render(context)
+
+
+class OPInjectNode(template.Node):
+    def __init__(self, nodelist: NodeList) -> None:
+        self.nodelist = nodelist
+        self.op_uris: dict[str, None] = {}
+        self._replace_text_nodes(nodelist)
+
+    def _replace_text_nodes(self, nodelist: NodeList) -> None:
+        # only literal text is injected, never the output of variables or
+        # tags, which may come from untrusted input
+        for i, node in enumerate(nodelist):
+            if isinstance(node, OPTextNode):
+                continue
+            if isinstance(node, TextNode):
+                for match in OP_REFERENCE_RE.finditer(node.s):
+                    self.op_uris[match.group("op_uri")] = None
+                nodelist[i] = OPTextNode(node, self)
+                continue
+            if isinstance(node, IfNode):
+                children = [child for _, child in node.conditions_nodelists]
+            else:
+                children = [getattr(node, attr, None) for attr in node.child_nodelists]
+            for child in children:
+                if isinstance(child, NodeList):
+                    self._replace_text_nodes(child)
+
+    def render(self, context: Context) -> str:
+        context.render_context[self] = resolve_many(self.op_uris)
+        return self.nodelist.render(context)
+
+
+@register.tag
+def opinject(parser: Parser, token: Token) -> OPInjectNode:
+    """Replace every `op://` reference in the block, resolving them in bulk.
+
+    Only references written in the template itself are replaced, not those
+    in the output of variables or tags.
+
+    {% load opfield %}
+    {% opinject %}
+    DATABASE_PASSWORD=op://vault/database/password
+    API_KEY=op://vault/api/credential
+    {% endopinject %}
+    """
+    bits = token.split_contents()
+    if len(bits) != 1:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' takes no arguments")
+    nodelist = parser.parse(("endopinject",))
+    parser.delete_first_token()
+    return OPInjectNode(nodelist)
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable
+from typing import Any
+
+from django_opfield.signals import secret_resolve_started
+
+
+class CaptureSecretReads:
+    """Record the secrets read from the backend within the block.
+
+    Only reads that reach the backend are recorded, secrets served from a
+    cache or loaded in bulk by an earlier prefetch are not. Secret values
+    are never captured, only the `op://` URIs.
+    """
+
+    def __init__(self) -> None:
+        self.reads: list[str] = []
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> CaptureSecretReads:
+        self.reads = []
+        secret_resolve_started.connect(self._record, dispatch_uid=id(self))
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        secret_resolve_started.disconnect(dispatch_uid=id(self))
+
+    def __len__(self) -> int:
+        return len(self.reads)
+
+    def _record(self, sender: type, *, op_uri: str, **kwargs: Any) -> None:
+        with self._lock:
+            self.reads.append(op_uri)
+
+
+class _AssertNumSecretReadsContext(CaptureSecretReads):
+    def __init__(self, test_case: Any, num: int) -> None:
+        super().__init__()
+        self.test_case = test_case
+        self.num = num
+
+    def __exit__(self, exc_type: Any, *exc_info: Any) -> None:
+        super().__exit__(exc_type, *exc_info)
+        if exc_type is not None:
+            return
+        reads = "\n".join(
+            f"{i}. {op_uri}" for i, op_uri in enumerate(self.reads, start=1)
+        )
+        self.test_case.assertEqual(  # noqa: PT009
+            len(self),
+            self.num,
+            f"{len(self)} secrets read, {self.num} expected\nReads:\n{reads}",
+        )
+
+
+class SecretReadsTestMixin:
+    """Adds `assertNumSecretReads` to a `TestCase`."""
+
+    def assertNumSecretReads(
+        self,
+        num: int,
+        func: Callable[..., Any] | None = None,
+        *args: Any,
+        **kwargs: Any,
+    ) -> Any:
+        """Assert that `num` secrets are read from the backend.
+
+        Like `assertNumQueries`, it is used as a context manager or called
+        with a function and its arguments.
+        """
+        context = _AssertNumSecretReadsContext(self, num)
+        if func is None:
+            return context
+        with context:
+            func(*args, **kwargs)
+        return None
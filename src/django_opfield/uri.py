@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import sys
+
+from django_opfield.validators import OPURIValidator
+
+if sys.version_info >= (3, 12):
+    from typing import override
+else:
+    from typing_extensions import (
+        override,  # pyright: ignore[reportUnreachable]  # pragma: no cover
+    )
+
+
+class OPURI(str):
+    """An `op://` secret reference URI.
+
+    Behaves exactly like the plain string, including equality and hashing,
+    but also exposes the `vault`, `item`, `section` and `field` it refers to.
+    The URI is parsed on first access to one of those, and only once.
+    """
+
+    __slots__ = ("_parts",)
+
+    _parts: tuple[str, str, str | None, str] | None
+
+    def __new__(cls, value: str) -> OPURI:
+        uri = super().__new__(cls, value)
+        uri._parts = None
+        return uri
+
+    def _parse(self) -> tuple[str, str, str | None, str]:
+        parts = self._parts
+        if parts is None:
+            match = OPURIValidator.op_regex.match(self)
+            if match is None:
+                raise ValueError(f"'{self}' is not a valid 1Password URI")
+            parts = self._parts = match.group("vault", "item", "section", "field")
+        return parts
+
+    @property
+    def vault(self) -> str:
+        return self._parse()[0]
+
+    @property
+    def item(self) -> str:
+        return self._parse()[1]
+
+    @property
+    def section(self) -> str | None:
+        return self._parse()[2]
+
+    @property
+    def field(self) -> str:
+        return self._parse()[3]
+
+    @override
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({super().__repr__()})"
+
+    def __reduce__(self) -> tuple[type[OPURI], tuple[str]]:
+        return (type(self), (str(self),))
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import logging
 import re
 import sys
 from typing import Any
@@ -7,9 +8,6 @@ from typing import Any
 from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator
 from django.utils.deconstruct import deconstructible
-from django.utils.regex_helper import (
-    _lazy_re_compile,  # pyright: ignore[reportPrivateUsage]
-)
 
 if sys.version_info >= (3, 12):
     from typing import override
@@ -18,6 +16,8 @@ else:
         override,  # pyright: ignore[reportUnreachable]  # pragma: no cover
     )
 
+logger = logging.getLogger(__name__)
+
 
 @deconstructible
 class OPURIValidator(RegexValidator):
@@ -30,19 +30,21 @@ class OPURIValidator(RegexValidator):
         r"/(?P<field>[^/]+)"  # Field: must be a non-empty string without slashes
     )
 
-    @property
-    def op_regex(self) -> re.Pattern[str]:
-        return _lazy_re_compile(
-            r"^op://" + self.op_path_re + r"$",
-            re.IGNORECASE,
-        )
+    # compiled once for the class, rather than on every call
+    op_regex = re.compile(r"^op://" + op_path_re + r"$", re.IGNORECASE)
 
     message = "Enter a valid 1Password URI."
     schemes = ["op"]
 
-    def __init__(self, vaults: list[str] | None = None, **kwargs: Any) -> None:
+    def __init__(
+        self, vaults: list[str] | None = None, verify: bool = False, **kwargs: Any
+    ) -> None:
         super().__init__(**kwargs)
         self.vaults = vaults if vaults is not None else []
+        self._vault_set = frozenset(self.vaults)
+        # check that the referenced item and field exist, using the index of
+        # `django_opfield.index.secret_index` rather than reading the secret
+        self.verify = verify
 
     @override
     def __call__(self, value: Any) -> None:
@@ -58,7 +60,23 @@ class OPURIValidator(RegexValidator):
 
         # Check if the vault is in the list of valid vaults
         vault = match.group("vault")
-        if self.vaults and vault not in self.vaults:
+        if self._vault_set and vault not in self._vault_set:
             raise ValidationError(
                 f"The vault '{vault}' is not a valid vault.", code="invalid_vault"
             )
+
+        if self.verify:
+            from django_opfield.index import secret_index
+
+            try:
+                exists = secret_index.exists(value, refresh_on_miss=True)
+            except Exception:
+                # do not block saving while 1Password cannot be reached
+                logger.warning("Could not verify %s", value, exc_info=True)
+                exists = True
+            if not exists:
+                raise ValidationError(
+                    "This 1Password item or field does not exist.",
+                    code="not_found",
+                    params={"value": value},
+                )
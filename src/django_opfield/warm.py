@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Iterable
+from collections.abc import Iterator
+from dataclasses import dataclass
+from dataclasses import field
+
+from django.apps import apps
+from django.db import DEFAULT_DB_ALIAS
+from django.db import connections
+from django.db import models
+
+from django_opfield.fields import OPField
+from django_opfield.query import get_opfields
+from django_opfield.resolver import SecretResolutionError
+from django_opfield.resolver import resolve_many
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WarmResult:
+    resolved: list[str] = field(default_factory=list)
+    failed: dict[str, Exception] = field(default_factory=dict)
+    elapsed: float = 0.0  # in seconds
+
+    @property
+    def total(self) -> int:
+        return len(self.resolved) + len(self.failed)
+
+
+def iter_opfields() -> Iterator[tuple[type[models.Model], OPField]]:
+    """Yield every concrete model and `OPField` pair in the project."""
+    for model in apps.get_models():
+        if model._meta.proxy:
+            continue
+        for opfield in get_opfields(model):
+            yield model, opfield
+
+
+def collect_uris(using: str = DEFAULT_DB_ALIAS) -> list[str]:
+    """Return the distinct `op://` URIs stored in every `OPField` column."""
+    op_uris: dict[str, None] = {}
+    for model, opfield in iter_opfields():
+        queryset = (
+            model._base_manager.using(using)
+            .exclude(**{f"{opfield.attname}__isnull": True})
+            .exclude(**{opfield.attname: ""})
+            .values_list(opfield.attname, flat=True)
+            .distinct()
+        )
+        op_uris.update(dict.fromkeys(queryset.iterator()))
+    return list(op_uris)
+
+
+def warm_cache(op_uris: Iterable[str] | None = None) -> WarmResult:
+    """Resolve `op_uris`, or every stored URI, concurrently into the secret cache."""
+    start = time.perf_counter()
+    if op_uris is None:
+        op_uris = collect_uris()
+
+    try:
+        results = resolve_many(op_uris)
+        errors: dict[str, Exception] = {}
+    except SecretResolutionError as exc:
+        results = exc.results
+        errors = exc.errors
+
+    return WarmResult(
+        resolved=list(results),
+        failed=errors,
+        elapsed=time.perf_counter() - start,
+    )
+
+
+def warm_cache_in_background() -> None:
+    try:
+        result = warm_cache()
+    except Exception:
+        logger.exception("Could not warm the 1Password secret cache")
+        return
+    finally:
+        # the connections opened by this thread are not closed by a request
+        connections.close_all()
+    logger.info(
+        "Warmed %d of %d 1Password secret(s) in %.2fs",
+        len(result.resolved),
+        result.total,
+        result.elapsed,
+    )
+    for op_uri, exc in result.failed.items():
+        logger.warning("Could not warm %s: %s", op_uri, exc)
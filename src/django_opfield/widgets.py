@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import sys
+from typing import Any
+
+from django import forms
+
+if sys.version_info >= (3, 12):
+    from typing import override
+else:
+    from typing_extensions import (
+        override,  # pyright: ignore[reportUnreachable]  # pragma: no cover
+    )
+
+
+class OPURIAutocompleteWidget(forms.TextInput):
+    """A text input suggesting `op://` references as the user types.
+
+    Each keystroke, debounced, requests suggestions from `url`, which must
+    answer `?term=<value>` with a JSON object of the form
+    `{"results": ["op://...", ...]}`. `OPFieldAdminMixin` provides such a view.
+    """
+
+    template_name = "django_opfield/widgets/autocomplete.html"
+
+    class Media:
+        js = ["django_opfield/autocomplete.js"]
+
+    def __init__(self, url: str = "", attrs: dict[str, Any] | None = None) -> None:
+        super().__init__(attrs)
+        self.url = url
+
+    @override
+    def get_context(
+        self, name: str, value: Any, attrs: dict[str, Any] | None
+    ) -> dict[str, Any]:
+        context = super().get_context(name, value, attrs)
+        widget_attrs = context["widget"]["attrs"]
+        widget_attrs["autocomplete"] = "off"
+        widget_attrs["list"] = f"{widget_attrs.get('id', name)}_suggestions"
+        widget_attrs["data-opfield-autocomplete"] = self.url
+        return context
@@ -0,0 +1,147 @@
+"""A long-lived process reading secrets for `DaemonBackend`.
+
+The worker reads JSON requests, one per line, from stdin and writes a JSON
+response per request to stdout, as soon as each secret is read:
+
+    {"id": 1, "op_uri": "op://vault/item/field"}
+    {"id": 1, "value": "..."}
+    {"id": 2, "error": "..."}
+
+Requests are handled concurrently, so a slow read does not hold up the
+others. With the `onepassword-sdk` package installed, secrets are read with
+one SDK client, authenticated once with `OP_SERVICE_ACCOUNT_TOKEN`, for the
+life of the worker. Otherwise `op read` is run for each request.
+
+This module is started by the backend as `python -m django_opfield.worker`
+and deliberately does not depend on Django.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from typing import Any
+
+from django_opfield import __version__
+
+
+class CLIReader:
+    def __init__(self, op_path: str, timeout: float) -> None:
+        self.op_path = op_path
+        self.timeout = timeout
+
+    async def read(self, op_uri: str) -> str:
+        process = await asyncio.create_subprocess_exec(
+            self.op_path,
+            "read",
+            op_uri,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                process.communicate(), timeout=self.timeout
+            )
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise TimeoutError(f"'op read' timed out after {self.timeout:g}s") from None
+        if process.returncode != 0:
+            raise ValueError(stderr.decode("utf-8").strip())
+        return stdout.decode("utf-8").strip()
+
+
+class SDKReader:
+    def __init__(self, token: str, timeout: float) -> None:
+        self.token = token
+        self.timeout = timeout
+        self._client: Any = None
+        self._lock = asyncio.Lock()
+
+    async def client(self) -> Any:
+        async with self._lock:
+            if self._client is None:
+                from onepassword.client import Client
+
+                self._client = await Client.authenticate(
+                    auth=self.token,
+                    integration_name="django-opfield",
+                    integration_version=f"v{__version__}",
+                )
+            return self._client
+
+    async def read(self, op_uri: str) -> str:
+        client = await self.client()
+        return await asyncio.wait_for(
+            client.secrets.resolve(op_uri), timeout=self.timeout
+        )
+
+
+def sdk_available() -> bool:
+    try:
+        import onepassword.client  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+async def serve(reader: Any, max_concurrency: int) -> None:
+    loop = asyncio.get_running_loop()
+    stdin = asyncio.StreamReader(limit=2**20)
+    await loop.connect_read_pipe(
+        lambda: asyncio.StreamReaderProtocol(stdin), sys.stdin.buffer
+    )
+    stdout = sys.stdout.buffer
+    semaphore = asyncio.Semaphore(max_concurrency)
+    tasks: set[asyncio.Task[None]] = set()
+
+    def respond(response: dict[str, Any]) -> None:
+        stdout.write(json.dumps(response).encode("utf-8") + b"\n")
+        stdout.flush()
+
+    async def handle(request: dict[str, Any]) -> None:
+        async with semaphore:
+            try:
+                value = await reader.read(request["op_uri"])
+            except Exception as exc:
+                respond({"id": request["id"], "error": str(exc) or repr(exc)})
+            else:
+                respond({"id": request["id"], "value": value})
+
+    while line := await stdin.readline():
+        try:
+            request = json.loads(line)
+        except ValueError:
+            continue
+        task = loop.create_task(handle(request))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    # stdin was closed by the backend, finish the reads in flight and exit
+    if tasks:
+        await asyncio.wait(tasks)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m django_opfield.worker")
+    parser.add_argument("--engine", choices=["auto", "sdk", "cli"], default="auto")
+    parser.add_argument("--op", default="op", help="path to the 'op' CLI")
+    parser.add_argument("--timeout", type=float, default=5)
+    parser.add_argument("--max-concurrency", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    engine = args.engine
+    if engine == "auto":
+        engine = "sdk" if sdk_available() else "cli"
+    if engine == "sdk":
+        reader: Any = SDKReader(os.environ["OP_SERVICE_ACCOUNT_TOKEN"], args.timeout)
+    else:
+        reader = CLIReader(args.op, args.timeout)
+    asyncio.run(serve(reader, max(args.max_concurrency, 1)))
+
+
+if __name__ == "__main__":
+    main()
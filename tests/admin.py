@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from django.contrib import admin
+
+from django_opfield.admin import OPFieldAdminMixin
+
+from .models import OPFieldModel
+
+
+@admin.register(OPFieldModel)
+class OPFieldModelAdmin(OPFieldAdminMixin, admin.ModelAdmin):
+    pass
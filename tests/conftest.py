@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import logging
 
+import pytest
 from django.conf import settings
 
 from .settings import DEFAULT_SETTINGS
@@ -15,9 +16,68 @@ def pytest_configure(config):
     settings.configure(**DEFAULT_SETTINGS, **TEST_SETTINGS)
 
 
+@pytest.fixture(autouse=True)
+def reload_app_settings():
+    from django_opfield.conf import app_settings
+
+    app_settings.reload()
+    yield
+    app_settings.reload()
+
+
+@pytest.fixture(autouse=True)
+def clear_secret_cache():
+    from django_opfield.cache import negative_cache
+    from django_opfield.cache import secret_cache
+
+    secret_cache.clear()
+    negative_cache.clear()
+    yield
+    secret_cache.clear()
+    negative_cache.clear()
+
+
+@pytest.fixture
+def locmem_secrets():
+    """The secrets served by `locmem_backend`, override to change them."""
+    return {}
+
+
+@pytest.fixture
+def locmem_settings():
+    """Extra `DJANGO_OPFIELD` settings applied with `locmem_backend`."""
+    return {}
+
+
+@pytest.fixture
+def locmem_backend(locmem_secrets, locmem_settings):
+    """Use a `LocMemBackend` serving `locmem_secrets`, and yield it."""
+    from django.test import override_settings
+
+    from django_opfield.backends import get_backend
+    from django_opfield.conf import OPFIELD_SETTINGS_NAME
+
+    with override_settings(
+        **{
+            OPFIELD_SETTINGS_NAME: {
+                "OP_BACKEND": "django_opfield.backends.locmem.LocMemBackend",
+                "OP_BACKEND_OPTIONS": {"secrets": locmem_secrets},
+                **locmem_settings,
+            }
+        }
+    ):
+        yield get_backend()
+
+
 TEST_SETTINGS = {
     "INSTALLED_APPS": [
+        "django.contrib.admin",
+        "django.contrib.auth",
+        "django.contrib.contenttypes",
+        "django.contrib.messages",
+        "django.contrib.sessions",
         "django_opfield",
         "tests",
-    ]
+    ],
+    "ROOT_URLCONF": "tests.urls",
 }
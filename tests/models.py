@@ -3,10 +3,22 @@ from __future__ import annotations
 from django.db import models
 
 from django_opfield.fields import OPField
+from django_opfield.query import OPFieldManager
 
 
 class OPFieldModel(models.Model):
     op_uri = OPField()
 
+    objects = OPFieldManager()
+
     def __str__(self) -> str:
         return self.op_uri
+
+
+class OPURIModel(models.Model):
+    op_uri = OPField(parse_uri=True, null=True)
+
+    objects = OPFieldManager()
+
+    def __str__(self) -> str:
+        return str(self.op_uri)
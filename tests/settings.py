@@ -20,4 +20,10 @@ DEFAULT_SETTINGS = {
         "django.contrib.auth.hashers.MD5PasswordHasher",
     ],
     "SECRET_KEY": "not-a-secret",
+    "TEMPLATES": [
+        {
+            "BACKEND": "django.template.backends.django.DjangoTemplates",
+            "APP_DIRS": True,
+        }
+    ],
 }
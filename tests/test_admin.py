@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import json
+import threading
+from unittest.mock import patch
+
+import pytest
+from django.contrib import admin
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.auth.models import User
+from django.core.exceptions import PermissionDenied
+from django.http import Http404
+from django.test import RequestFactory
+from django.test import override_settings
+
+from django_opfield.backends.locmem import LocMemBackend
+from django_opfield.widgets import OPURIAutocompleteWidget
+
+from .models import OPFieldModel
+
+URL = "/admin/tests/opfieldmodel/opfield-autocomplete/"
+
+
+pytestmark = pytest.mark.usefixtures("locmem_backend")
+
+
+@pytest.fixture
+def locmem_secrets():
+    return {"op://vault/item/password": "1", "op://vault/other/password": "2"}
+
+
+@pytest.fixture
+def model_admin():
+    return admin.site._registry[OPFieldModel]
+
+
+@pytest.fixture
+def superuser(db):
+    return User.objects.create_superuser("admin", "admin@example.com", "password")
+
+
+def get(user, **params):
+    request = RequestFactory().get(URL, params)
+    request.user = user
+    return request
+
+
+def test_widget(model_admin, superuser):
+    field = OPFieldModel._meta.get_field("op_uri")
+
+    formfield = model_admin.formfield_for_dbfield(field, get(superuser))
+
+    assert isinstance(formfield.widget, OPURIAutocompleteWidget)
+    html = formfield.widget.render("op_uri", "", {"id": "id_op_uri"})
+    assert f'data-opfield-autocomplete="{URL}?field=op_uri"' in html
+    assert 'list="id_op_uri_suggestions"' in html
+    assert '<datalist id="id_op_uri_suggestions">' in html
+
+
+def test_autocomplete_view(model_admin, superuser):
+    response = model_admin.opfield_autocomplete_view(
+        get(superuser, field="op_uri", term="op://vault/")
+    )
+
+    assert json.loads(response.content) == {
+        "results": ["op://vault/item/", "op://vault/other/"]
+    }
+
+
+def test_autocomplete_view_unknown_field(model_admin, superuser):
+    with pytest.raises(Http404):
+        model_admin.opfield_autocomplete_view(get(superuser, field="id"))
+
+
+@pytest.mark.django_db
+def test_autocomplete_view_permission(model_admin):
+    with pytest.raises(PermissionDenied):
+        model_admin.opfield_autocomplete_view(get(AnonymousUser(), field="op_uri"))
+
+
+@override_settings(
+    MIDDLEWARE=[
+        "django.contrib.sessions.middleware.SessionMiddleware",
+        "django.contrib.auth.middleware.AuthenticationMiddleware",
+    ]
+)
+def test_autocomplete_url(client, superuser):
+    client.force_login(superuser)
+
+    response = client.get(URL, {"field": "op_uri", "term": "op://vault/item/"})
+
+    assert response.json() == {"results": ["op://vault/item/password"]}
+
+
+@pytest.fixture
+def rows(db):
+    return [
+        OPFieldModel.objects.create(op_uri="op://vault/item/password"),
+        OPFieldModel.objects.create(op_uri="op://vault/item/password"),
+        OPFieldModel.objects.create(op_uri="op://vault/item/missing"),
+        OPFieldModel.objects.create(op_uri=""),
+    ]
+
+
+@pytest.fixture(autouse=True)
+def clear_status_cache(model_admin):
+    model_admin._opfield_status_cache.clear()
+    yield
+    model_admin._opfield_checks.clear()
+
+
+def test_check_secrets(model_admin, rows):
+    with patch.object(
+        LocMemBackend, "read", autospec=True, side_effect=LocMemBackend.read
+    ) as read:
+        errors = model_admin.check_secrets(rows)
+
+    # each distinct reference is checked once
+    assert read.call_count == 2
+    assert errors["op://vault/item/password"] == ""
+    assert "not found" in errors["op://vault/item/missing"]
+    assert 'alt="yes"' in model_admin.secret_status(rows[0])
+    assert 'alt="no"' in model_admin.secret_status(rows[2])
+    assert model_admin.secret_status(rows[3]) == ""
+
+
+def test_check_secrets_cached(model_admin, rows):
+    model_admin.check_secrets(rows)
+
+    with patch.object(LocMemBackend, "verify_many") as verify_many:
+        model_admin.check_secrets(rows)
+        verify_many.assert_not_called()
+
+        model_admin.check_secrets(rows, refresh=True)
+        verify_many.assert_called_once()
+
+
+def test_check_secrets_timeout(model_admin, rows):
+    release = threading.Event()
+    calls = []
+
+    def slow_verify_many(self, op_uris):
+        calls.append(op_uris)
+        release.wait(5)
+        return {"op://vault/item/missing": ValueError("not found")}
+
+    with patch.object(LocMemBackend, "verify_many", slow_verify_many):
+        errors = model_admin.check_secrets(rows, timeout=0.01)
+        assert errors == {
+            "op://vault/item/password": None,
+            "op://vault/item/missing": None,
+        }
+        assert 'alt="unknown"' in model_admin.secret_status(rows[0])
+
+        # references still being checked are not checked again
+        model_admin.check_secrets(rows, timeout=0.01)
+        assert len(calls) == 1
+
+        release.set()
+        errors = model_admin.check_secrets(rows, timeout=5)
+
+    assert len(calls) == 1
+    assert errors == {
+        "op://vault/item/password": "",
+        "op://vault/item/missing": "not found",
+    }
+    # late outcomes are cached when the checks finish
+    assert model_admin._opfield_status_cache.get("op://vault/item/missing") == (
+        "not found"
+    )
+
+
+def test_changelist(model_admin, superuser, rows):
+    request = get(superuser)
+
+    changelist = model_admin.get_changelist_instance(request)
+
+    assert "secret_status" in changelist.list_display
+    statuses = [row.__dict__.get("_opfield_status") for row in changelist.result_list]
+    assert all(status is not None for status in statuses)
+
+
+def test_verify_secrets_action(model_admin, superuser, rows):
+    request = get(superuser)
+
+    assert "verify_secrets" in model_admin.get_actions(request)
+    with patch.object(model_admin, "message_user") as message_user:
+        model_admin.verify_secrets(request, OPFieldModel.objects.all())
+
+    messages = [call.args[1] for call in message_user.call_args_list]
+    assert messages[0].startswith("op://vault/item/missing: ")
+    assert messages[-1] == "1 of 2 secret reference(s) do not resolve."
+
+
+def test_verify_secrets_action_all_resolve(model_admin, superuser, rows):
+    request = get(superuser)
+
+    with patch.object(model_admin, "message_user") as message_user:
+        model_admin.verify_secrets(
+            request, OPFieldModel.objects.filter(op_uri="op://vault/item/password")
+        )
+
+    message_user.assert_called_once_with(request, "All 1 secret reference(s) resolve.")
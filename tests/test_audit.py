@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import json
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core.management import CommandError
+from django.core.management import call_command
+
+from django_opfield.audit import INVALID
+from django_opfield.audit import OK
+from django_opfield.audit import UNRESOLVABLE
+from django_opfield.audit import audit
+from django_opfield.backends.locmem import LocMemBackend
+from django_opfield.validators import OPURIValidator
+
+from .models import OPFieldModel
+from .models import OPURIModel
+
+SECRETS = {
+    "op://vault/item/one": "1",
+    "op://vault/item/two": "2",
+}
+
+
+pytestmark = pytest.mark.usefixtures("locmem_backend")
+
+
+@pytest.fixture
+def locmem_secrets():
+    return SECRETS
+
+
+@pytest.fixture
+def rows(db):
+    OPFieldModel.objects.create(op_uri="op://vault/item/one")
+    OPFieldModel.objects.create(op_uri="op://vault/item/one")
+    OPFieldModel.objects.create(op_uri="https://example.com")
+    OPFieldModel.objects.create(op_uri="")
+    OPURIModel.objects.create(op_uri="op://vault/item/one")
+    OPURIModel.objects.create(op_uri="op://vault/item/two")
+    OPURIModel.objects.create(op_uri="op://vault/item/missing")
+    OPURIModel.objects.create(op_uri=None)
+
+
+def by_uri(entries):
+    return {(entry.model, entry.op_uri): entry for entry in entries}
+
+
+def test_audit(rows):
+    entries = by_uri(audit())
+
+    assert set(entries) == {
+        ("tests.OPFieldModel", "op://vault/item/one"),
+        ("tests.OPFieldModel", "https://example.com"),
+        ("tests.OPURIModel", "op://vault/item/one"),
+        ("tests.OPURIModel", "op://vault/item/two"),
+        ("tests.OPURIModel", "op://vault/item/missing"),
+    }
+    one = entries["tests.OPFieldModel", "op://vault/item/one"]
+    assert (one.field, one.rows, one.status, one.error) == ("op_uri", 2, OK, "")
+    invalid = entries["tests.OPFieldModel", "https://example.com"]
+    assert invalid.status == INVALID
+    assert invalid.error == "Enter a valid 1Password URI."
+    missing = entries["tests.OPURIModel", "op://vault/item/missing"]
+    assert missing.status == UNRESOLVABLE
+    assert "not found" in missing.error
+
+
+def test_audit_checks_each_uri_once(rows):
+    with patch.object(
+        LocMemBackend, "verify_many", autospec=True, return_value={}
+    ) as verify_many:
+        entries = list(audit(chunk_size=1, max_workers=2))
+
+    assert len(entries) == 5
+    checked = [uri for call in verify_many.call_args_list for uri in call.args[1]]
+    assert sorted(checked) == [
+        "op://vault/item/missing",
+        "op://vault/item/one",
+        "op://vault/item/two",
+    ]
+
+
+def test_audit_groups_items_into_one_batch(db):
+    OPFieldModel.objects.create(op_uri="op://vault/item/one")
+    OPFieldModel.objects.create(op_uri="op://vault/item/two")
+    OPFieldModel.objects.create(op_uri="op://vault/other/one")
+
+    with patch.object(
+        LocMemBackend, "verify_many", autospec=True, return_value={}
+    ) as verify_many:
+        list(audit(max_workers=4))
+
+    batches = sorted(sorted(call.args[1]) for call in verify_many.call_args_list)
+    assert batches == [
+        ["op://vault/item/one", "op://vault/item/two"],
+        ["op://vault/other/one"],
+    ]
+
+
+def test_audit_vaults(db):
+    field = OPFieldModel._meta.get_field("op_uri")
+    OPFieldModel.objects.create(op_uri="op://other/item/one")
+
+    [validator] = [v for v in field.validators if isinstance(v, OPURIValidator)]
+
+    with patch.object(validator, "_vault_set", frozenset(["vault"])):
+        [entry] = audit()
+
+    assert entry.status == INVALID
+    assert "not a valid vault" in entry.error
+
+
+def test_command(rows):
+    stdout = StringIO()
+
+    call_command("opfield_audit", stdout=stdout)
+
+    report = json.loads(stdout.getvalue())
+    assert sorted(entry["op_uri"] for entry in report["entries"]) == [
+        "https://example.com",
+        "op://vault/item/missing",
+    ]
+    summary = report["summary"]
+    assert summary["checked"] == 5
+    assert summary["rows"] == 6
+    assert (summary[OK], summary[INVALID], summary[UNRESOLVABLE]) == (3, 1, 1)
+
+
+def test_command_verbose(rows):
+    stdout = StringIO()
+
+    call_command("opfield_audit", verbosity=2, chunk_size=2, stdout=stdout)
+
+    assert len(json.loads(stdout.getvalue())["entries"]) == 5
+
+
+@pytest.mark.django_db
+def test_command_no_uris():
+    stdout = StringIO()
+
+    call_command("opfield_audit", stdout=stdout)
+
+    report = json.loads(stdout.getvalue())
+    assert report["entries"] == []
+    assert report["summary"]["checked"] == 0
+
+
+def test_command_strict(rows):
+    with pytest.raises(CommandError, match="2 op:// URI"):
+        call_command("opfield_audit", "--strict", stdout=StringIO())
@@ -0,0 +1,428 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from unittest.mock import patch
+from urllib.parse import parse_qs
+from urllib.parse import urlsplit
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings
+
+from django_opfield.backends import get_backend
+from django_opfield.backends.base import BaseBackend
+from django_opfield.backends.base import is_missing_reference
+from django_opfield.backends.cli import CLIBackend
+from django_opfield.backends.connect import ConnectBackend
+from django_opfield.backends.locmem import LocMemBackend
+from django_opfield.conf import OPFIELD_SETTINGS_NAME
+from django_opfield.conf import app_settings
+
+from .models import OPFieldModel
+
+LOCMEM_SETTINGS = {
+    OPFIELD_SETTINGS_NAME: {
+        "OP_BACKEND": "django_opfield.backends.locmem.LocMemBackend",
+        "OP_BACKEND_OPTIONS": {"secrets": {"op://vault/item/field": "locmem secret"}},
+    }
+}
+
+
+def test_default_backend():
+    assert isinstance(get_backend(), CLIBackend)
+    assert get_backend() is get_backend()
+
+
+@override_settings(**LOCMEM_SETTINGS)
+def test_configured_backend():
+    backend = get_backend()
+
+    assert isinstance(backend, LocMemBackend)
+    assert backend.secrets == {"op://vault/item/field": "locmem secret"}
+
+
+@override_settings(**LOCMEM_SETTINGS)
+def test_get_secret_with_backend():
+    model = OPFieldModel(op_uri="op://vault/item/field")
+
+    assert model.op_uri_secret == "locmem secret"
+    assert asyncio.run(model.aget_secret("op_uri")) == "locmem secret"
+
+
+def test_backend_reset_on_setting_changed():
+    default = get_backend()
+
+    with override_settings(**LOCMEM_SETTINGS):
+        assert isinstance(get_backend(), LocMemBackend)
+
+    assert isinstance(get_backend(), CLIBackend)
+    assert get_backend() is not default
+
+
+def test_base_backend():
+    with pytest.raises(NotImplementedError):
+        BaseBackend().read("op://vault/item/field")
+
+
+def test_base_backend_aread():
+    class SyncBackend(BaseBackend):
+        def read(self, op_uri):
+            return f"{op_uri}-secret"
+
+    assert asyncio.run(SyncBackend().aread("op://vault/item/field")) == (
+        "op://vault/item/field-secret"
+    )
+
+
+@patch.dict(os.environ, {"OP_SERVICE_ACCOUNT_TOKEN": "token"})
+def test_cli_op_moved(tmp_path):
+    op_path = tmp_path / "op"
+    op_path.write_text("#!/bin/sh\necho moved secret\n")
+    op_path.chmod(0o755)
+
+    with patch("shutil.which", return_value=str(op_path)):
+        app_settings.get_op_cli_path()
+        moved = tmp_path / "bin" / "op"
+        moved.parent.mkdir()
+        op_path.rename(moved)
+
+        with patch("shutil.which", return_value=str(moved)):
+            assert CLIBackend().read("op://vault/item/field") == "moved secret"
+
+    assert app_settings.get_op_cli_path() == moved
+
+
+FAKE_OP_INJECT = f"""#!{sys.executable}
+import re
+import sys
+
+template = sys.stdin.read()
+if "missing" in template:
+    sys.exit("[ERROR] could not resolve item")
+
+def value(match):
+    if "multiline" in match.group(1):
+        return "first line\\nsecond line"
+    return match.group(1) + "-secret"
+
+sys.stdout.write(re.sub(r"\\{{\\{{ (op://\\S+) \\}}\\}}", value, template))
+"""
+
+
+@pytest.fixture
+def fake_op_inject(tmp_path):
+    op_path = tmp_path / "op"
+    op_path.write_text(FAKE_OP_INJECT)
+    op_path.chmod(0o755)
+    with override_settings(
+        **{
+            OPFIELD_SETTINGS_NAME: {
+                "OP_CLI_PATH": str(op_path),
+                "OP_SERVICE_ACCOUNT_TOKEN": "token",
+            }
+        }
+    ):
+        yield
+
+
+def test_base_backend_read_many():
+    backend = LocMemBackend(secrets={"op://vault/item/one": "1"})
+
+    assert backend.read_many(["op://vault/item/one"]) == {"op://vault/item/one": "1"}
+    assert not backend.supports_read_many
+
+
+def test_cli_read_many(fake_op_inject):
+    assert CLIBackend().read_many(
+        ["op://vault/item/one", "op://vault/item/multiline", "op://vault/item/two"]
+    ) == {
+        "op://vault/item/one": "op://vault/item/one-secret",
+        "op://vault/item/multiline": "first line\nsecond line",
+        "op://vault/item/two": "op://vault/item/two-secret",
+    }
+
+
+def test_cli_aread_many(fake_op_inject):
+    assert asyncio.run(
+        CLIBackend().aread_many(["op://vault/item/one", "op://vault/item/two"])
+    ) == {
+        "op://vault/item/one": "op://vault/item/one-secret",
+        "op://vault/item/two": "op://vault/item/two-secret",
+    }
+
+
+def test_cli_read_many_error(fake_op_inject):
+    with pytest.raises(ValueError, match="could not resolve item"):
+        CLIBackend().read_many(["op://vault/item/one", "op://vault/missing/field"])
+
+
+def test_base_backend_verify_many():
+    backend = LocMemBackend(secrets={"op://vault/item/one": "1"})
+
+    errors = backend.verify_many(["op://vault/item/one", "op://vault/item/two"])
+
+    assert list(errors) == ["op://vault/item/two"]
+    assert "not found" in str(errors["op://vault/item/two"])
+
+
+def test_locmem_missing():
+    backend = LocMemBackend(secrets={})
+
+    with pytest.raises(ValueError, match="op://vault/item/field not found"):
+        backend.read("op://vault/item/field")
+
+
+VAULTS = [{"id": "vault-id", "name": "vault"}]
+ITEMS = {"vault-id": [{"id": "item-id", "title": "item"}]}
+ITEM = {
+    "id": "item-id",
+    "title": "item",
+    "version": 2,
+    "sections": [{"id": "section-id", "label": "section"}],
+    "fields": [
+        {"id": "field-id", "label": "field", "value": "connect secret"},
+        {
+            "id": "other-id",
+            "label": "field",
+            "value": "section secret",
+            "section": {"id": "section-id"},
+        },
+    ],
+}
+
+
+FAKE_OP_ITEM = f"""#!{sys.executable}
+import json
+import sys
+
+with open(sys.argv[0] + ".log", "a") as log:
+    log.write(" ".join(sys.argv[1:]) + "\\n")
+if sys.argv[1:3] != ["item", "get"] or sys.argv[3] != "item":
+    sys.exit("[ERROR] item not found")
+json.dump({json.dumps(ITEM)}, sys.stdout)
+"""
+
+
+def test_cli_verify_many(tmp_path):
+    op_path = tmp_path / "op"
+    op_path.write_text(FAKE_OP_ITEM)
+    op_path.chmod(0o755)
+
+    with override_settings(
+        **{
+            OPFIELD_SETTINGS_NAME: {
+                "OP_CLI_PATH": str(op_path),
+                "OP_SERVICE_ACCOUNT_TOKEN": "token",
+            }
+        }
+    ):
+        errors = CLIBackend().verify_many(
+            [
+                "op://vault/item/field",
+                "op://vault/item/section/field",
+                "op://vault/item/missing",
+                "op://vault/other/field",
+            ]
+        )
+
+    assert sorted(errors) == ["op://vault/item/missing", "op://vault/other/field"]
+    assert "field 'missing' not found" in str(errors["op://vault/item/missing"])
+    assert "item not found" in str(errors["op://vault/other/field"])
+    # each item is fetched once, without reading any secret
+    assert (tmp_path / "op.log").read_text().splitlines() == [
+        "item get item --vault vault --format json",
+        "item get other --vault vault --format json",
+    ]
+
+
+def test_cli_get_version(tmp_path):
+    op_path = tmp_path / "op"
+    op_path.write_text(FAKE_OP_ITEM)
+    op_path.chmod(0o755)
+
+    with override_settings(
+        **{
+            OPFIELD_SETTINGS_NAME: {
+                "OP_CLI_PATH": str(op_path),
+                "OP_SERVICE_ACCOUNT_TOKEN": "token",
+            }
+        }
+    ):
+        assert CLIBackend().get_version("op://vault/item/field") == 2
+        with pytest.raises(ValueError, match="item not found"):
+            CLIBackend().get_version("op://vault/other/field")
+
+
+class ConnectHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.server.delays:
+            time.sleep(self.server.delays.pop(0))
+        self.server.requests.append(self.path)
+        self.server.clients.add(self.client_address)
+        if self.headers["Authorization"] != "Bearer connect-token":
+            return self.respond(401, {"message": "Invalid token"})
+
+        url = urlsplit(self.path)
+        query = parse_qs(url.query).get("filter", [""])[0]
+        parts = url.path.strip("/").split("/")
+        if parts == ["v1", "vaults"]:
+            return self.respond(200, [v for v in VAULTS if f'"{v["name"]}"' in query])
+        if len(parts) == 4 and parts[3] == "items":
+            items = ITEMS.get(parts[2], [])
+            return self.respond(200, [i for i in items if f'"{i["title"]}"' in query])
+        if len(parts) == 5 and parts[2] == "vault-id" and parts[4] == "item-id":
+            return self.respond(200, ITEM)
+        return self.respond(404, {"message": "Not found"})
+
+    def respond(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def connect_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ConnectHandler)
+    server.requests = []
+    server.clients = set()
+    server.delays = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def connect_backend(connect_server):
+    host, port = connect_server.server_address
+    backend = ConnectBackend(host=f"http://{host}:{port}", token="connect-token")  # noqa: S106
+    yield backend
+    backend.close()
+
+
+def test_connect_read(connect_backend, connect_server):
+    assert connect_backend.read("op://vault/item/field") == "connect secret"
+    assert connect_backend.read("op://vault/item/section/field") == "section secret"
+    assert connect_backend.read("op://vault-id/item-id/field-id") == "connect secret"
+
+
+def test_connect_keep_alive(connect_backend, connect_server):
+    for _ in range(3):
+        connect_backend.read("op://vault/item/field")
+
+    # the vault and item IDs are only looked up once
+    assert len(connect_server.requests) == 5
+    assert len(connect_server.clients) == 1
+
+
+def test_connect_timeout(connect_backend, connect_server):
+    connect_server.delays.append(1)
+
+    with override_settings(**{OPFIELD_SETTINGS_NAME: {"OP_COMMAND_TIMEOUT": 0.2}}):
+        with pytest.raises(TimeoutError):
+            connect_backend.read("op://vault/item/field")
+
+        # the timed out connection is not reused
+        assert connect_backend.read("op://vault/item/field") == "connect secret"
+
+
+def test_connect_field_not_found(connect_backend):
+    with pytest.raises(ValueError, match="field 'missing' not found"):
+        connect_backend.read("op://vault/item/missing")
+
+
+def test_connect_item_not_found(connect_backend):
+    with pytest.raises(ValueError, match="Could not read secret from 1Password: 404"):
+        connect_backend.read("op://vault/missing/field")
+
+
+def test_connect_invalid_token(connect_server):
+    host, port = connect_server.server_address
+    backend = ConnectBackend(host=f"http://{host}:{port}", token="wrong")  # noqa: S106
+
+    with pytest.raises(ValueError, match="401"):
+        backend.read("op://vault/item/field")
+
+
+def test_connect_verify_many(connect_backend, connect_server):
+    errors = connect_backend.verify_many(
+        [
+            "op://vault/item/field",
+            "op://vault/item/section/field",
+            "op://vault/item/missing",
+            "op://vault/missing/field",
+            "not a reference",
+        ]
+    )
+
+    assert sorted(errors) == [
+        "not a reference",
+        "op://vault/item/missing",
+        "op://vault/missing/field",
+    ]
+    assert "field 'missing' not found" in str(errors["op://vault/item/missing"])
+    assert "404" in str(errors["op://vault/missing/field"])
+    assert "invalid reference" in str(errors["not a reference"])
+    item_requests = [path for path in connect_server.requests if "item-id" in path]
+    assert item_requests == ["/v1/vaults/vault-id/items/item-id"]
+
+
+def test_connect_get_version(connect_backend):
+    assert connect_backend.get_version("op://vault/item/field") == 2
+    assert asyncio.run(connect_backend.aget_version("op://vault/item/field")) == 2
+
+
+def test_locmem_get_version():
+    backend = LocMemBackend(secrets={"op://vault/item/one": "1"})
+    version = backend.get_version("op://vault/item/one")
+
+    backend.secrets["op://vault/item/one"] = "2"
+
+    assert backend.get_version("op://vault/item/one") != version
+    assert BaseBackend().get_version("op://vault/item/one") is None
+    with pytest.raises(ValueError, match="not found"):
+        backend.get_version("op://vault/item/missing")
+
+
+def test_connect_not_configured():
+    backend = ConnectBackend()
+
+    with pytest.raises(ImproperlyConfigured, match="OP_CONNECT_HOST is not set"):
+        backend.read("op://vault/item/field")
+
+    with override_settings(
+        **{OPFIELD_SETTINGS_NAME: {"OP_CONNECT_HOST": "http://localhost"}}
+    ), pytest.raises(ImproperlyConfigured, match="OP_CONNECT_TOKEN is not set"):
+        backend.read("op://vault/item/field")
+
+
+@pytest.mark.parametrize(
+    ("exc", "expected"),
+    [
+        (ValueError('"item" isn\'t an item in the "vault" vault'), True),
+        (ValueError('"vault" isn\'t a vault in this account'), True),
+        (ValueError("op://vault/item/field not found"), True),
+        (ValueError("Client error 404"), True),
+        (ValueError("connection refused"), False),
+        (subprocess.TimeoutExpired(["op"], 5), False),
+    ],
+)
+def test_is_missing_reference(exc, expected):
+    assert is_missing_reference(exc) is expected
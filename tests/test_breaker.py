@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import asyncio
+import subprocess
+from unittest.mock import PropertyMock
+from unittest.mock import patch
+
+import pytest
+
+from django_opfield.backends import get_backend
+from django_opfield.backends.budget import ProcessWaitTimeout
+from django_opfield.breaker import CLOSED
+from django_opfield.breaker import HALF_OPEN
+from django_opfield.breaker import OPEN
+from django_opfield.breaker import CircuitBreaker
+from django_opfield.breaker import CircuitOpenError
+from django_opfield.cache import SharedSecretCache
+from django_opfield.cache import secret_cache
+from django_opfield.cache import shared_secret_cache
+from django_opfield.resolver import SecretResolutionError
+from django_opfield.resolver import aresolve
+from django_opfield.resolver import resolve
+from django_opfield.resolver import resolve_many
+
+
+def fail(breaker, exc=None):
+    with pytest.raises(type(exc) if exc else ValueError), breaker.guard():
+        raise exc or ValueError("op exited with 1")
+
+
+def test_disabled_by_default():
+    breaker = CircuitBreaker()
+
+    for _ in range(10):
+        fail(breaker)
+
+    assert breaker.state == CLOSED
+    breaker.before_call()
+
+
+def test_opens_after_threshold():
+    breaker = CircuitBreaker(threshold=2, reset_timeout=30)
+
+    fail(breaker)
+    assert breaker.state == CLOSED
+    fail(breaker, subprocess.TimeoutExpired(["op"], 5))
+
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError, match="not retrying for"):
+        breaker.before_call()
+
+
+def test_success_resets_failures():
+    breaker = CircuitBreaker(threshold=2, reset_timeout=30)
+
+    fail(breaker)
+    with breaker.guard():
+        pass
+    fail(breaker)
+
+    assert breaker.state == CLOSED
+
+
+def test_missing_reference_is_not_a_failure():
+    breaker = CircuitBreaker(threshold=1, reset_timeout=30)
+
+    fail(breaker, ValueError('"item" isn\'t an item in the "vault" vault'))
+
+    assert breaker.state == CLOSED
+
+
+def test_process_wait_timeout_is_not_a_failure():
+    breaker = CircuitBreaker(threshold=1, reset_timeout=0)
+
+    fail(breaker, ProcessWaitTimeout("waiting to run the 'op' CLI"))
+    assert breaker.state == CLOSED
+
+    fail(breaker)
+    # a probe stuck in the queue lets the next call probe instead
+    fail(breaker, ProcessWaitTimeout("waiting to run the 'op' CLI"))
+    breaker.before_call()
+
+
+def test_half_open_probe():
+    breaker = CircuitBreaker(threshold=1, reset_timeout=30)
+    with patch("time.monotonic", return_value=100.0):
+        fail(breaker)
+
+    with patch("time.monotonic", return_value=130.0):
+        assert breaker.state == HALF_OPEN
+        breaker.before_call()
+        # only a single probe at a time
+        with pytest.raises(CircuitOpenError, match="waiting for a probe"):
+            breaker.before_call()
+        breaker.record_success()
+
+    assert breaker.state == CLOSED
+
+
+def test_half_open_probe_fails():
+    breaker = CircuitBreaker(threshold=3, reset_timeout=30)
+    with patch("time.monotonic", return_value=100.0):
+        for _ in range(3):
+            fail(breaker)
+
+    with patch("time.monotonic", return_value=130.0):
+        fail(breaker)
+
+    with patch("time.monotonic", return_value=159.0):
+        assert breaker.state == OPEN
+
+
+def test_cancelled_probe_releases():
+    breaker = CircuitBreaker(threshold=1, reset_timeout=0)
+    fail(breaker)
+
+    with pytest.raises(KeyboardInterrupt), breaker.guard():
+        raise KeyboardInterrupt
+
+    breaker.before_call()
+
+
+@pytest.fixture
+def locmem_secrets():
+    return {"op://vault/item/field": "secret"}
+
+
+@pytest.fixture
+def locmem_settings():
+    return {
+        "OP_CIRCUIT_BREAKER_THRESHOLD": 2,
+        "OP_CIRCUIT_BREAKER_RESET_TIMEOUT": 30,
+        "OP_NEGATIVE_CACHE_TTL": 60,
+    }
+
+
+@pytest.fixture
+def failing_backend(locmem_backend):
+    with patch.object(
+        locmem_backend, "read", side_effect=subprocess.TimeoutExpired(["op"], 5)
+    ) as read:
+        yield read
+
+
+def test_resolve_fails_fast(failing_backend):
+    for _ in range(2):
+        with pytest.raises(subprocess.TimeoutExpired):
+            resolve("op://vault/item/field")
+
+    with pytest.raises(CircuitOpenError):
+        resolve("op://vault/item/field")
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(aresolve("op://vault/other/field"))
+
+    assert failing_backend.call_count == 2
+
+
+def test_resolve_recovers(failing_backend):
+    with patch("time.monotonic", return_value=100.0):
+        for _ in range(2):
+            with pytest.raises(subprocess.TimeoutExpired):
+                resolve("op://vault/item/field")
+
+    failing_backend.side_effect = None
+    failing_backend.return_value = "secret"
+    with patch("time.monotonic", return_value=130.0):
+        assert resolve("op://vault/item/field") == "secret"
+
+    assert get_backend().breaker.state == CLOSED
+
+
+def test_resolve_many_fails_fast(failing_backend):
+    for _ in range(2):
+        with pytest.raises(SecretResolutionError):
+            resolve_many(["op://vault/item/field"])
+
+    with pytest.raises(SecretResolutionError) as exc_info:
+        resolve_many(["op://vault/item/field", "op://vault/item/other"])
+
+    assert all(
+        isinstance(exc, CircuitOpenError) for exc in exc_info.value.errors.values()
+    )
+    assert failing_backend.call_count == 2
+
+
+def test_missing_reference_cached(failing_backend):
+    failing_backend.side_effect = ValueError(
+        "Could not read secret from 1Password: op://vault/item/missing not found"
+    )
+
+    for _ in range(3):
+        with pytest.raises(ValueError, match="not found"):
+            resolve("op://vault/item/missing")
+
+    # read once, then failed from the negative cache without opening the circuit
+    assert failing_backend.call_count == 1
+    assert get_backend().breaker.state == CLOSED
+
+
+def test_queued_reads_do_not_open(failing_backend):
+    failing_backend.side_effect = ProcessWaitTimeout("waiting to run the 'op' CLI")
+
+    for _ in range(3):
+        with pytest.raises(ProcessWaitTimeout):
+            resolve("op://vault/item/field")
+
+    assert get_backend().breaker.state == CLOSED
+
+
+def test_shared_cache_errors_do_not_open(failing_backend):
+    with patch.object(
+        SharedSecretCache, "enabled", new_callable=PropertyMock, return_value=True
+    ), patch.object(shared_secret_cache, "get", return_value=None), patch.object(
+        shared_secret_cache, "get_or_set", side_effect=ConnectionError("cache down")
+    ):
+        for _ in range(3):
+            with pytest.raises(ConnectionError):
+                resolve("op://vault/item/field")
+
+    assert get_backend().breaker.state == CLOSED
+
+
+@pytest.mark.parametrize(
+    "locmem_settings",
+    [
+        {
+            "OP_NEGATIVE_CACHE_TTL": 60,
+            "OP_SECRET_CACHE_TTL": 60,
+            "OP_SECRET_CACHE_REVALIDATE": True,
+        }
+    ],
+)
+def test_missing_reference_not_revalidated(locmem_backend):
+    secret_cache._entries["op://vault/item/missing"] = ("deleted", 0, 1)
+
+    with pytest.raises(ValueError, match="not found"):
+        resolve("op://vault/item/missing")
+
+    with patch.object(locmem_backend, "get_version") as get_version:
+        for _ in range(2):
+            with pytest.raises(ValueError, match="not found"):
+                resolve("op://vault/item/missing")
+
+    get_version.assert_not_called()
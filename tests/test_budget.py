@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from subprocess import CompletedProcess
+from unittest.mock import ANY
+from unittest.mock import patch
+
+import pytest
+from django.test import override_settings
+
+from django_opfield.backends.budget import ProcessBudget
+from django_opfield.backends.cli import CLIBackend
+from django_opfield.backends.cli import is_rate_limited
+from django_opfield.conf import OPFIELD_SETTINGS_NAME
+from django_opfield.metrics import get_metrics
+
+
+class Concurrency:
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        with self.lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+
+    def __exit__(self, *exc_info):
+        with self.lock:
+            self.current -= 1
+
+
+def test_unbounded():
+    budget = ProcessBudget(limit=0)
+
+    for _ in range(10):
+        budget.acquire()
+
+    assert budget.active == 10
+
+
+def test_limit():
+    budget = ProcessBudget(limit=2)
+    concurrency = Concurrency()
+
+    def work():
+        with budget.slot(), concurrency:
+            time.sleep(0.01)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for future in [executor.submit(work) for _ in range(16)]:
+            future.result()
+
+    assert concurrency.peak == 2
+    assert budget.active == 0
+
+
+@override_settings(**{OPFIELD_SETTINGS_NAME: {"OP_PROCESS_WAIT_TIMEOUT": 0.01}})
+def test_timeout():
+    budget = ProcessBudget(limit=1)
+    budget.acquire()
+
+    with pytest.raises(TimeoutError, match="1 processes are already running"):
+        budget.acquire()
+
+    budget.release()
+    assert budget.active == 0
+
+
+def test_alimit():
+    budget = ProcessBudget(limit=2)
+    concurrency = Concurrency()
+
+    async def work():
+        async with budget.aslot():
+            with concurrency:
+                await asyncio.sleep(0.01)
+
+    async def main():
+        await asyncio.gather(*(work() for _ in range(10)))
+
+    asyncio.run(main())
+
+    assert concurrency.peak == 2
+    assert budget.active == 0
+
+
+@override_settings(**{OPFIELD_SETTINGS_NAME: {"OP_PROCESS_WAIT_TIMEOUT": 0.01}})
+def test_atimeout():
+    budget = ProcessBudget(limit=1)
+
+    async def main():
+        async with budget.aslot():
+            with pytest.raises(TimeoutError):
+                await budget.aacquire()
+
+    asyncio.run(main())
+
+    assert budget.active == 0
+
+
+def test_acancelled_waiter():
+    budget = ProcessBudget(limit=1)
+
+    async def main():
+        await budget.aacquire()
+        waiter = asyncio.create_task(budget.aacquire())
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.sleep(0.01)
+        budget.release()
+
+    asyncio.run(main())
+
+    assert budget.active == 0
+
+
+def test_thread_waits_on_async_release():
+    budget = ProcessBudget(limit=1)
+
+    async def main():
+        await budget.aacquire()
+        loop = asyncio.get_running_loop()
+        waiting = loop.run_in_executor(None, budget.acquire)
+        await asyncio.sleep(0.01)
+        assert not waiting.done()
+        budget.release()
+        await waiting
+
+    asyncio.run(main())
+
+    assert budget.active == 1
+
+
+@override_settings(
+    **{
+        OPFIELD_SETTINGS_NAME: {
+            "OP_METRICS_BACKEND": "tests.test_signals.RecordingMetrics"
+        }
+    }
+)
+def test_queue_wait_metric():
+    budget = ProcessBudget(limit=1)
+
+    with budget.slot():
+        pass
+
+    metrics = get_metrics()
+    assert metrics.calls == [("queue_wait", {"duration": ANY})]
+
+
+def test_back_off():
+    budget = ProcessBudget()
+    budget.back_off(0.05)
+
+    start = time.monotonic()
+    with budget.slot():
+        pass
+
+    assert time.monotonic() - start >= 0.05
+
+
+RATE_LIMITED = CompletedProcess(
+    ["op"], 1, stdout=b"", stderr=b"[ERROR] (429) Too Many Requests"
+)
+OK = CompletedProcess(["op"], 0, stdout=b"secret\n", stderr=b"")
+
+
+@pytest.mark.parametrize(
+    ("result", "expected"),
+    [
+        (RATE_LIMITED, True),
+        (
+            CompletedProcess(["op"], 1, b"", b"[ERROR] rate limit exceeded"),
+            True,
+        ),
+        (CompletedProcess(["op"], 1, b"", b"[ERROR] item not found"), False),
+        (OK, False),
+    ],
+)
+def test_is_rate_limited(result, expected):
+    assert is_rate_limited(result) is expected
+
+
+@pytest.fixture
+def rate_limit_settings():
+    with override_settings(
+        **{
+            OPFIELD_SETTINGS_NAME: {
+                "OP_RATE_LIMIT_RETRIES": 2,
+                "OP_RATE_LIMIT_BACKOFF": 0.001,
+            }
+        }
+    ), patch.dict(os.environ, {"OP_SERVICE_ACCOUNT_TOKEN": "token"}):
+        yield
+
+
+@patch("subprocess.run", side_effect=[RATE_LIMITED, RATE_LIMITED, OK])
+def test_rate_limit_retries(mock_run, rate_limit_settings):
+    assert CLIBackend().read("op://vault/item/field") == "secret"
+    assert mock_run.call_count == 3
+
+
+@patch("subprocess.run", return_value=RATE_LIMITED)
+def test_rate_limit_retries_exhausted(mock_run, rate_limit_settings):
+    with pytest.raises(ValueError, match="Too Many Requests"):
+        CLIBackend().read("op://vault/item/field")
+
+    assert mock_run.call_count == 3
+
+
+@patch("subprocess.run", return_value=RATE_LIMITED)
+@patch.dict(os.environ, {"OP_SERVICE_ACCOUNT_TOKEN": "token"})
+def test_rate_limit_no_retries(mock_run):
+    with pytest.raises(ValueError, match="Too Many Requests"):
+        CLIBackend().read("op://vault/item/field")
+
+    assert mock_run.call_count == 1
+
+
+class FakeProcess:
+    def __init__(self, result):
+        self.result = result
+        self.returncode = result.returncode
+
+    async def communicate(self, input=None):  # noqa: A002
+        return self.result.stdout, self.result.stderr
+
+
+def test_arate_limit_retries(rate_limit_settings):
+    results = iter([RATE_LIMITED, OK])
+
+    async def create_subprocess_exec(*args, **kwargs):
+        return FakeProcess(next(results))
+
+    with patch("asyncio.create_subprocess_exec", side_effect=create_subprocess_exec):
+        assert asyncio.run(CLIBackend().aread("op://vault/item/field")) == "secret"
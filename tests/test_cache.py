@@ -0,0 +1,453 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings
+
+from django_opfield.backends.locmem import LocMemBackend
+from django_opfield.cache import NegativeCache
+from django_opfield.cache import SecretCache
+from django_opfield.cache import SharedSecretCache
+from django_opfield.cache import get_vault
+from django_opfield.cache import secret_cache
+from django_opfield.cache import shared_secret_cache
+from django_opfield.conf import OPFIELD_SETTINGS_NAME
+
+from .models import OPFieldModel
+
+
+@pytest.mark.parametrize(
+    ("op_uri", "expected"),
+    [
+        ("op://vault/item/field", "vault"),
+        ("op://vault/item/section/field", "vault"),
+    ],
+)
+def test_get_vault(op_uri, expected):
+    assert get_vault(op_uri) == expected
+
+
+def test_disabled_by_default():
+    cache = SecretCache()
+    cache.set("op://vault/item/field", "secret")
+
+    assert not cache.enabled
+    assert cache.get("op://vault/item/field") is None
+
+
+@override_settings(**{OPFIELD_SETTINGS_NAME: {"OP_SECRET_CACHE_TTL": 60}})
+def test_ttl_from_settings():
+    cache = SecretCache()
+    cache.set("op://vault/item/field", "secret")
+
+    assert cache.ttl == 60
+    assert cache.get("op://vault/item/field") == "secret"
+
+
+def test_expiry():
+    cache = SecretCache(ttl=10)
+
+    with patch("time.monotonic", return_value=100.0):
+        cache.set("op://vault/item/field", "secret")
+
+    with patch("time.monotonic", return_value=109.0):
+        assert cache.get("op://vault/item/field") == "secret"
+
+    with patch("time.monotonic", return_value=110.0):
+        assert cache.get("op://vault/item/field") is None
+
+    assert len(cache) == 0
+
+
+def test_lru_eviction():
+    cache = SecretCache(ttl=60, max_size=2)
+    cache.set("op://vault/item/one", "1")
+    cache.set("op://vault/item/two", "2")
+    # touch the first entry so the second becomes the least recently used
+    assert cache.get("op://vault/item/one") == "1"
+    cache.set("op://vault/item/three", "3")
+
+    assert "op://vault/item/one" in cache
+    assert "op://vault/item/two" not in cache
+    assert "op://vault/item/three" in cache
+
+
+def test_invalidate():
+    cache = SecretCache(ttl=60)
+    cache.set("op://vault/item/field", "secret")
+
+    assert cache.invalidate("op://vault/item/field") is True
+    assert cache.invalidate("op://vault/item/field") is False
+    assert cache.get("op://vault/item/field") is None
+
+
+def test_invalidate_vault():
+    cache = SecretCache(ttl=60)
+    cache.set("op://vault/item/one", "1")
+    cache.set("op://vault/item/section/two", "2")
+    cache.set("op://other/item/three", "3")
+
+    assert cache.invalidate_vault("vault") == 2
+    assert len(cache) == 1
+    assert "op://other/item/three" in cache
+
+
+def test_invalidate_item():
+    cache = SecretCache(ttl=60)
+    cache.set("op://vault/item/one", "1")
+    cache.set("op://vault/item/section/two", "2")
+    cache.set("op://vault/item2/three", "3")
+
+    assert sorted(cache.invalidate_item("vault", "item")) == [
+        "op://vault/item/one",
+        "op://vault/item/section/two",
+    ]
+    assert cache.vaults() == {"vault"}
+
+
+def test_entries_kept_for_revalidation():
+    cache = SecretCache(ttl=10)
+
+    with patch("time.monotonic", return_value=100.0):
+        cache.set("op://vault/item/one", "1", version=3)
+        cache.set("op://vault/item/two", "2")
+
+    with patch("time.monotonic", return_value=110.0), override_settings(
+        **{OPFIELD_SETTINGS_NAME: {"OP_SECRET_CACHE_REVALIDATE": True}}
+    ):
+        assert cache.get("op://vault/item/one") is None
+        assert cache.get("op://vault/item/two") is None
+        assert cache.get_versioned("op://vault/item/one") == ("1", 3)
+        assert cache.get_versioned("op://vault/item/two") == ("2", None)
+
+    assert len(cache) == 2
+
+    with patch("time.monotonic", return_value=110.0):
+        assert cache.get("op://vault/item/one") is None
+
+    assert len(cache) == 1
+
+
+def test_negative_cache_ttl_from_settings():
+    cache = NegativeCache()
+
+    assert cache.ttl == 0
+
+    with override_settings(**{OPFIELD_SETTINGS_NAME: {"OP_NEGATIVE_CACHE_TTL": 5}}):
+        assert cache.ttl == 5
+        assert cache.stale_ttl == 0
+
+
+def test_clear():
+    cache = SecretCache(ttl=60)
+    cache.set("op://vault/item/one", "1")
+    cache.set("op://vault/item/two", "2")
+    cache.clear()
+
+    assert len(cache) == 0
+
+
+@patch("subprocess.run")
+@patch.dict(os.environ, {"OP_SERVICE_ACCOUNT_TOKEN": "token"})
+@override_settings(**{OPFIELD_SETTINGS_NAME: {"OP_SECRET_CACHE_TTL": 60}})
+def test_get_secret_cached(mock_run):
+    mock_run.return_value.returncode = 0
+    mock_run.return_value.stdout = b"secret value"
+
+    model = OPFieldModel(op_uri="op://vault/item/field")
+
+    assert model.op_uri_secret == "secret value"
+    assert model.op_uri_secret == "secret value"
+    assert OPFieldModel(op_uri="op://vault/item/field").op_uri_secret == "secret value"
+
+    mock_run.assert_called_once()
+    assert "op://vault/item/field" in secret_cache
+
+
+@patch("subprocess.run")
+@patch.dict(os.environ, {"OP_SERVICE_ACCOUNT_TOKEN": "token"})
+@override_settings(**{OPFIELD_SETTINGS_NAME: {"OP_SECRET_CACHE_TTL": 60}})
+def test_get_secret_error_not_cached(mock_run):
+    mock_run.return_value.returncode = 1
+    mock_run.return_value.stderr = b"error message"
+
+    model = OPFieldModel(op_uri="op://vault/item/field")
+
+    for _ in range(2):
+        with pytest.raises(ValueError, match="Could not read secret from 1Password"):
+            _ = model.op_uri_secret
+
+    assert mock_run.call_count == 2
+    assert "op://vault/item/field" not in secret_cache
+
+
+SHARED_CACHE_SETTINGS = {
+    "CACHES": {
+        "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+        "secrets": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    },
+    OPFIELD_SETTINGS_NAME: {
+        "OP_BACKEND": "django_opfield.backends.locmem.LocMemBackend",
+        "OP_BACKEND_OPTIONS": {"secrets": {"op://vault/item/field": "shared"}},
+        "OP_SHARED_CACHE_ALIAS": "secrets",
+    },
+}
+
+
+@pytest.fixture
+def shared_cache():
+    with override_settings(**SHARED_CACHE_SETTINGS):
+        caches["secrets"].clear()
+        yield shared_secret_cache
+        caches["secrets"].clear()
+
+
+def test_shared_cache_disabled_by_default():
+    assert not shared_secret_cache.enabled
+
+
+def test_shared_cache_encrypted(shared_cache):
+    shared_cache.set("op://vault/item/field", "secret value")
+
+    raw = caches["secrets"].get(shared_cache.make_key("op://vault/item/field"))
+
+    assert b"secret value" not in raw
+    assert "op://vault/item/field" not in shared_cache.make_key("op://vault/item/field")
+    assert shared_cache.get("op://vault/item/field") == "secret value"
+
+
+def test_shared_cache_key_changed(shared_cache):
+    shared_cache.set("op://vault/item/field", "secret value")
+
+    with override_settings(SECRET_KEY="a-different-secret-key"):  # noqa: S106
+        assert shared_cache.get("op://vault/item/field") is None
+
+
+def test_shared_cache_invalidate(shared_cache):
+    shared_cache.set("op://vault/item/field", "secret value")
+    shared_cache.invalidate("op://vault/item/field")
+
+    assert shared_cache.get("op://vault/item/field") is None
+
+
+def test_shared_cache_get_secret(shared_cache):
+    with patch.object(
+        LocMemBackend, "read", autospec=True, side_effect=LocMemBackend.read
+    ) as mock_read:
+        assert OPFieldModel(op_uri="op://vault/item/field").op_uri_secret == "shared"
+        # simulate another process, with an empty in-process cache
+        SecretCache.clear(secret_cache)
+        assert OPFieldModel(op_uri="op://vault/item/field").op_uri_secret == "shared"
+
+    mock_read.assert_called_once()
+
+
+@pytest.mark.parametrize(
+    ("invalidate", "other_vault"),
+    [
+        (lambda: secret_cache.invalidate("op://vault/item/field"), "other vault"),
+        (lambda: secret_cache.invalidate_vault("vault"), "other vault"),
+        (lambda: secret_cache.invalidate_item("vault", "item"), "other vault"),
+        (secret_cache.clear, None),
+    ],
+)
+def test_shared_cache_invalidated(shared_cache, invalidate, other_vault):
+    from django_opfield.backends import get_backend
+    from django_opfield.resolver import resolve
+
+    with override_settings(
+        **{
+            **SHARED_CACHE_SETTINGS,
+            OPFIELD_SETTINGS_NAME: {
+                **SHARED_CACHE_SETTINGS[OPFIELD_SETTINGS_NAME],
+                "OP_SECRET_CACHE_TTL": 60,
+            },
+        }
+    ):
+        shared_cache.set("op://vault/item/other", "other")
+        shared_cache.set("op://other/item/field", "other vault")
+        assert resolve("op://vault/item/field") == "shared"
+        get_backend().secrets["op://vault/item/field"] = "rotated"
+
+        invalidate()
+
+        assert resolve("op://vault/item/field") == "rotated"
+        assert shared_cache.get("op://other/item/field") == other_vault
+
+
+def test_shared_cache_single_read_across_threads(shared_cache):
+    calls = []
+
+    def slow_read(op_uri):
+        calls.append(op_uri)
+        time.sleep(0.2)
+        return "slow secret"
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [
+            executor.submit(shared_cache.get_or_set, "op://vault/item/field", slow_read)
+            for _ in range(8)
+        ]
+        results = [future.result() for future in futures]
+
+    assert results == ["slow secret"] * 8
+    assert len(calls) == 1
+
+
+def test_shared_cache_lock_holder_fails(shared_cache):
+    def failing_read(op_uri):
+        raise ValueError("Could not read secret from 1Password")
+
+    with pytest.raises(ValueError, match="Could not read secret"):
+        shared_cache.get_or_set("op://vault/item/field", failing_read)
+
+    assert shared_cache.get_or_set("op://vault/item/field", lambda uri: "ok") == "ok"
+
+
+def test_shared_cache_aget_or_set(shared_cache):
+    calls = []
+
+    async def read(op_uri):
+        calls.append(op_uri)
+        await asyncio.sleep(0.1)
+        return "async secret"
+
+    async def main():
+        return await asyncio.gather(
+            *(shared_cache.aget_or_set("op://vault/item/field", read) for _ in range(4))
+        )
+
+    assert asyncio.run(main()) == ["async secret"] * 4
+    assert len(calls) == 1
+    assert shared_cache.get("op://vault/item/field") == "async secret"
+
+
+def test_shared_cache_requires_cryptography(shared_cache):
+    with patch.dict(sys.modules, {"cryptography.fernet": None}), pytest.raises(
+        ImproperlyConfigured, match="requires the 'cryptography' package"
+    ):
+        SharedSecretCache().set("op://vault/item/field", "secret value")
+
+
+@override_settings(**{OPFIELD_SETTINGS_NAME: {"OP_SECRET_CACHE_STALE_TTL": 5}})
+def test_stale_window():
+    cache = SecretCache(ttl=10)
+
+    with patch("time.monotonic", return_value=100.0):
+        cache.set("op://vault/item/field", "secret")
+
+    with patch("time.monotonic", return_value=112.0):
+        assert cache.get("op://vault/item/field") is None
+        assert cache.get_stale("op://vault/item/field") == "secret"
+
+    with patch("time.monotonic", return_value=115.0):
+        assert cache.get_stale("op://vault/item/field") is None
+
+    assert len(cache) == 0
+
+
+@override_settings(**{OPFIELD_SETTINGS_NAME: {"OP_SECRET_CACHE_REFRESH_AHEAD": 3}})
+def test_needs_refresh():
+    cache = SecretCache(ttl=10)
+
+    assert not cache.needs_refresh("op://vault/item/field")
+
+    with patch("time.monotonic", return_value=100.0):
+        cache.set("op://vault/item/field", "secret")
+
+    with patch("time.monotonic", return_value=106.0):
+        assert not cache.needs_refresh("op://vault/item/field")
+
+    with patch("time.monotonic", return_value=107.0):
+        assert cache.needs_refresh("op://vault/item/field")
+
+
+def test_needs_refresh_disabled():
+    cache = SecretCache(ttl=10)
+    cache.set("op://vault/item/field", "secret")
+
+    with patch("time.monotonic", return_value=time.monotonic() + 9.9):
+        assert not cache.needs_refresh("op://vault/item/field")
+
+
+class FlakyBackend(LocMemBackend):
+    reads = []
+    failing = False
+
+    def read(self, op_uri):
+        type(self).reads.append(op_uri)
+        if type(self).failing:
+            raise ValueError("Could not read secret from 1Password: unavailable")
+        return f"secret {len(type(self).reads)}"
+
+
+@pytest.fixture
+def flaky_backend():
+    FlakyBackend.reads = []
+    FlakyBackend.failing = False
+    with override_settings(
+        **{
+            OPFIELD_SETTINGS_NAME: {
+                "OP_BACKEND": "tests.test_cache.FlakyBackend",
+                "OP_SECRET_CACHE_TTL": 60,
+                "OP_SECRET_CACHE_REFRESH_AHEAD": 60,
+                "OP_SECRET_CACHE_STALE_TTL": 60,
+            }
+        }
+    ):
+        yield FlakyBackend
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_refresh_ahead(flaky_backend):
+    model = OPFieldModel(op_uri="op://vault/item/field")
+
+    assert model.op_uri_secret == "secret 1"
+    # the entry is within the refresh-ahead window, so this hit is served from
+    # the cache while a refresh runs in the background
+    assert model.op_uri_secret == "secret 1"
+
+    wait_for(lambda: secret_cache.get("op://vault/item/field") == "secret 2")
+    assert len(flaky_backend.reads) >= 2
+
+
+def test_refresh_ahead_failure_keeps_value(flaky_backend):
+    model = OPFieldModel(op_uri="op://vault/item/field")
+    assert model.op_uri_secret == "secret 1"
+
+    flaky_backend.failing = True
+    assert model.op_uri_secret == "secret 1"
+
+    wait_for(lambda: len(flaky_backend.reads) == 2)
+    assert secret_cache.get_stale("op://vault/item/field") == "secret 1"
+
+
+def test_serve_stale_on_failure(flaky_backend):
+    with patch("time.monotonic", return_value=100.0):
+        assert OPFieldModel(op_uri="op://vault/item/field").op_uri_secret == "secret 1"
+
+    flaky_backend.failing = True
+
+    with patch("time.monotonic", return_value=170.0):
+        model = OPFieldModel(op_uri="op://vault/item/field")
+        assert model.op_uri_secret == "secret 1"
+        assert asyncio.run(model.aget_secret("op_uri")) == "secret 1"
+
+    with patch("time.monotonic", return_value=230.0), pytest.raises(
+        ValueError, match="unavailable"
+    ):
+        _ = OPFieldModel(op_uri="op://vault/item/field").op_uri_secret
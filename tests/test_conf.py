@@ -4,6 +4,7 @@ import os
 from unittest.mock import patch
 
 import pytest
+from django.apps import apps
 from django.core.exceptions import ImproperlyConfigured
 from django.test import override_settings
 
@@ -32,6 +33,14 @@ class TestGetOpCLIPath:
         with patch.dict(os.environ, env, clear=True):
             yield
 
+    @pytest.fixture
+    def op_path(self, tmp_path):
+        path = tmp_path / "path" / "to" / "op"
+        path.parent.mkdir(parents=True)
+        path.write_text("#!/bin/sh\necho 2.30.0\n")
+        path.chmod(0o755)
+        return path
+
     @patch("shutil.which")
     def test_default(self, mock_which):
         mock_which.return_value = None
@@ -41,20 +50,110 @@ class TestGetOpCLIPath:
 
         assert "Could not find the 'op' CLI command" in str(exc_info.value)
 
-    @override_settings(**{OPFIELD_SETTINGS_NAME: {"OP_CLI_PATH": "path/to/op"}})
-    def test_user_setting(self):
-        assert "path/to/op" in str(app_settings.get_op_cli_path())
+    def test_user_setting(self, op_path):
+        with override_settings(
+            **{OPFIELD_SETTINGS_NAME: {"OP_CLI_PATH": str(op_path)}}
+        ):
+            assert "path/to/op" in str(app_settings.get_op_cli_path())
 
-    @patch.dict(os.environ, {"OP_CLI_PATH": "path/to/op"})
-    def test_env_var(self):
-        assert "path/to/op" in str(app_settings.get_op_cli_path())
+    def test_env_var(self, op_path):
+        with patch.dict(os.environ, {"OP_CLI_PATH": str(op_path)}):
+            assert "path/to/op" in str(app_settings.get_op_cli_path())
 
     @patch("shutil.which")
-    def test_shutil_which(self, mock_which):
-        mock_which.return_value = "path/to/op"
+    def test_shutil_which(self, mock_which, op_path):
+        mock_which.return_value = str(op_path)
 
         assert "path/to/op" in str(app_settings.get_op_cli_path())
 
+    @patch("shutil.which")
+    def test_cached(self, mock_which, op_path):
+        mock_which.return_value = str(op_path)
+
+        assert app_settings.get_op_cli_path() == op_path
+        assert app_settings.get_op_cli_path() == op_path
+
+        mock_which.assert_called_once_with("op")
+
+    @patch("shutil.which")
+    def test_reresolved_after_reload(self, mock_which, op_path):
+        mock_which.return_value = str(op_path)
+
+        app_settings.get_op_cli_path()
+        app_settings.reload()
+        app_settings.get_op_cli_path()
+
+        assert mock_which.call_count == 2
+
+    @patch("shutil.which")
+    def test_clear_op_cli_path(self, mock_which, op_path):
+        mock_which.return_value = str(op_path)
+
+        app_settings.get_op_cli_path()
+        app_settings.clear_op_cli_path()
+        app_settings.get_op_cli_path()
+
+        assert mock_which.call_count == 2
+
+    def test_missing_file(self, tmp_path):
+        with override_settings(
+            **{OPFIELD_SETTINGS_NAME: {"OP_CLI_PATH": str(tmp_path / "op")}}
+        ), pytest.raises(RuntimeError, match="is not executable"):
+            app_settings.get_op_cli_path()
+
+    def test_not_executable(self, op_path):
+        op_path.chmod(0o644)
+
+        with override_settings(
+            **{OPFIELD_SETTINGS_NAME: {"OP_CLI_PATH": str(op_path)}}
+        ), pytest.raises(RuntimeError, match="is not executable"):
+            app_settings.get_op_cli_path()
+
+
+class TestGetOpCLIVersion:
+    @pytest.fixture(autouse=True)
+    def op_path(self, tmp_path):
+        path = tmp_path / "op"
+        path.write_text("#!/bin/sh\necho 2.30.0\n")
+        path.chmod(0o755)
+        with override_settings(**{OPFIELD_SETTINGS_NAME: {"OP_CLI_PATH": str(path)}}):
+            yield path
+
+    def test_version(self):
+        assert app_settings.get_op_cli_version() == "2.30.0"
+
+    @patch("subprocess.run")
+    def test_cached(self, mock_run):
+        mock_run.return_value.returncode = 0
+        mock_run.return_value.stdout = b"2.30.0\n"
+
+        assert app_settings.get_op_cli_version() == "2.30.0"
+        assert app_settings.get_op_cli_version() == "2.30.0"
+
+        mock_run.assert_called_once()
+
+    def test_failure(self, op_path):
+        op_path.write_text("#!/bin/sh\necho broken >&2\nexit 1\n")
+
+        with pytest.raises(RuntimeError, match="broken"):
+            app_settings.get_op_cli_version()
+
+    def test_app_ready_probe(self, op_path):
+        app_config = apps.get_app_config("django_opfield")
+        op_path.write_text("#!/bin/sh\nexit 1\n")
+
+        app_config.ready()
+
+        with override_settings(
+            **{
+                OPFIELD_SETTINGS_NAME: {
+                    "OP_CLI_PATH": str(op_path),
+                    "OP_CLI_PROBE": True,
+                }
+            }
+        ), pytest.raises(RuntimeError, match="Could not run the 'op' CLI command"):
+            app_config.ready()
+
 
 class TestOpCommandTimeout:
     def test_default(self):
@@ -79,3 +178,36 @@ class TestGetOpServiceAccountToken:
     @patch.dict(os.environ, {"OP_SERVICE_ACCOUNT_TOKEN": "token"})
     def test_env_var(self):
         assert app_settings.get_op_service_account_token() == "token"
+
+
+class TestMemoization:
+    @patch("django_opfield.conf._get_user_setting", return_value=None)
+    def test_cached(self, mock_get_user_setting):
+        assert app_settings.OP_COMMAND_TIMEOUT == 5
+        assert app_settings.OP_COMMAND_TIMEOUT == 5
+
+        mock_get_user_setting.assert_called_once_with("OP_COMMAND_TIMEOUT")
+
+    @patch("django_opfield.conf._get_user_setting", return_value=None)
+    def test_methods_not_looked_up(self, mock_get_user_setting):
+        _ = app_settings.reload
+
+        mock_get_user_setting.assert_not_called()
+
+    def test_override_settings(self):
+        assert app_settings.OP_COMMAND_TIMEOUT == 5
+
+        with override_settings(**{OPFIELD_SETTINGS_NAME: {"OP_COMMAND_TIMEOUT": 10}}):
+            assert app_settings.OP_COMMAND_TIMEOUT == 10
+
+        assert app_settings.OP_COMMAND_TIMEOUT == 5
+
+    def test_reload(self):
+        assert app_settings.OP_SERVICE_ACCOUNT_TOKEN == ""
+
+        with patch.dict(os.environ, {"OP_SERVICE_ACCOUNT_TOKEN": "token"}):
+            assert app_settings.OP_SERVICE_ACCOUNT_TOKEN == ""
+
+            app_settings.reload()
+
+            assert app_settings.OP_SERVICE_ACCOUNT_TOKEN == "token"
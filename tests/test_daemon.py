@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+
+import pytest
+from django.test import override_settings
+
+from django_opfield.backends.daemon import DaemonBackend
+from django_opfield.conf import OPFIELD_SETTINGS_NAME
+from django_opfield.resolver import resolve_many
+
+FAKE_OP = f"""#!{sys.executable}
+import os
+import sys
+import time
+
+op_uri = sys.argv[-1]
+if "slow" in op_uri:
+    time.sleep(2)
+if "missing" in op_uri:
+    sys.exit("[ERROR] item not found")
+print(op_uri + "-secret-" + os.environ["OP_SERVICE_ACCOUNT_TOKEN"])
+"""
+
+FAKE_SDK = """
+import asyncio
+import itertools
+
+authentications = itertools.count(1)
+
+
+class Secrets:
+    def __init__(self, token, authentication):
+        self.token = token
+        self.authentication = authentication
+
+    async def resolve(self, op_uri):
+        await asyncio.sleep(0)
+        if "missing" in op_uri:
+            raise Exception("item not found")
+        return f"{op_uri}-sdk-{self.token}-{self.authentication}"
+
+
+class Client:
+    @classmethod
+    async def authenticate(cls, auth, integration_name, integration_version):
+        client = cls()
+        client.secrets = Secrets(auth, next(authentications))
+        return client
+"""
+
+
+@pytest.fixture
+def daemon_settings(tmp_path):
+    op_path = tmp_path / "op"
+    op_path.write_text(FAKE_OP)
+    op_path.chmod(0o755)
+
+    def apply(**options):
+        return override_settings(
+            **{
+                OPFIELD_SETTINGS_NAME: {
+                    "OP_BACKEND": "django_opfield.backends.daemon.DaemonBackend",
+                    "OP_CLI_PATH": str(op_path),
+                    "OP_SERVICE_ACCOUNT_TOKEN": "token",
+                    **options,
+                }
+            }
+        )
+
+    return apply
+
+
+@pytest.fixture
+def backend(daemon_settings):
+    backend = DaemonBackend(engine="cli")
+    with daemon_settings():
+        yield backend
+    backend.close()
+
+
+@pytest.fixture
+def sdk_backend(daemon_settings, tmp_path, monkeypatch):
+    package = tmp_path / "sdk" / "onepassword"
+    package.mkdir(parents=True)
+    (package / "__init__.py").write_text("")
+    (package / "client.py").write_text(FAKE_SDK)
+    monkeypatch.syspath_prepend(str(tmp_path / "sdk"))
+
+    backend = DaemonBackend()
+    with daemon_settings():
+        yield backend
+    backend.close()
+
+
+def test_read(backend):
+    assert backend.read("op://vault/item/field") == "op://vault/item/field-secret-token"
+    worker = backend.get_worker()
+    assert backend.read("op://vault/item/other") == "op://vault/item/other-secret-token"
+    assert backend.get_worker() is worker
+
+
+def test_read_error(backend):
+    with pytest.raises(ValueError, match="item not found"):
+        backend.read("op://vault/missing/field")
+
+    # the worker keeps serving after a failed read
+    assert backend.read("op://vault/item/field") == "op://vault/item/field-secret-token"
+
+
+def test_read_timeout(backend, daemon_settings):
+    with daemon_settings(OP_COMMAND_TIMEOUT=0.2), pytest.raises(TimeoutError):
+        backend.read("op://vault/item/slow")
+
+
+def test_aread(backend):
+    async def main():
+        return await asyncio.gather(
+            backend.aread("op://vault/item/one"), backend.aread("op://vault/item/two")
+        )
+
+    assert asyncio.run(main()) == [
+        "op://vault/item/one-secret-token",
+        "op://vault/item/two-secret-token",
+    ]
+
+
+def test_read_many(backend):
+    assert backend.read_many(["op://vault/item/one", "op://vault/item/two"]) == {
+        "op://vault/item/one": "op://vault/item/one-secret-token",
+        "op://vault/item/two": "op://vault/item/two-secret-token",
+    }
+
+    with pytest.raises(ValueError, match="item not found"):
+        backend.read_many(["op://vault/item/one", "op://vault/missing/field"])
+
+
+def test_aread_many(backend):
+    assert asyncio.run(backend.aread_many(["op://vault/item/one"])) == {
+        "op://vault/item/one": "op://vault/item/one-secret-token"
+    }
+
+
+def test_resolve_many(daemon_settings):
+    with daemon_settings(OP_BACKEND_OPTIONS={"engine": "cli"}):
+        assert resolve_many(["op://vault/item/one", "op://vault/item/two"]) == {
+            "op://vault/item/one": "op://vault/item/one-secret-token",
+            "op://vault/item/two": "op://vault/item/two-secret-token",
+        }
+
+
+def test_restart_after_crash(backend):
+    worker = backend.get_worker()
+    worker.process.kill()
+    worker.process.wait()
+
+    assert backend.read("op://vault/item/field") == "op://vault/item/field-secret-token"
+    assert backend.get_worker() is not worker
+
+
+def test_restart_on_token_change(backend, daemon_settings):
+    worker = backend.get_worker()
+
+    with daemon_settings(OP_SERVICE_ACCOUNT_TOKEN="rotated"):  # noqa: S106
+        assert backend.read("op://vault/item/field") == (
+            "op://vault/item/field-secret-rotated"
+        )
+
+    assert backend.get_worker() is not worker
+    assert worker.process.poll() is not None
+
+
+def test_close(backend):
+    worker = backend.get_worker()
+
+    backend.close()
+
+    assert worker.process.poll() is not None
+
+
+def test_sdk(sdk_backend):
+    assert sdk_backend.read("op://vault/item/one") == "op://vault/item/one-sdk-token-1"
+    # authenticated once for the life of the worker
+    assert sdk_backend.read("op://vault/item/two") == "op://vault/item/two-sdk-token-1"
+
+    with pytest.raises(ValueError, match="item not found"):
+        sdk_backend.read("op://vault/missing/field")
+
+
+def test_auto_warns_without_sdk(daemon_settings, caplog):
+    backend = DaemonBackend()
+    with daemon_settings(), caplog.at_level("WARNING"):
+        assert backend.read("op://vault/item/one") == "op://vault/item/one-secret-token"
+    backend.close()
+
+    assert "onepassword-sdk is not installed" in caplog.text
+
+
+def test_sdk_does_not_warn(sdk_backend, caplog):
+    with caplog.at_level("WARNING"):
+        sdk_backend.read("op://vault/item/one")
+
+    assert "onepassword-sdk is not installed" not in caplog.text
+
+
+def test_worker_environment(backend):
+    worker = backend.get_worker()
+
+    assert worker.pid == os.getpid()
+    assert "--engine" in worker.process.args
+    assert "cli" in worker.process.args
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import asyncio
 import os
 from subprocess import TimeoutExpired
 from unittest.mock import ANY
+from unittest.mock import AsyncMock
 from unittest.mock import patch
 
 import pytest
@@ -13,9 +15,11 @@ from django.test import override_settings
 
 from django_opfield.conf import OPFIELD_SETTINGS_NAME
 from django_opfield.fields import OPField
+from django_opfield.uri import OPURI
 from django_opfield.validators import OPURIValidator
 
 from .models import OPFieldModel
+from .models import OPURIModel
 
 
 def test_init_with_defaults():
@@ -81,6 +85,14 @@ def test_deconstruct_with_vaults():
     assert kwargs.get("vaults") == ["vault33", "vault31"]
 
 
+def test_deconstruct_with_verify():
+    field = OPField(verify=True)
+    name, path, args, kwargs = field.deconstruct()
+
+    assert kwargs.get("verify") is True
+    assert "verify" not in OPField().deconstruct()[3]
+
+
 @patch("subprocess.run")
 @patch.dict(os.environ, {"OP_SERVICE_ACCOUNT_TOKEN": "token"})
 def test_get_secret(mock_run):
@@ -128,6 +140,23 @@ def test_get_secret_error(mock_run):
     assert "Could not read secret from 1Password" in str(exc_info.value)
 
 
+@pytest.mark.parametrize("op_uri", [None, ""])
+@patch("subprocess.run")
+def test_get_secret_no_reference(mock_run, op_uri):
+    model = OPURIModel(op_uri=op_uri)
+
+    with pytest.raises(
+        ValueError, match="Could not read secret from 1Password: no reference"
+    ):
+        _ = model.op_uri_secret
+    with pytest.raises(
+        ValueError, match="Could not read secret from 1Password: no reference"
+    ):
+        asyncio.run(model.aget_secret("op_uri"))
+
+    mock_run.assert_not_called()
+
+
 @patch("shutil.which")
 @patch.dict(os.environ, {"OP_SERVICE_ACCOUNT_TOKEN": "token"})
 def test_get_secret_command_not_available(mock_which, db):
@@ -198,3 +227,62 @@ def test_command_timeout(mock_run):
         _ = model.op_uri_secret
 
     mock_run.assert_called_once_with(ANY, capture_output=True, timeout=1)
+
+
+@patch("asyncio.create_subprocess_exec")
+@patch.dict(os.environ, {"OP_SERVICE_ACCOUNT_TOKEN": "token"})
+def test_aget_secret(mock_exec):
+    process = AsyncMock()
+    process.returncode = 0
+    process.communicate.return_value = (b"secret value", b"")
+    mock_exec.return_value = process
+
+    model = OPFieldModel(op_uri="op://vault/item/field")
+
+    secret = asyncio.run(model.aget_secret("op_uri"))
+
+    mock_exec.assert_called_once_with(
+        ANY,
+        "read",
+        "op://vault/item/field",
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    assert secret == "secret value"
+
+
+def test_aget_secret_not_opfield():
+    model = OPFieldModel(op_uri="op://vault/item/field")
+
+    with pytest.raises(ValueError, match="'id' is not an OPField"):
+        asyncio.run(model.aget_secret("id"))
+
+
+def test_deconstruct_with_parse_uri():
+    field = OPField(parse_uri=True)
+    name, path, args, kwargs = field.deconstruct()
+
+    assert kwargs.get("parse_uri") is True
+    assert "parse_uri" not in OPField().deconstruct()[3]
+
+
+def test_from_db_value_plain_string(db):
+    OPFieldModel.objects.create(op_uri="op://vault/item/field")
+
+    model = OPFieldModel.objects.get()
+
+    assert type(model.op_uri) is str
+
+
+def test_from_db_value_parse_uri(db):
+    OPURIModel.objects.create(op_uri="op://vault/item/section/field")
+    OPURIModel.objects.create(op_uri=None)
+
+    model, empty = OPURIModel.objects.order_by("pk")
+
+    assert isinstance(model.op_uri, OPURI)
+    assert model.op_uri == "op://vault/item/section/field"
+    assert model.op_uri.vault == "vault"
+    assert model.op_uri.section == "section"
+    assert empty.op_uri is None
+    assert list(OPURIModel.objects.values_list("op_uri", flat=True))[0].item == "item"
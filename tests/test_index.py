@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import sys
+from unittest.mock import patch
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.test import override_settings
+
+from django_opfield.backends.cli import CLIBackend
+from django_opfield.backends.locmem import LocMemBackend
+from django_opfield.conf import OPFIELD_SETTINGS_NAME
+from django_opfield.index import SecretIndex
+from django_opfield.validators import OPURIValidator
+
+SECRETS = {
+    "op://vault/item/password": "1",
+    "op://vault/item/login/username": "2",
+    "op://vault/other/password": "3",
+    "op://archive/old/password": "4",
+}
+
+
+pytestmark = pytest.mark.usefixtures("locmem_backend")
+
+
+@pytest.fixture
+def locmem_secrets():
+    return SECRETS
+
+
+@pytest.fixture
+def index():
+    return SecretIndex()
+
+
+@pytest.mark.parametrize(
+    ("op_uri", "expected"),
+    [
+        ("op://vault/item/password", True),
+        ("op://vault/item/login/username", True),
+        ("op://vault/item/username", True),
+        ("op://vault/item/password?attribute=otp", True),
+        ("op://vault/item/login/password", False),
+        ("op://vault/item/missing", False),
+        ("op://vault/missing/password", False),
+        ("op://missing/item/password", False),
+        ("not a reference", False),
+    ],
+)
+def test_exists(index, op_uri, expected):
+    assert index.exists(op_uri) is expected
+
+
+def test_exists_does_not_read_secrets(index):
+    with patch.object(LocMemBackend, "read") as read:
+        index.exists("op://vault/item/password")
+
+    read.assert_not_called()
+
+
+def test_index_is_built_once(index):
+    with patch.object(
+        LocMemBackend,
+        "list_vaults",
+        autospec=True,
+        side_effect=LocMemBackend.list_vaults,
+    ) as list_vaults:
+        index.exists("op://vault/item/password")
+        index.exists("op://vault/other/password")
+        index.suggest("op://")
+
+    assert list_vaults.call_count == 1
+
+
+def test_refresh_fetches_changed_items_only(index):
+    index.refresh()
+
+    with patch.object(
+        LocMemBackend, "get_items", autospec=True, side_effect=LocMemBackend.get_items
+    ) as get_items:
+        index.refresh()
+
+    assert [call.args[2] for call in get_items.call_args_list] == [[], []]
+
+
+def test_refresh_on_miss(index):
+    index.refresh()
+    backend = LocMemBackend(secrets={**SECRETS, "op://vault/new/password": "5"})
+
+    with patch.object(LocMemBackend, "_items", return_value=backend._items()):
+        assert not index.exists("op://vault/new/password")
+        assert index.exists("op://vault/new/password", refresh_on_miss=True)
+
+
+def test_index_expires(index):
+    index.refresh()
+
+    with patch.object(SecretIndex, "ttl", -1), patch.object(
+        SecretIndex, "refresh", autospec=True, side_effect=SecretIndex.refresh
+    ) as refresh:
+        index.exists("op://vault/item/password")
+
+    refresh.assert_called_once()
+
+
+@override_settings(
+    CACHES={"index": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+)
+def test_shared_index():
+    with override_settings(
+        **{
+            OPFIELD_SETTINGS_NAME: {
+                "OP_BACKEND": "django_opfield.backends.locmem.LocMemBackend",
+                "OP_BACKEND_OPTIONS": {"secrets": SECRETS},
+                "OP_INDEX_CACHE_ALIAS": "index",
+            }
+        }
+    ):
+        SecretIndex().refresh()
+
+        with patch.object(LocMemBackend, "list_vaults") as list_vaults:
+            assert SecretIndex().exists("op://vault/item/password")
+
+    list_vaults.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    ("term", "suggestions"),
+    [
+        ("", ["op://archive/", "op://vault/"]),
+        ("op://v", ["op://vault/"]),
+        ("op://vault/", ["op://vault/item/", "op://vault/other/"]),
+        ("op://vault/IT", ["op://vault/item/"]),
+        (
+            "op://vault/item/",
+            ["op://vault/item/login/username", "op://vault/item/password"],
+        ),
+        ("op://vault/item/l", ["op://vault/item/login/username"]),
+        ("op://missing/", []),
+    ],
+)
+def test_suggest(index, term, suggestions):
+    assert index.suggest(term) == suggestions
+
+
+def test_suggest_vaults_and_limit(index):
+    assert index.suggest("op://", vaults=["archive"]) == ["op://archive/"]
+    assert index.suggest("op://vault/", limit=1) == ["op://vault/item/"]
+
+
+def test_validator_verify():
+    validator = OPURIValidator(verify=True)
+
+    validator("op://vault/item/password")
+    with pytest.raises(ValidationError) as exc_info:
+        validator("op://vault/item/missing")
+
+    assert exc_info.value.code == "not_found"
+
+
+def test_validator_verify_unreachable():
+    validator = OPURIValidator(verify=True)
+
+    with patch.object(LocMemBackend, "list_vaults", side_effect=ValueError("down")):
+        validator("op://vault/item/missing")
+
+
+FAKE_OP = f"""#!{sys.executable}
+import json
+import sys
+
+args = sys.argv[1:]
+if args[:2] == ["vault", "list"]:
+    json.dump([{{"id": "v1", "name": "vault"}}], sys.stdout, indent=2)
+elif args[:2] == ["item", "list"]:
+    json.dump([{{"id": "i1", "title": "item", "version": 3}}], sys.stdout)
+elif args[:3] == ["item", "get", "-"]:
+    for item in json.load(sys.stdin):
+        json.dump(
+            {{
+                "id": item["id"],
+                "title": "item",
+                "version": 3,
+                "fields": [{{"id": "password", "label": "password", "value": "x"}}],
+            }},
+            sys.stdout,
+            indent=2,
+        )
+        sys.stdout.write("\\n")
+else:
+    sys.exit("[ERROR] unknown command")
+"""
+
+
+def test_cli_listing(tmp_path):
+    op_path = tmp_path / "op"
+    op_path.write_text(FAKE_OP)
+    op_path.chmod(0o755)
+
+    with override_settings(
+        **{
+            OPFIELD_SETTINGS_NAME: {
+                "OP_CLI_PATH": str(op_path),
+                "OP_SERVICE_ACCOUNT_TOKEN": "token",
+            }
+        }
+    ):
+        backend = CLIBackend()
+        assert backend.list_vaults() == [{"id": "v1", "name": "vault"}]
+        assert backend.list_items("v1") == [{"id": "i1", "title": "item", "version": 3}]
+        items = backend.get_items("v1", ["i1", "i2"])
+        assert [item["id"] for item in items] == ["i1", "i2"]
+        assert backend.get_items("v1", []) == []
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import asyncio
+import warnings
+
+import pytest
+from django.test import override_settings
+
+from django_opfield.conf import OPFIELD_SETTINGS_NAME
+from django_opfield.nplusone import NPlusOneError
+from django_opfield.nplusone import NPlusOneWarning
+from django_opfield.nplusone import detect_nplusone
+from django_opfield.query import prefetch_secrets
+from django_opfield.scope import secret_scope
+
+from .models import OPFieldModel
+
+SECRETS = {f"op://vault/item/{i}": str(i) for i in range(5)}
+
+
+pytestmark = pytest.mark.usefixtures("locmem_backend")
+
+
+@pytest.fixture
+def locmem_secrets():
+    return SECRETS
+
+
+@pytest.fixture
+def instances():
+    return [OPFieldModel(op_uri=op_uri) for op_uri in SECRETS]
+
+
+def test_warns(instances):
+    with detect_nplusone(threshold=3):
+        for instance in instances[:3]:
+            instance.op_uri_secret  # noqa: B018
+
+        with pytest.warns(NPlusOneWarning, match="tests.OPFieldModel.op_uri"):
+            instances[3].op_uri_secret  # noqa: B018
+
+        # reported once per field
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            instances[4].op_uri_secret  # noqa: B018
+
+
+def test_raises(instances):
+    with detect_nplusone(threshold=1, raise_error=True):
+        instances[0].op_uri_secret  # noqa: B018
+
+        with pytest.raises(NPlusOneError, match="resolved individually for 2 rows"):
+            instances[1].op_uri_secret  # noqa: B018
+
+
+def test_raises_async(instances):
+    async def main():
+        with detect_nplusone(threshold=1, raise_error=True):
+            await instances[0].aget_secret("op_uri")
+            await instances[1].aget_secret("op_uri")
+
+    with pytest.raises(NPlusOneError):
+        asyncio.run(main())
+
+
+def test_same_uri_not_counted(instances):
+    with detect_nplusone(threshold=1, raise_error=True):
+        for _ in range(3):
+            OPFieldModel(op_uri="op://vault/item/0").op_uri_secret  # noqa: B018
+
+
+def test_prefetched_not_counted(instances):
+    with detect_nplusone(threshold=1, raise_error=True):
+        prefetch_secrets(instances)
+
+        assert [instance.op_uri_secret for instance in instances] == list(
+            SECRETS.values()
+        )
+
+
+def test_disabled_outside_block(instances):
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        for instance in instances:
+            instance.op_uri_secret  # noqa: B018
+
+
+def test_secret_scope(instances):
+    with override_settings(
+        **{
+            OPFIELD_SETTINGS_NAME: {
+                "OP_BACKEND": "django_opfield.backends.locmem.LocMemBackend",
+                "OP_BACKEND_OPTIONS": {"secrets": SECRETS},
+                "OP_NPLUSONE_THRESHOLD": 2,
+                "OP_NPLUSONE_RAISE": True,
+            }
+        }
+    ), secret_scope():
+        instances[0].op_uri_secret  # noqa: B018
+        instances[1].op_uri_secret  # noqa: B018
+
+        with pytest.raises(NPlusOneError):
+            instances[2].op_uri_secret  # noqa: B018
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import threading
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+
+from django_opfield.backends.locmem import LocMemBackend
+from django_opfield.resolver import resolve_many
+
+from .models import OPFieldModel
+
+pytest.importorskip("debug_toolbar")
+
+from django_opfield.panels import SecretsPanel
+
+
+@pytest.fixture
+def panel():
+    toolbar = MagicMock(stats={}, request_id="request-id")
+    panel = SecretsPanel(toolbar, get_response=MagicMock())
+    panel.enable_instrumentation()
+    yield panel
+    panel.disable_instrumentation()
+
+
+pytestmark = pytest.mark.usefixtures("locmem_backend")
+
+
+@pytest.fixture
+def locmem_secrets():
+    return {
+        "op://vault/item/field": "secret-value",
+        "op://vault/item/other": "other-value",
+    }
+
+
+def test_records_reads(panel):
+    OPFieldModel(op_uri="op://vault/item/field").op_uri_secret  # noqa: B018
+    OPFieldModel(op_uri="op://vault/item/field").op_uri_secret  # noqa: B018
+    OPFieldModel(op_uri="op://vault/item/other").op_uri_secret  # noqa: B018
+
+    panel.generate_stats(MagicMock(), MagicMock())
+    stats = panel.get_stats()
+
+    assert [read["op_uri"] for read in stats["reads"]] == [
+        "op://vault/item/field",
+        "op://vault/item/field",
+        "op://vault/item/other",
+    ]
+    assert stats["reads"][0]["field"] == "tests.OPFieldModel.op_uri"
+    assert (
+        stats["reads"][0]["backend"] == "django_opfield.backends.locmem.LocMemBackend"
+    )
+    assert stats["reads"][0]["outcome"] == "ok"
+    assert [read["duplicates"] for read in stats["reads"]] == [1, 1, 0]
+    assert stats["duplicate_count"] == 2
+    assert panel.nav_subtitle.startswith("3 reads in ")
+    panel.toolbar.store.save_panel.assert_called_once_with(
+        "request-id", "SecretsPanel", stats
+    )
+
+
+def test_content_hides_values(panel):
+    OPFieldModel(op_uri="op://vault/item/field").op_uri_secret  # noqa: B018
+
+    panel.generate_stats(MagicMock(), MagicMock())
+    content = panel.content
+
+    assert "op://vault/item/field" in content
+    assert "secret-value" not in content
+
+
+def test_disable_instrumentation(panel):
+    panel.disable_instrumentation()
+
+    OPFieldModel(op_uri="op://vault/item/field").op_uri_secret  # noqa: B018
+
+    panel.generate_stats(MagicMock(), MagicMock())
+    assert panel.get_stats()["reads"] == []
+    assert "No secrets were read" in panel.content
+
+
+def test_ignores_other_threads(panel):
+    thread = threading.Thread(
+        target=lambda: OPFieldModel(op_uri="op://vault/item/other").op_uri_secret
+    )
+    thread.start()
+    thread.join()
+    OPFieldModel(op_uri="op://vault/item/field").op_uri_secret  # noqa: B018
+
+    panel.generate_stats(MagicMock(), MagicMock())
+
+    assert [read["op_uri"] for read in panel.get_stats()["reads"]] == [
+        "op://vault/item/field"
+    ]
+
+
+def test_batch_time_counted_once(panel):
+    with patch.object(LocMemBackend, "supports_read_many", True):
+        resolve_many(["op://vault/item/field", "op://vault/item/other"])
+
+    panel.generate_stats(MagicMock(), MagicMock())
+    stats = panel.get_stats()
+
+    assert [read["batch_size"] for read in stats["reads"]] == [2, 2]
+    assert stats["total_time"] == pytest.approx(stats["reads"][0]["duration"])
+    assert "(batch of 2)" in panel.content
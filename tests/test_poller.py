@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from django_opfield.cache import negative_cache
+from django_opfield.cache import secret_cache
+from django_opfield.poller import BaseChangeSource
+from django_opfield.poller import ChangePoller
+from django_opfield.poller import ItemListSource
+from django_opfield.resolver import resolve
+
+SECRETS = {
+    "op://vault/item/password": "1",
+    "op://vault/item/username": "2",
+    "op://vault/other/password": "3",
+}
+
+
+@pytest.fixture
+def locmem_secrets():
+    return SECRETS
+
+
+@pytest.fixture
+def locmem_settings():
+    return {"OP_SECRET_CACHE_TTL": 60, "OP_NEGATIVE_CACHE_TTL": 60}
+
+
+@pytest.fixture(autouse=True)
+def cached_secrets(locmem_backend):
+    for op_uri, value in SECRETS.items():
+        secret_cache.set(op_uri, value)
+
+
+class StubSource(BaseChangeSource):
+    def __init__(self, changes):
+        self._changes = changes
+        self.polled = threading.Event()
+
+    def changes(self, vaults):
+        self.polled.set()
+        return [change for change in self._changes if change[0] in vaults]
+
+
+def test_poll_invalidates_changed_items():
+    poller = ChangePoller(StubSource([("vault", "item"), ("archive", "item")]))
+
+    invalidated = poller.poll()
+
+    assert sorted(invalidated) == [
+        "op://vault/item/password",
+        "op://vault/item/username",
+    ]
+    assert secret_cache.get("op://vault/other/password") == "3"
+
+
+def test_poll_without_cached_secrets():
+    secret_cache.clear()
+    source = StubSource([("vault", "item")])
+
+    assert ChangePoller(source).poll() == []
+    assert not source.polled.is_set()
+
+
+def test_poll_invalidates_shared_cache():
+    poller = ChangePoller(StubSource([("vault", "other")]))
+
+    with patch("django_opfield.cache.shared_secret_cache") as shared:
+        shared.enabled = True
+        poller.poll()
+
+    shared.invalidate.assert_called_once_with("op://vault/other/password")
+
+
+def test_item_list_source(locmem_backend):
+    source = ItemListSource()
+
+    # the first poll records the versions
+    assert source.changes(["vault"]) == []
+    assert source.changes(["vault"]) == []
+
+    locmem_backend.secrets["op://vault/other/password"] = "rotated"
+
+    assert source.changes(["vault"]) == [("vault", "other"), ("vault", "other")]
+    assert source.changes(["vault"]) == []
+
+
+def test_item_list_source_deleted_item(locmem_backend):
+    source = ItemListSource()
+    source.changes(["vault"])
+
+    del locmem_backend.secrets["op://vault/other/password"]
+
+    assert ("vault", "other") in source.changes(["vault"])
+
+
+def test_item_list_source_created_item(locmem_backend):
+    source = ItemListSource()
+    source.changes(["vault"])
+
+    locmem_backend.secrets["op://vault/new/password"] = "4"
+
+    assert source.changes(["vault"]) == [("vault", "new"), ("vault", "new")]
+    assert source.changes(["vault"]) == []
+
+
+def test_poll_invalidates_missing_secrets(locmem_backend):
+    secret_cache.clear()
+    poller = ChangePoller(ItemListSource())
+    poller.poll()
+
+    with pytest.raises(ValueError, match="not found"):
+        resolve("op://archive/new/password")
+    assert "op://archive/new/password" in negative_cache
+
+    # the first poll of the vault records the versions
+    poller.poll()
+    locmem_backend.secrets["op://archive/new/password"] = "4"
+    poller.poll()
+
+    assert "op://archive/new/password" not in negative_cache
+    assert resolve("op://archive/new/password") == "4"
+
+
+def test_default_source():
+    assert isinstance(ChangePoller().source, ItemListSource)
+
+
+def test_poller_thread():
+    source = StubSource([("vault", "item")])
+    poller = ChangePoller(source, interval=0.01)
+
+    poller.start()
+    try:
+        assert source.polled.wait(5)
+    finally:
+        poller.stop()
+
+    assert secret_cache.get("op://vault/item/password") is None
@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+from subprocess import CompletedProcess
+from unittest.mock import AsyncMock
+from unittest.mock import patch
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from django_opfield.query import OPFieldQuerySet
+from django_opfield.query import aprefetch_secrets
+from django_opfield.query import prefetch_secrets
+from django_opfield.query import stream_secrets
+from django_opfield.scope import secret_scope
+
+from .models import OPFieldModel
+
+
+def fake_op_read(args, **kwargs):
+    if args[1] == "inject":
+        template = kwargs["input"].decode()
+        if "missing" in template:
+            return CompletedProcess(args, 1, stdout=b"", stderr=b"item not found")
+        output = re.sub(r"\{\{ (op://\S+) \}\}", r"\1-secret", template)
+        return CompletedProcess(args, 0, stdout=output.encode(), stderr=b"")
+    op_uri = args[-1]
+    if "missing" in op_uri:
+        return CompletedProcess(args, 1, stdout=b"", stderr=b"item not found")
+    return CompletedProcess(args, 0, stdout=f"{op_uri}-secret\n".encode(), stderr=b"")
+
+
+@pytest.fixture(autouse=True)
+def token():
+    with patch.dict(os.environ, {"OP_SERVICE_ACCOUNT_TOKEN": "token"}):
+        yield
+
+
+@pytest.fixture
+def rows(db):
+    return OPFieldModel.objects.bulk_create(
+        [
+            OPFieldModel(op_uri="op://vault/item/one"),
+            OPFieldModel(op_uri="op://vault/item/two"),
+            OPFieldModel(op_uri="op://vault/item/one"),
+        ]
+    )
+
+
+def test_manager_queryset():
+    assert isinstance(OPFieldModel.objects.all(), OPFieldQuerySet)
+
+
+@patch("subprocess.run", side_effect=fake_op_read)
+def test_resolve_secrets(mock_run, rows):
+    queryset = OPFieldModel.objects.resolve_secrets()
+
+    mock_run.assert_not_called()
+
+    instances = list(queryset)
+
+    assert mock_run.call_count == 1
+    assert [instance.op_uri_secret for instance in instances] == [
+        "op://vault/item/one-secret",
+        "op://vault/item/two-secret",
+        "op://vault/item/one-secret",
+    ]
+    assert mock_run.call_count == 1
+
+
+@patch("subprocess.run", side_effect=fake_op_read)
+def test_resolve_secrets_chained(mock_run, rows):
+    queryset = OPFieldModel.objects.resolve_secrets("op_uri").filter(
+        op_uri="op://vault/item/two"
+    )
+
+    assert [instance.op_uri_secret for instance in queryset] == [
+        "op://vault/item/two-secret"
+    ]
+    mock_run.assert_called_once()
+
+
+@patch("subprocess.run", side_effect=fake_op_read)
+def test_resolve_secrets_cleared(mock_run, rows):
+    queryset = OPFieldModel.objects.resolve_secrets().resolve_secrets(None)
+
+    list(queryset)
+
+    mock_run.assert_not_called()
+
+
+@patch("subprocess.run", side_effect=fake_op_read)
+def test_resolve_secrets_values(mock_run, rows):
+    values = list(OPFieldModel.objects.resolve_secrets().values_list("op_uri"))
+
+    assert len(values) == 3
+    mock_run.assert_not_called()
+
+
+@patch("subprocess.run", side_effect=fake_op_read)
+def test_resolve_secrets_failure(mock_run, db):
+    OPFieldModel.objects.create(op_uri="op://vault/item/one")
+    OPFieldModel.objects.create(op_uri="op://vault/missing/field")
+
+    ok, missing = OPFieldModel.objects.resolve_secrets().order_by("pk")
+
+    assert ok.op_uri_secret == "op://vault/item/one-secret"
+    with pytest.raises(ValueError, match="item not found"):
+        _ = missing.op_uri_secret
+
+
+@patch("subprocess.run", side_effect=fake_op_read)
+def test_prefetch_secrets(mock_run):
+    instances = [
+        OPFieldModel(op_uri="op://vault/item/one"),
+        OPFieldModel(op_uri="op://vault/item/two"),
+        OPFieldModel(op_uri=""),
+    ]
+
+    prefetch_secrets(instances)
+
+    assert mock_run.call_count == 1
+    assert instances[1].op_uri_secret == "op://vault/item/two-secret"
+    assert mock_run.call_count == 1
+
+
+@patch("subprocess.run", side_effect=fake_op_read)
+def test_prefetch_secrets_uri_changed(mock_run):
+    instance = OPFieldModel(op_uri="op://vault/item/one")
+    prefetch_secrets([instance])
+
+    instance.op_uri = "op://vault/item/two"
+
+    assert instance.op_uri_secret == "op://vault/item/two-secret"
+    assert mock_run.call_count == 2
+
+
+async def fake_create_subprocess_exec(*args, **kwargs):
+    process = AsyncMock()
+    process.returncode = 0
+
+    async def communicate(stdin_data=None):
+        if args[-1] == "inject":
+            result = fake_op_read(list(args), input=stdin_data)
+            return result.stdout, result.stderr
+        return f"{args[-1]}-secret".encode(), b""
+
+    process.communicate.side_effect = communicate
+    return process
+
+
+@patch("asyncio.create_subprocess_exec", side_effect=fake_create_subprocess_exec)
+@patch("subprocess.run", side_effect=fake_op_read)
+def test_aresolve_secrets(mock_run, mock_exec, rows):
+    async def fetch():
+        return await OPFieldModel.objects.aresolve_secrets()
+
+    instances = async_to_sync(fetch)()
+
+    assert mock_exec.call_count == 1
+    assert [instance.op_uri_secret for instance in instances] == [
+        "op://vault/item/one-secret",
+        "op://vault/item/two-secret",
+        "op://vault/item/one-secret",
+    ]
+    mock_run.assert_not_called()
+
+
+@patch("asyncio.create_subprocess_exec", side_effect=fake_create_subprocess_exec)
+def test_aprefetch_secrets(mock_exec):
+    instances = [
+        OPFieldModel(op_uri="op://vault/item/one"),
+        OPFieldModel(op_uri="op://vault/item/two"),
+    ]
+
+    asyncio.run(aprefetch_secrets(instances))
+
+    assert mock_exec.call_count == 1
+    assert asyncio.run(instances[0].aget_secret("op_uri")) == (
+        "op://vault/item/one-secret"
+    )
+    assert mock_exec.call_count == 1
+
+
+@pytest.fixture
+def many_rows(db):
+    return OPFieldModel.objects.bulk_create(
+        [OPFieldModel(op_uri=f"op://vault/item/{i}") for i in range(5)]
+        + [OPFieldModel(op_uri="")]
+    )
+
+
+@patch("subprocess.run", side_effect=fake_op_read)
+def test_with_secrets(mock_run, many_rows):
+    instances = OPFieldModel.objects.order_by("pk").with_secrets(chunk_size=2)
+
+    assert not isinstance(instances, list)
+    secrets = [instance.op_uri_secret for instance in instances if instance.op_uri]
+
+    assert secrets == [f"op://vault/item/{i}-secret" for i in range(5)]
+    # one `op inject` for each of the two chunks of two rows, and a single
+    # `op read` for the last chunk with one secret
+    assert mock_run.call_count == 3
+
+
+@patch("subprocess.run", side_effect=fake_op_read)
+def test_with_secrets_scope(mock_run, many_rows):
+    with secret_scope() as scope:
+        instances = list(OPFieldModel.objects.with_secrets(chunk_size=10))
+
+        # streamed secrets are not kept in the scope
+        assert scope == {}
+
+    assert instances[0].op_uri_secret == "op://vault/item/0-secret"
+    assert mock_run.call_count == 1
+
+
+@patch("subprocess.run", side_effect=fake_op_read)
+def test_with_secrets_field_names(mock_run, many_rows):
+    instances = list(OPFieldModel.objects.with_secrets("op_uri", chunk_size=10))
+
+    assert len(instances) == 6
+    assert mock_run.call_count == 1
+
+
+@patch("subprocess.run", side_effect=fake_op_read)
+def test_resolve_secrets_iterator(mock_run, many_rows):
+    instances = OPFieldModel.objects.order_by("pk").resolve_secrets().iterator(3)
+
+    assert next(instances).op_uri_secret == "op://vault/item/0-secret"
+    assert [instance.op_uri_secret for instance in instances if instance.op_uri] == [
+        f"op://vault/item/{i}-secret" for i in range(1, 5)
+    ]
+    assert mock_run.call_count == 2
+
+
+@patch("subprocess.run", side_effect=fake_op_read)
+def test_iterator_without_secrets(mock_run, many_rows):
+    list(OPFieldModel.objects.iterator())
+
+    mock_run.assert_not_called()
+
+
+@patch("subprocess.run", side_effect=fake_op_read)
+def test_stream_secrets_stops_early(mock_run):
+    instances = (OPFieldModel(op_uri=f"op://vault/item/{i}") for i in range(10))
+
+    stream = stream_secrets(instances, 2)
+    first = next(stream)
+    stream.close()
+
+    assert first.op_uri_secret == "op://vault/item/0-secret"
+    # the first chunk and the one resolved ahead of it
+    assert mock_run.call_count == 2
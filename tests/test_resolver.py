@@ -0,0 +1,344 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+from subprocess import CompletedProcess
+from subprocess import TimeoutExpired
+from unittest.mock import ANY
+from unittest.mock import patch
+
+import pytest
+from django.test import override_settings
+
+from django_opfield.backends import get_backend
+from django_opfield.cache import secret_cache
+from django_opfield.conf import OPFIELD_SETTINGS_NAME
+from django_opfield.resolver import SecretResolutionError
+from django_opfield.resolver import ainject
+from django_opfield.resolver import aresolve
+from django_opfield.resolver import aresolve_many
+from django_opfield.resolver import inject
+from django_opfield.resolver import resolve
+from django_opfield.resolver import resolve_many
+
+
+def fake_op_inject(template):
+    """Return the exit code, stdout and stderr of `op inject` for `template`."""
+    template = template.decode()
+    if "missing" in template:
+        return 1, b"", b"item not found"
+    output = re.sub(r"\{\{ (op://\S+) \}\}", r"\1-secret", template)
+    return 0, output.encode(), b""
+
+
+def fake_op_read(args, **kwargs):
+    if args[1] == "inject":
+        return CompletedProcess(args, *fake_op_inject(kwargs["input"]))
+    op_uri = args[-1]
+    if "missing" in op_uri:
+        return CompletedProcess(args, 1, stdout=b"", stderr=b"item not found")
+    return CompletedProcess(args, 0, stdout=f"{op_uri}-secret\n".encode(), stderr=b"")
+
+
+@pytest.fixture(autouse=True)
+def token():
+    with patch.dict(os.environ, {"OP_SERVICE_ACCOUNT_TOKEN": "token"}):
+        yield
+
+
+@patch("subprocess.run", side_effect=fake_op_read)
+def test_resolve_many(mock_run):
+    op_uris = [
+        "op://vault/item/one",
+        "op://vault/item/two",
+        "op://vault/item/one",
+    ]
+
+    results = resolve_many(op_uris)
+
+    assert results == {
+        "op://vault/item/one": "op://vault/item/one-secret",
+        "op://vault/item/two": "op://vault/item/two-secret",
+    }
+    mock_run.assert_called_once()
+    assert mock_run.call_args.args[0][1:] == ["inject"]
+
+
+@patch("subprocess.run", side_effect=fake_op_read)
+def test_resolve_many_empty(mock_run):
+    assert resolve_many([]) == {}
+    mock_run.assert_not_called()
+
+
+@patch("subprocess.run", side_effect=fake_op_read)
+def test_resolve_many_errors(mock_run):
+    with pytest.raises(SecretResolutionError) as exc_info:
+        resolve_many(["op://vault/item/one", "op://vault/missing/field"])
+
+    assert isinstance(exc_info.value, ValueError)
+    assert exc_info.value.results == {
+        "op://vault/item/one": "op://vault/item/one-secret"
+    }
+    assert list(exc_info.value.errors) == ["op://vault/missing/field"]
+    assert "item not found" in str(exc_info.value.errors["op://vault/missing/field"])
+    # the failed `op inject` is retried one secret at a time
+    assert mock_run.call_count == 3
+
+
+@patch("subprocess.run", side_effect=fake_op_read)
+@override_settings(**{OPFIELD_SETTINGS_NAME: {"OP_SECRET_CACHE_TTL": 60}})
+def test_resolve_many_uses_cache(mock_run):
+    secret_cache.set("op://vault/item/one", "cached")
+
+    results = resolve_many(["op://vault/item/one", "op://vault/item/two"])
+
+    assert results["op://vault/item/one"] == "cached"
+    assert "op://vault/item/two" in secret_cache
+    mock_run.assert_called_once()
+
+
+class FakeProcess:
+    def __init__(self, op_uri, delay=0):
+        self.op_uri = op_uri
+        self.delay = delay
+        self.killed = False
+        self.returncode = None
+
+    async def communicate(self, stdin_data=None):
+        await asyncio.sleep(self.delay)
+        if self.op_uri == "inject":
+            self.returncode, stdout, stderr = fake_op_inject(stdin_data)
+            return stdout, stderr
+        if "missing" in self.op_uri:
+            self.returncode = 1
+            return b"", b"item not found"
+        self.returncode = 0
+        return f"{self.op_uri}-secret\n".encode(), b""
+
+    def kill(self):
+        self.killed = True
+
+    async def wait(self):
+        return self.returncode
+
+
+def fake_create_subprocess_exec(*args, **kwargs):
+    return FakeProcess(args[-1])
+
+
+@patch("asyncio.create_subprocess_exec", side_effect=fake_create_subprocess_exec)
+def test_aresolve(mock_exec):
+    secret = asyncio.run(aresolve("op://vault/item/field"))
+
+    assert secret == "op://vault/item/field-secret"
+    mock_exec.assert_called_once_with(
+        ANY,
+        "read",
+        "op://vault/item/field",
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+
+
+@patch("asyncio.create_subprocess_exec", side_effect=fake_create_subprocess_exec)
+def test_aresolve_error(mock_exec):
+    with pytest.raises(ValueError, match="Could not read secret from 1Password"):
+        asyncio.run(aresolve("op://vault/missing/field"))
+
+
+@patch("asyncio.create_subprocess_exec")
+@override_settings(**{OPFIELD_SETTINGS_NAME: {"OP_COMMAND_TIMEOUT": 0.01}})
+def test_aresolve_timeout(mock_exec):
+    process = FakeProcess("op://vault/item/field", delay=1)
+    mock_exec.return_value = process
+
+    with pytest.raises(TimeoutExpired):
+        asyncio.run(aresolve("op://vault/item/field"))
+
+    assert process.killed
+
+
+@patch("asyncio.create_subprocess_exec", side_effect=fake_create_subprocess_exec)
+@override_settings(**{OPFIELD_SETTINGS_NAME: {"OP_SECRET_CACHE_TTL": 60}})
+def test_aresolve_uses_cache(mock_exec):
+    secret_cache.set("op://vault/item/field", "cached")
+
+    assert asyncio.run(aresolve("op://vault/item/field")) == "cached"
+    mock_exec.assert_not_called()
+
+
+@patch("asyncio.create_subprocess_exec", side_effect=fake_create_subprocess_exec)
+def test_aresolve_many(mock_exec):
+    results = asyncio.run(
+        aresolve_many(
+            ["op://vault/item/one", "op://vault/item/two", "op://vault/item/one"]
+        )
+    )
+
+    assert results == {
+        "op://vault/item/one": "op://vault/item/one-secret",
+        "op://vault/item/two": "op://vault/item/two-secret",
+    }
+    mock_exec.assert_called_once_with(
+        ANY,
+        "inject",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+
+
+@patch("asyncio.create_subprocess_exec", side_effect=fake_create_subprocess_exec)
+def test_aresolve_many_errors(mock_exec):
+    with pytest.raises(SecretResolutionError) as exc_info:
+        asyncio.run(aresolve_many(["op://vault/item/one", "op://vault/missing/field"]))
+
+    assert exc_info.value.results == {
+        "op://vault/item/one": "op://vault/item/one-secret"
+    }
+    assert list(exc_info.value.errors) == ["op://vault/missing/field"]
+
+
+@patch("subprocess.run", side_effect=fake_op_read)
+def test_inject(mock_run):
+    text = (
+        "ONE=op://vault/item/one\n"
+        "TWO={{ op://vault/item/two }}\n"
+        "SECTION='op://vault/item/section/field'\n"
+        "NOT_A_REFERENCE=op://vault\n"
+    )
+
+    assert inject(text) == (
+        "ONE=op://vault/item/one-secret\n"
+        "TWO=op://vault/item/two-secret\n"
+        "SECTION='op://vault/item/section/field-secret'\n"
+        "NOT_A_REFERENCE=op://vault\n"
+    )
+    mock_run.assert_called_once()
+
+
+@override_settings(
+    **{
+        OPFIELD_SETTINGS_NAME: {
+            "OP_BACKEND": "django_opfield.backends.locmem.LocMemBackend",
+            "OP_BACKEND_OPTIONS": {"secrets": {"op://vault/item/field": "<b>"}},
+        }
+    }
+)
+def test_inject_escape():
+    assert inject("op://vault/item/field", escape=str.upper) == "<B>"
+    assert asyncio.run(ainject("{{ op://vault/item/field }}")) == "<b>"
+
+
+@patch("subprocess.run", side_effect=fake_op_read)
+def test_inject_error(mock_run):
+    with pytest.raises(SecretResolutionError):
+        inject("op://vault/missing/field")
+
+
+@pytest.fixture
+def revalidating_backend():
+    with override_settings(
+        **{
+            OPFIELD_SETTINGS_NAME: {
+                "OP_BACKEND": "django_opfield.backends.locmem.LocMemBackend",
+                "OP_BACKEND_OPTIONS": {"secrets": {"op://vault/item/password": "old"}},
+                "OP_SECRET_CACHE_TTL": 60,
+                "OP_SECRET_CACHE_REVALIDATE": True,
+            }
+        }
+    ):
+        secret_cache.clear()
+        yield get_backend()
+        secret_cache.clear()
+
+
+def expire(op_uri):
+    value, _, version = secret_cache._entries[op_uri]
+    secret_cache._entries[op_uri] = (value, 0, version)
+
+
+def revalidated(op_uri):
+    # cold reads are stored without a version, the first revalidation adds it
+    resolve(op_uri)
+    expire(op_uri)
+    resolve(op_uri)
+    expire(op_uri)
+
+
+def test_revalidate_cold_read(revalidating_backend):
+    with patch.object(revalidating_backend, "get_version") as get_version:
+        assert resolve("op://vault/item/password") == "old"
+
+    get_version.assert_not_called()
+    assert secret_cache.get_versioned("op://vault/item/password") == ("old", None)
+
+
+def test_revalidate_unversioned(revalidating_backend):
+    secret_cache.set("op://vault/item/password", "old")
+    expire("op://vault/item/password")
+
+    assert resolve("op://vault/item/password") == "old"
+
+    _, version = secret_cache.get_versioned("op://vault/item/password")
+    assert version is not None
+
+
+def test_revalidate_unchanged(revalidating_backend):
+    revalidated("op://vault/item/password")
+
+    with patch.object(revalidating_backend, "read") as read:
+        assert resolve("op://vault/item/password") == "old"
+
+    read.assert_not_called()
+    # revalidating renews the entry
+    assert secret_cache.get("op://vault/item/password") == "old"
+
+
+def test_revalidate_changed(revalidating_backend):
+    revalidated("op://vault/item/password")
+    revalidating_backend.secrets["op://vault/item/password"] = "new"
+
+    assert resolve("op://vault/item/password") == "new"
+
+
+def test_revalidate_async(revalidating_backend):
+    assert asyncio.run(aresolve("op://vault/item/password")) == "old"
+    expire("op://vault/item/password")
+    assert asyncio.run(aresolve("op://vault/item/password")) == "old"
+    expire("op://vault/item/password")
+
+    with patch.object(revalidating_backend, "aread") as aread:
+        assert asyncio.run(aresolve("op://vault/item/password")) == "old"
+
+    aread.assert_not_called()
+
+
+def test_revalidate_version_error(revalidating_backend):
+    revalidated("op://vault/item/password")
+
+    with patch.object(
+        revalidating_backend, "get_version", side_effect=ValueError("down")
+    ):
+        assert resolve("op://vault/item/password") == "old"
+    # read again, without a version to revalidate against next time
+    assert secret_cache.get_versioned("op://vault/item/password") == ("old", None)
+
+
+def test_revalidate_disabled():
+    with override_settings(
+        **{
+            OPFIELD_SETTINGS_NAME: {
+                "OP_BACKEND": "django_opfield.backends.locmem.LocMemBackend",
+                "OP_BACKEND_OPTIONS": {"secrets": {"op://vault/item/password": "old"}},
+                "OP_SECRET_CACHE_TTL": 60,
+            }
+        }
+    ):
+        backend = get_backend()
+        with patch.object(backend, "get_version") as get_version:
+            resolve("op://vault/item/password")
+
+    get_version.assert_not_called()
+    assert secret_cache.get_versioned("op://vault/item/password") == ("old", None)
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from django_opfield.backends.locmem import LocMemBackend
+from django_opfield.middleware import secret_scope_middleware
+from django_opfield.resolver import resolve_many
+from django_opfield.scope import get_scope
+from django_opfield.scope import secret_scope
+
+from .models import OPFieldModel
+
+
+@pytest.fixture
+def locmem_secrets():
+    return {"op://vault/item/one": "1", "op://vault/item/two": "2"}
+
+
+@pytest.fixture(autouse=True)
+def count_reads(locmem_backend):
+    with patch.object(
+        LocMemBackend, "read", autospec=True, side_effect=LocMemBackend.read
+    ):
+        yield
+
+
+def test_no_scope():
+    model = OPFieldModel(op_uri="op://vault/item/one")
+
+    assert get_scope() is None
+    assert model.op_uri_secret == "1"
+    assert model.op_uri_secret == "1"
+    assert LocMemBackend.read.call_count == 2
+
+
+def test_secret_scope():
+    with secret_scope() as secrets:
+        model = OPFieldModel(op_uri="op://vault/item/one")
+
+        assert model.op_uri_secret == "1"
+        assert model.op_uri_secret == "1"
+        assert OPFieldModel(op_uri="op://vault/item/one").op_uri_secret == "1"
+        assert secrets == {"op://vault/item/one": "1"}
+
+    assert LocMemBackend.read.call_count == 1
+    assert secrets == {}
+    assert get_scope() is None
+
+
+def test_secret_scope_nested():
+    with secret_scope() as outer:
+        with secret_scope() as inner:
+            OPFieldModel(op_uri="op://vault/item/one").op_uri_secret  # noqa: B018
+
+        assert inner is outer
+        assert outer == {"op://vault/item/one": "1"}
+
+
+def test_secret_scope_decorator():
+    @secret_scope()
+    def task():
+        assert get_scope() == {}
+        return OPFieldModel(op_uri="op://vault/item/one").op_uri_secret
+
+    assert task() == "1"
+    assert get_scope() is None
+
+
+def test_secret_scope_resolve_many():
+    with secret_scope():
+        resolve_many(["op://vault/item/one", "op://vault/item/two"])
+        resolve_many(["op://vault/item/one", "op://vault/item/two"])
+
+        assert OPFieldModel(op_uri="op://vault/item/two").op_uri_secret == "2"
+
+    assert LocMemBackend.read.call_count == 2
+
+
+def test_secret_scope_async():
+    async def main():
+        with secret_scope():
+            model = OPFieldModel(op_uri="op://vault/item/one")
+            assert await model.aget_secret("op_uri") == "1"
+            assert await model.aget_secret("op_uri") == "1"
+            return get_scope().copy()
+
+    with patch.object(LocMemBackend, "aread", autospec=True) as mock_aread:
+        mock_aread.return_value = "1"
+
+        assert asyncio.run(main()) == {"op://vault/item/one": "1"}
+
+    mock_aread.assert_called_once()
+
+
+def test_middleware():
+    def view(request):
+        model = OPFieldModel(op_uri="op://vault/item/one")
+        return HttpResponse(model.op_uri_secret + model.op_uri_secret)
+
+    middleware = secret_scope_middleware(view)
+
+    for _ in range(2):
+        response = middleware(RequestFactory().get("/"))
+        assert response.content == b"11"
+
+    assert LocMemBackend.read.call_count == 2
+    assert get_scope() is None
+
+
+def test_middleware_async():
+    async def view(request):
+        model = OPFieldModel(op_uri="op://vault/item/one")
+        first = await model.aget_secret("op_uri")
+        second = await model.aget_secret("op_uri")
+        return HttpResponse(first + second + str(len(get_scope())))
+
+    middleware = secret_scope_middleware(view)
+
+    with patch.object(LocMemBackend, "aread", autospec=True) as mock_aread:
+        mock_aread.return_value = "1"
+        response = asyncio.run(middleware(RequestFactory().get("/")))
+
+    assert response.content == b"111"
+    mock_aread.assert_called_once()
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from subprocess import TimeoutExpired
+from unittest.mock import ANY
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+from django.test import override_settings
+
+from django_opfield.backends.cli import CLIBackend
+from django_opfield.backends.locmem import LocMemBackend
+from django_opfield.conf import OPFIELD_SETTINGS_NAME
+from django_opfield.metrics import BaseMetrics
+from django_opfield.metrics import get_metrics
+from django_opfield.resolver import resolve
+from django_opfield.scope import secret_scope
+from django_opfield.signals import secret_resolve_finished
+from django_opfield.signals import secret_resolve_started
+
+from .models import OPFieldModel
+
+
+class RecordingMetrics(BaseMetrics):
+    instances = []
+
+    def __init__(self):
+        self.calls = []
+        type(self).instances.append(self)
+
+    def cache_hit(self, **kwargs):
+        self.calls.append(("cache_hit", kwargs))
+
+    def cache_miss(self, **kwargs):
+        self.calls.append(("cache_miss", kwargs))
+
+    def secret_read(self, **kwargs):
+        self.calls.append(("secret_read", kwargs))
+
+    def queue_wait(self, **kwargs):
+        self.calls.append(("queue_wait", kwargs))
+
+
+LOCMEM_SETTINGS = {
+    "OP_BACKEND": "django_opfield.backends.locmem.LocMemBackend",
+    "OP_BACKEND_OPTIONS": {"secrets": {"op://vault/item/field": "secret"}},
+    "OP_METRICS_BACKEND": "tests.test_signals.RecordingMetrics",
+}
+
+
+@pytest.fixture
+def metrics():
+    with override_settings(**{OPFIELD_SETTINGS_NAME: LOCMEM_SETTINGS}):
+        yield get_metrics()
+
+
+@pytest.fixture
+def receivers():
+    started = MagicMock()
+    finished = MagicMock()
+    secret_resolve_started.connect(started)
+    secret_resolve_finished.connect(finished)
+    yield started, finished
+    secret_resolve_started.disconnect(started)
+    secret_resolve_finished.disconnect(finished)
+
+
+def test_default_metrics():
+    assert type(get_metrics()) is BaseMetrics
+
+
+def test_signals(metrics, receivers):
+    started, finished = receivers
+    model = OPFieldModel(op_uri="op://vault/item/field")
+    field = OPFieldModel._meta.get_field("op_uri")
+
+    assert model.op_uri_secret == "secret"
+
+    started.assert_called_once_with(
+        signal=secret_resolve_started,
+        sender=LocMemBackend,
+        op_uri="op://vault/item/field",
+        field=field,
+    )
+    finished.assert_called_once_with(
+        signal=secret_resolve_finished,
+        sender=LocMemBackend,
+        op_uri="op://vault/item/field",
+        field=field,
+        duration=ANY,
+        outcome="ok",
+        size=6,
+        exception=None,
+        batch_size=1,
+    )
+
+
+def test_signals_async(metrics, receivers):
+    started, finished = receivers
+    model = OPFieldModel(op_uri="op://vault/item/field")
+
+    assert asyncio.run(model.aget_secret("op_uri")) == "secret"
+
+    started.assert_called_once()
+    assert finished.call_args.kwargs["outcome"] == "ok"
+
+
+def test_signals_error(metrics, receivers):
+    started, finished = receivers
+
+    with pytest.raises(ValueError, match="Could not read secret"):
+        resolve("op://vault/item/missing")
+
+    started.assert_called_once()
+    assert finished.call_args.kwargs["outcome"] == "error"
+    assert isinstance(finished.call_args.kwargs["exception"], ValueError)
+    assert finished.call_args.kwargs["size"] == 0
+
+
+@patch("subprocess.run", side_effect=TimeoutExpired(ANY, timeout=1))
+@patch.dict(os.environ, {"OP_SERVICE_ACCOUNT_TOKEN": "token"})
+def test_signals_timeout(mock_run, receivers):
+    started, finished = receivers
+
+    with pytest.raises(TimeoutExpired):
+        resolve("op://vault/item/field")
+
+    assert finished.call_args.kwargs["sender"] is CLIBackend
+    assert finished.call_args.kwargs["outcome"] == "timeout"
+
+
+def test_metrics(metrics):
+    field_label = "tests.OPFieldModel.op_uri"
+
+    model = OPFieldModel(op_uri="op://vault/item/field")
+    with secret_scope():
+        model.op_uri_secret  # noqa: B018
+        model.op_uri_secret  # noqa: B018
+
+    assert metrics.calls == [
+        ("cache_miss", {"vault": "vault", "field": field_label}),
+        (
+            "secret_read",
+            {
+                "vault": "vault",
+                "field": field_label,
+                "duration": ANY,
+                "outcome": "ok",
+                "size": 6,
+            },
+        ),
+        ("cache_hit", {"vault": "vault", "field": field_label, "tier": "scope"}),
+    ]
+
+
+def test_metrics_local_cache(metrics):
+    with override_settings(
+        **{OPFIELD_SETTINGS_NAME: {**LOCMEM_SETTINGS, "OP_SECRET_CACHE_TTL": 60}}
+    ):
+        metrics = get_metrics()
+        resolve("op://vault/item/field")
+        resolve("op://vault/item/field")
+
+    assert [name for name, _ in metrics.calls] == [
+        "cache_miss",
+        "secret_read",
+        "cache_hit",
+    ]
+    assert metrics.calls[2][1]["tier"] == "local"
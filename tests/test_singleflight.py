@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+from django.test import override_settings
+
+from django_opfield.backends.locmem import LocMemBackend
+from django_opfield.conf import OPFIELD_SETTINGS_NAME
+from django_opfield.resolver import aresolve
+from django_opfield.resolver import resolve
+from django_opfield.singleflight import SingleFlight
+
+
+class Work:
+    def __init__(self, result="value", exception=None):
+        self.result = result
+        self.exception = exception
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(timeout=5)
+        if self.exception is not None:
+            raise self.exception
+        return self.result
+
+    async def acall(self):
+        self.calls += 1
+        self.started.set()
+        while not self.release.is_set():
+            await asyncio.sleep(0.001)
+        if self.exception is not None:
+            raise self.exception
+        return self.result
+
+
+def run_concurrently(flight, work, n=5):
+    with ThreadPoolExecutor(max_workers=n) as executor:
+        futures = [executor.submit(flight.do, "key", work) for _ in range(n)]
+        work.started.wait(timeout=5)
+        # give the other threads time to join the call in flight
+        time.sleep(0.05)
+        work.release.set()
+    return futures
+
+
+def test_do():
+    flight = SingleFlight()
+    work = Work()
+
+    futures = run_concurrently(flight, work)
+
+    assert [future.result() for future in futures] == ["value"] * 5
+    assert work.calls == 1
+    assert len(flight) == 0
+
+
+def test_do_exception():
+    flight = SingleFlight()
+    work = Work(exception=ValueError("boom"))
+
+    futures = run_concurrently(flight, work)
+
+    for future in futures:
+        with pytest.raises(ValueError, match="boom"):
+            future.result()
+    assert work.calls == 1
+    assert len(flight) == 0
+
+
+def test_do_sequential():
+    flight = SingleFlight()
+    work = Work()
+    work.release.set()
+
+    assert flight.do("key", work) == "value"
+    assert flight.do("key", work) == "value"
+    assert work.calls == 2
+
+
+def test_ado():
+    flight = SingleFlight()
+    work = Work()
+
+    async def main():
+        tasks = [asyncio.create_task(flight.ado("key", work.acall)) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        work.release.set()
+        return await asyncio.gather(*tasks)
+
+    assert asyncio.run(main()) == ["value"] * 5
+    assert work.calls == 1
+    assert len(flight) == 0
+
+
+def test_ado_cancelled_leader():
+    flight = SingleFlight()
+    work = Work()
+
+    async def main():
+        leader = asyncio.create_task(flight.ado("key", work.acall))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(flight.ado("key", work.acall))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        await asyncio.sleep(0.01)
+        work.release.set()
+        return await waiter
+
+    assert asyncio.run(main()) == "value"
+    assert work.calls == 2
+
+
+def test_ado_waits_on_thread():
+    flight = SingleFlight()
+    work = Work()
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        leader = loop.run_in_executor(None, flight.do, "key", work)
+        await loop.run_in_executor(None, work.started.wait, 5)
+        waiter = asyncio.create_task(flight.ado("key", work.acall))
+        await asyncio.sleep(0.01)
+        work.release.set()
+        return await asyncio.gather(leader, waiter)
+
+    assert asyncio.run(main()) == ["value", "value"]
+    assert work.calls == 1
+
+
+def test_do_on_leader_loop():
+    flight = SingleFlight()
+    work = Work()
+
+    async def main():
+        leader = asyncio.create_task(flight.ado("key", work.acall))
+        await asyncio.sleep(0.01)
+        # a blocking wait here would never return
+        other = Work(result="other")
+        other.release.set()
+        value = flight.do("key", other)
+        work.release.set()
+        return value, await leader
+
+    assert asyncio.run(main()) == ("other", "value")
+
+
+@pytest.fixture
+def slow_backend():
+    release = threading.Event()
+    calls = []
+
+    def read(self, op_uri):
+        calls.append(op_uri)
+        release.wait(timeout=5)
+        return "secret"
+
+    async def aread(self, op_uri):
+        calls.append(op_uri)
+        while not release.is_set():
+            await asyncio.sleep(0.001)
+        return "secret"
+
+    with override_settings(
+        **{
+            OPFIELD_SETTINGS_NAME: {
+                "OP_BACKEND": "django_opfield.backends.locmem.LocMemBackend",
+            }
+        }
+    ), patch.object(LocMemBackend, "read", read), patch.object(
+        LocMemBackend, "aread", aread
+    ):
+        yield release, calls
+
+
+def test_resolve_coalesced(slow_backend):
+    release, calls = slow_backend
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        futures = [executor.submit(resolve, "op://vault/item/field") for _ in range(5)]
+        time.sleep(0.05)
+        release.set()
+
+    assert [future.result() for future in futures] == ["secret"] * 5
+    assert calls == ["op://vault/item/field"]
+
+
+def test_aresolve_coalesced(slow_backend):
+    release, calls = slow_backend
+
+    async def main():
+        tasks = [
+            asyncio.create_task(aresolve("op://vault/item/field")) for _ in range(5)
+        ]
+        await asyncio.sleep(0.05)
+        release.set()
+        return await asyncio.gather(*tasks)
+
+    assert asyncio.run(main()) == ["secret"] * 5
+    assert calls == ["op://vault/item/field"]
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import pytest
+from django.template import Context
+from django.template import Template
+from django.template import TemplateSyntaxError
+
+from django_opfield.resolver import SecretResolutionError
+
+pytestmark = pytest.mark.usefixtures("locmem_backend")
+
+
+@pytest.fixture
+def locmem_secrets():
+    return {"op://vault/item/one": "1", "op://vault/item/html": "<b>&</b>"}
+
+
+def render(source, **context):
+    return Template("{% load opfield %}" + source).render(Context(context))
+
+
+def test_op_secret():
+    assert render('{{ "op://vault/item/one"|op_secret }}') == "1"
+
+
+def test_op_secret_escaped():
+    assert render("{{ uri|op_secret }}", uri="op://vault/item/html") == (
+        "&lt;b&gt;&amp;&lt;/b&gt;"
+    )
+
+
+def test_opinject():
+    source = "{% opinject %}ONE=op://vault/item/one\n{{ name }}{% endopinject %}"
+
+    assert render(source, name="one") == "ONE=1\none"
+
+
+def test_opinject_ignores_variables():
+    source = "{% opinject %}BIO={{ bio }}{% endopinject %}"
+
+    assert render(source, bio="op://vault/item/one") == "BIO=op://vault/item/one"
+
+
+def test_opinject_nested():
+    source = (
+        "{% opinject %}{% for i in items %}{% if i %}op://vault/item/one{% endif %}"
+        "{{ i }}{% endfor %}{% endopinject %}"
+    )
+
+    assert render(source, items=[0, "op://vault/item/one"]) == ("01op://vault/item/one")
+
+
+def test_opinject_escaped():
+    source = "{% opinject %}op://vault/item/html{% endopinject %}"
+
+    assert render(source) == "&lt;b&gt;&amp;&lt;/b&gt;"
+    assert render("{% autoescape off %}" + source + "{% endautoescape %}") == (
+        "<b>&</b>"
+    )
+
+
+def test_opinject_error():
+    with pytest.raises(SecretResolutionError):
+        render("{% opinject %}op://vault/item/missing{% endopinject %}")
+
+
+def test_opinject_arguments():
+    with pytest.raises(TemplateSyntaxError):
+        render("{% opinject now %}{% endopinject %}")
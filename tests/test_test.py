@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from django.test import SimpleTestCase
+from django.test import override_settings
+
+from django_opfield.conf import OPFIELD_SETTINGS_NAME
+from django_opfield.query import prefetch_secrets
+from django_opfield.resolver import resolve
+from django_opfield.test import CaptureSecretReads
+from django_opfield.test import SecretReadsTestMixin
+
+from .models import OPFieldModel
+
+
+@override_settings(
+    **{
+        OPFIELD_SETTINGS_NAME: {
+            "OP_BACKEND": "django_opfield.backends.locmem.LocMemBackend",
+            "OP_BACKEND_OPTIONS": {
+                "secrets": {
+                    "op://vault/item/one": "1",
+                    "op://vault/item/two": "2",
+                }
+            },
+            "OP_SECRET_CACHE_TTL": 60,
+        }
+    }
+)
+class TestAssertNumSecretReads(SecretReadsTestMixin, SimpleTestCase):
+    def test_context_manager(self):
+        with self.assertNumSecretReads(2):
+            resolve("op://vault/item/one")
+            resolve("op://vault/item/two")
+            # served from the cache
+            resolve("op://vault/item/one")
+
+    def test_function(self):
+        self.assertNumSecretReads(1, resolve, "op://vault/item/one")
+
+    def test_prefetch(self):
+        instances = [
+            OPFieldModel(op_uri="op://vault/item/one"),
+            OPFieldModel(op_uri="op://vault/item/two"),
+        ]
+
+        with self.assertNumSecretReads(2):
+            prefetch_secrets(instances)
+            for instance in instances:
+                instance.op_uri_secret  # noqa: B018
+
+    def test_failure(self):
+        with self.assertRaisesMessage(
+            AssertionError, "2 secrets read, 1 expected"
+        ) as cm, self.assertNumSecretReads(1):
+            resolve("op://vault/item/one")
+            resolve("op://vault/item/two")
+
+        assert "1. op://vault/item/one" in str(cm.exception)
+
+    def test_capture(self):
+        with CaptureSecretReads() as reads:
+            resolve("op://vault/item/two")
+
+        assert reads.reads == ["op://vault/item/two"]
+        assert len(reads) == 1
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import copy
+import pickle
+
+import pytest
+
+from django_opfield.uri import OPURI
+
+
+def test_str_behavior():
+    uri = OPURI("op://vault/item/field")
+
+    assert isinstance(uri, str)
+    assert uri == "op://vault/item/field"
+    assert hash(uri) == hash("op://vault/item/field")
+    assert {uri: 1}["op://vault/item/field"] == 1
+    assert repr(uri) == "OPURI('op://vault/item/field')"
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("op://vault/item/field", ("vault", "item", None, "field")),
+        ("op://vault/item/section/field", ("vault", "item", "section", "field")),
+    ],
+)
+def test_parts(value, expected):
+    uri = OPURI(value)
+
+    assert (uri.vault, uri.item, uri.section, uri.field) == expected
+
+
+def test_parsed_once():
+    uri = OPURI("op://vault/item/field")
+
+    assert uri._parts is None
+    assert uri.vault == "vault"
+    parts = uri._parts
+    assert uri.field == "field"
+    assert uri._parts is parts
+
+
+def test_slots():
+    uri = OPURI("op://vault/item/field")
+
+    with pytest.raises(AttributeError):
+        uri.extra = "value"
+
+
+def test_invalid():
+    uri = OPURI("not-a-uri")
+
+    assert uri == "not-a-uri"
+    with pytest.raises(ValueError, match="'not-a-uri' is not a valid 1Password URI"):
+        _ = uri.vault
+
+
+def test_pickle_and_copy():
+    uri = OPURI("op://vault/item/section/field")
+    assert uri.vault == "vault"
+
+    for clone in (
+        pickle.loads(pickle.dumps(uri)),  # noqa: S301
+        copy.copy(uri),
+        copy.deepcopy(uri),
+    ):
+        assert type(clone) is OPURI
+        assert clone == uri
+        assert clone.section == "section"
@@ -74,3 +74,22 @@ def test_invalid_input(invalid_input):
 
     with pytest.raises(ValidationError):
         assert validator(invalid_input)
+
+
+def test_op_regex_compiled_once():
+    assert OPURIValidator().op_regex is OPURIValidator().op_regex
+    assert OPURIValidator.op_regex.match("op://vault/item/section/field").group(
+        "vault", "item", "section", "field"
+    ) == ("vault", "item", "section", "field")
+
+
+def test_vaults_lookup():
+    vaults = [f"vault{i}" for i in range(100)]
+    validator = OPURIValidator(vaults=vaults)
+
+    assert validator.vaults == vaults
+    assert validator("op://vault99/item/field") is None
+    with pytest.raises(ValidationError) as exc_info:
+        validator("op://vault100/item/field")
+
+    assert exc_info.value.code == "invalid_vault"
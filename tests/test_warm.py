@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.apps import apps
+from django.core.management import CommandError
+from django.core.management import call_command
+from django.test import override_settings
+
+from django_opfield.cache import secret_cache
+from django_opfield.cache import shared_secret_cache
+from django_opfield.conf import OPFIELD_SETTINGS_NAME
+from django_opfield.warm import collect_uris
+from django_opfield.warm import iter_opfields
+from django_opfield.warm import warm_cache
+from django_opfield.warm import warm_cache_in_background
+
+from .models import OPFieldModel
+from .models import OPURIModel
+
+SECRETS = {
+    "op://vault/item/one": "1",
+    "op://vault/item/two": "2",
+}
+
+
+pytestmark = pytest.mark.usefixtures("locmem_backend")
+
+
+@pytest.fixture
+def locmem_secrets():
+    return SECRETS
+
+
+@pytest.fixture
+def locmem_settings():
+    return {"OP_SECRET_CACHE_TTL": 60}
+
+
+@pytest.fixture
+def rows(db):
+    OPFieldModel.objects.create(op_uri="op://vault/item/one")
+    OPFieldModel.objects.create(op_uri="op://vault/item/one")
+    OPFieldModel.objects.create(op_uri="")
+    OPURIModel.objects.create(op_uri="op://vault/item/two")
+    OPURIModel.objects.create(op_uri="op://vault/item/missing")
+    OPURIModel.objects.create(op_uri=None)
+
+
+def test_iter_opfields():
+    fields = {(model, field.name) for model, field in iter_opfields()}
+
+    assert fields == {(OPFieldModel, "op_uri"), (OPURIModel, "op_uri")}
+
+
+def test_collect_uris(rows):
+    assert sorted(collect_uris()) == [
+        "op://vault/item/missing",
+        "op://vault/item/one",
+        "op://vault/item/two",
+    ]
+
+
+def test_warm_cache(rows):
+    result = warm_cache()
+
+    assert sorted(result.resolved) == ["op://vault/item/one", "op://vault/item/two"]
+    assert list(result.failed) == ["op://vault/item/missing"]
+    assert result.total == 3
+    assert result.elapsed > 0
+    assert secret_cache.get("op://vault/item/one") == "1"
+    assert secret_cache.get("op://vault/item/two") == "2"
+
+
+def test_warm_cache_uris():
+    result = warm_cache(["op://vault/item/two"])
+
+    assert result.resolved == ["op://vault/item/two"]
+    assert "op://vault/item/one" not in secret_cache
+
+
+def test_warm_cache_in_background(rows, caplog):
+    with caplog.at_level("INFO", logger="django_opfield.warm"):
+        warm_cache_in_background()
+
+    assert "op://vault/item/two" in secret_cache
+
+
+def test_command(rows):
+    stdout = StringIO()
+    stderr = StringIO()
+
+    call_command("opfield_warm", stdout=stdout, stderr=stderr)
+
+    assert "Resolved 2 of 3 secret(s)" in stdout.getvalue()
+    assert "(1 failed)" in stdout.getvalue()
+    assert "op://vault/item/missing" in stderr.getvalue()
+    assert "op://vault/item/one" in secret_cache
+
+
+def test_command_strict(rows):
+    with pytest.raises(CommandError, match="1 secret\\(s\\) could not be resolved"):
+        call_command("opfield_warm", "--strict", stdout=StringIO(), stderr=StringIO())
+
+
+def test_command_shared_cache_disabled(db):
+    stderr = StringIO()
+
+    call_command("opfield_warm", stdout=StringIO(), stderr=stderr)
+
+    assert "The shared secret cache is disabled" in stderr.getvalue()
+
+
+def test_command_shared_cache(rows):
+    stderr = StringIO()
+
+    with override_settings(
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        },
+        **{
+            OPFIELD_SETTINGS_NAME: {
+                "OP_BACKEND": "django_opfield.backends.locmem.LocMemBackend",
+                "OP_BACKEND_OPTIONS": {"secrets": SECRETS},
+                "OP_SHARED_CACHE_ALIAS": "default",
+            }
+        },
+    ):
+        call_command("opfield_warm", stdout=StringIO(), stderr=stderr)
+
+        assert shared_secret_cache.get("op://vault/item/one") == "1"
+
+    assert "The shared secret cache is disabled" not in stderr.getvalue()
+
+
+@patch("threading.Thread")
+def test_warm_on_startup(mock_thread):
+    app_config = apps.get_app_config("django_opfield")
+
+    app_config.ready()
+    mock_thread.assert_not_called()
+
+    with override_settings(**{OPFIELD_SETTINGS_NAME: {"OP_WARM_ON_STARTUP": True}}):
+        app_config.ready()
+
+    mock_thread.assert_called_once_with(
+        target=warm_cache_in_background, name="django-opfield-warm", daemon=True
+    )
+    mock_thread.return_value.start.assert_called_once()
+
+
+@pytest.mark.parametrize(
+    ("argv", "started"),
+    [
+        (["manage.py", "migrate"], False),
+        (["/venv/bin/django-admin", "opfield_warm"], False),
+        (["manage.py", "runserver"], True),
+        (["/venv/bin/gunicorn", "project.wsgi"], True),
+    ],
+)
+@patch("threading.Thread")
+def test_warm_on_startup_skips_management_commands(mock_thread, argv, started):
+    app_config = apps.get_app_config("django_opfield")
+
+    with patch("sys.argv", argv), override_settings(
+        **{OPFIELD_SETTINGS_NAME: {"OP_WARM_ON_STARTUP": True}}
+    ):
+        app_config.ready()
+
+    assert mock_thread.called is started
+
+
+def test_warm_cache_in_background_closes_connections(rows):
+    with patch("django_opfield.warm.connections") as mock_connections:
+        warm_cache_in_background()
+
+    mock_connections.close_all.assert_called_once()